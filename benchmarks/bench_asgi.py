@@ -0,0 +1,91 @@
+"""Нагрузочный тест: Flask (потоковый werkzeug) против асинхронного режима.
+
+Запуск: python -m benchmarks.bench_asgi [клиентов] [запросов на клиента] [kdf]
+С аргументом kdf кэш проверенных паролей отключается, и каждый запрос
+выполняет полную проверку хеша.
+"""
+
+import asyncio
+import http.client
+import logging
+import statistics
+import sys
+import threading
+import time
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+from movies.aioserver import start
+from movies.app import CREDENTIALS, FILM_STORAGE, USER_STORAGE, server
+from movies.asgi import AsgiApp
+from movies.film import Film
+from movies.user import User
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import make_server
+
+Address = Tuple[str, int]
+HEADERS = {'Authorization': 'Basic {}'.format(b64encode(b'bench:bench').decode())}
+PATH = '/movies/api/v1.0/get_average/film/2000'
+
+
+def start_flask() -> Tuple[Address, Callable[[], None]]:
+    wsgi_server = make_server('127.0.0.1', 0, server, threaded=True)
+    threading.Thread(target=wsgi_server.serve_forever, daemon=True).start()
+    return ('127.0.0.1', wsgi_server.server_port), wsgi_server.shutdown
+
+
+def start_async() -> Tuple[Address, Callable[[], None]]:
+    loop = asyncio.new_event_loop()
+    aio_server = loop.run_until_complete(start(AsgiApp(server), '127.0.0.1', 0))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return aio_server.sockets[0].getsockname()[:2], lambda: loop.call_soon_threadsafe(
+        loop.stop
+    )
+
+
+def client(address: Address, requests: int) -> List[float]:
+    latencies = []
+    connection = http.client.HTTPConnection(*address)
+    for _ in range(requests):
+        started = time.perf_counter()
+        connection.request('GET', PATH, headers=HEADERS)
+        response = connection.getresponse()
+        response.read()
+        if response.getheader('Connection') == 'close' or response.version == 10:
+            connection.close()
+            connection = http.client.HTTPConnection(*address)
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+    return latencies
+
+
+def load(address: Address, clients: int, requests: int) -> Tuple[float, float, float]:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(lambda _: client(address, requests), range(clients)))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for result in results for latency in result)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    return len(latencies) / elapsed, statistics.median(latencies) * 1000, p99 * 1000
+
+
+def main() -> None:
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    if 'kdf' in sys.argv[3:]:
+        CREDENTIALS.maxsize = 0
+    USER_STORAGE.add(User('bench', generate_password_hash('bench'), {}))
+    FILM_STORAGE.add(Film('film', 2000, [5, 7], []))
+
+    print('{:>8} {:>10} {:>10} {:>10}'.format('mode', 'req/s', 'p50 ms', 'p99 ms'))
+    for name, starter in (('flask', start_flask), ('async', start_async)):
+        address, stop = starter()
+        rps, p50, p99 = load(address, clients, requests)
+        stop()
+        print('{:>8} {:>10.0f} {:>10.2f} {:>10.2f}'.format(name, rps, p50, p99))
+
+
+if __name__ == '__main__':
+    main()
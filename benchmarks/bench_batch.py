@@ -0,0 +1,58 @@
+"""Пропускная способность пакетных ручек против запросов по одному.
+
+Запуск: python -m benchmarks.bench_batch [оценок]
+"""
+
+import sys
+import time
+from base64 import b64encode
+
+from flask import json
+from movies.app import FILM_STORAGE, USER_STORAGE, server
+from movies.film import Film
+from movies.user import User
+from werkzeug.security import generate_password_hash
+
+FILMS = 1000
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    USER_STORAGE.add(User('bench', generate_password_hash('bench'), {}))
+    for number in range(FILMS):
+        FILM_STORAGE.add(Film('film{}'.format(number), 2000, [], []))
+    token = b64encode(b'bench:bench').decode()
+    headers = {'Authorization': 'Basic {}'.format(token)}
+    items = [
+        {'name': 'film{}'.format(number % FILMS), 'year': 2000, 'mark': number % 11}
+        for number in range(count)
+    ]
+
+    client = server.test_client()
+    started = time.perf_counter()
+    for item in items:
+        client.post(
+            '/movies/api/v1.0/bench/add_mark',
+            headers=headers,
+            data=json.dumps(item),
+            content_type='application/json',
+        )
+    single = count / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    client.post(
+        '/movies/api/v1.0/bench/add_marks_batch',
+        headers=headers,
+        data=json.dumps(items),
+        content_type='application/json',
+    )
+    batch = count / (time.perf_counter() - started)
+
+    print('marks:          {}'.format(count))
+    print('single ops/s:   {:.0f}'.format(single))
+    print('batch ops/s:    {:.0f}'.format(batch))
+    print('speedup:        {:.1f}x'.format(batch / single))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Задержка поиска фильма в каталоге в зависимости от его размера.
+
+Запуск: python -m benchmarks.bench_catalog
+"""
+
+import random
+import timeit
+from typing import List
+
+from movies.app import find_film
+from movies.film import Film
+from movies.storage import FilmCatalog
+from movies.user import User
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LOOKUPS = 100_000
+
+
+def build_catalog(size: int) -> FilmCatalog:
+    catalog = FilmCatalog()
+    for number in range(size):
+        catalog.add(Film('film{}'.format(number), 1900 + number % 120, [], []))
+    return catalog
+
+
+def run(size: int) -> List[float]:
+    catalog = build_catalog(size)
+    user = User('bench', '', {})
+    films = random.choices(list(catalog), k=LOOKUPS)
+    probes = iter(films * 3)
+
+    def lookup() -> None:
+        film = next(probes)
+        find_film(film.name, str(film.year), catalog)
+
+    def mark() -> None:
+        user.add_review_or_mark(next(probes), catalog, 5)
+
+    def create() -> None:
+        film = next(probes)
+        user.add_film(film.name, film.year, catalog)
+
+    return [
+        timeit.timeit(func, number=LOOKUPS) / LOOKUPS * 1e9
+        for func in (lookup, mark, create)
+    ]
+
+
+def main() -> None:
+    print('{:>10} {:>12} {:>12} {:>12}'.format('films', 'find ns', 'mark ns', 'add ns'))
+    for size in SIZES:
+        find_ns, mark_ns, add_ns = run(size)
+        print(
+            '{:>10} {:>12.0f} {:>12.0f} {:>12.0f}'.format(
+                size, find_ns, mark_ns, add_ns
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Стоимость хеширования паролей: регистрации в секунду и задержка входа.
+
+Запуск: python -m benchmarks.bench_hashing [регистраций] [клиентов]
+Для каждого метода хеширования измеряются регистрации в секунду при
+нескольких клиентах, задержка входа без кэша проверенных паролей и
+задержка другого маршрута во время потока регистраций.
+"""
+
+import http.client
+import json
+import logging
+import statistics
+import sys
+import threading
+import time
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from typing import Dict, List
+
+from movies import passwords
+from movies.app import CREDENTIALS, FILM_STORAGE, USER_STORAGE, server
+from movies.film import Film
+from movies.user import User
+from werkzeug.serving import make_server
+
+METHODS = ('', 'pbkdf2:sha256:100000', 'pbkdf2:sha256:10000', 'scrypt')
+PATH = '/movies/api/v1.0/get_count_marks/film/2000'
+COUNTER = count()
+
+
+def headers(username: str) -> Dict[str, str]:
+    token = b64encode('{}:password'.format(username).encode()).decode()
+    return {'Authorization': 'Basic ' + token, 'Content-Type': 'application/json'}
+
+
+def signup(port: int, signups: int) -> None:
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    for _ in range(signups):
+        body = {'username': 'user {}'.format(next(COUNTER)), 'password': 'password'}
+        connection.request(
+            'POST', '/movies/api/v1.0/create_account', json.dumps(body), headers('')
+        )
+        connection.getresponse().read()
+
+
+def latency(port: int, username: str, requests: int) -> float:
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    latencies: List[float] = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        connection.request('GET', PATH, headers=headers(username))
+        connection.getresponse().read()
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies) * 1000
+
+
+def main() -> None:
+    signups = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    FILM_STORAGE.add(Film('film', 2000, [5], []))
+    wsgi_server = make_server('127.0.0.1', 0, server, threaded=True)
+    threading.Thread(target=wsgi_server.serve_forever, daemon=True).start()
+    port = wsgi_server.server_port
+
+    print(
+        '{:>32} {:>10} {:>10} {:>14}'.format(
+            'method', 'signup/s', 'login ms', 'busy route ms'
+        )
+    )
+    for number, method in enumerate(METHODS):
+        passwords.HASH_METHOD = method
+        name = 'login {}'.format(number)
+        USER_STORAGE.add(User(name, passwords.hash_password('password'), {}))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            list(pool.map(lambda _: signup(port, signups // clients), range(clients)))
+        rate = signups // clients * clients / (time.perf_counter() - started)
+
+        CREDENTIALS.maxsize = 0
+        CREDENTIALS.clear()
+        login = latency(port, name, 10)
+        CREDENTIALS.maxsize = 1024
+
+        burst = threading.Thread(target=signup, args=(port, signups))
+        burst.start()
+        busy = latency(port, name, 50)
+        burst.join()
+        label = passwords.method_prefix(method) + ('' if method else ' (default)')
+        print('{:>32} {:>10.1f} {:>10.2f} {:>14.2f}'.format(label, rate, login, busy))
+
+
+if __name__ == '__main__':
+    main()
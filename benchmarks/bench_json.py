@@ -0,0 +1,98 @@
+"""Скорость отдачи списка фильмов: страницы по курсору и поток NDJSON.
+
+Запуск: python -m benchmarks.bench_json [фильмов] [оценок на фильм]
+Сравниваются стандартный json и orjson, а также первый проход, когда
+фрагменты фильмов еще не закодированы, и повторный.
+"""
+
+import random
+import sys
+import time
+from base64 import b64encode
+from typing import Callable
+
+from movies import serialization
+from movies.app import FILM_STORAGE, USER_STORAGE, server
+from movies.film import Film
+from movies.user import User
+from werkzeug.security import generate_password_hash
+
+HEADERS = {'Authorization': 'Basic {}'.format(b64encode(b'bench:bench').decode())}
+
+
+def seed(films: int, marks: int) -> None:
+    rnd = random.Random(0)
+    USER_STORAGE.add(User('bench', generate_password_hash('bench'), {}))
+    with FILM_STORAGE.bulk_load():
+        for number in range(films):
+            FILM_STORAGE.add(
+                Film(
+                    'film {}'.format(number),
+                    1900 + number % 120,
+                    [rnd.randint(0, 10) for _ in range(marks)],
+                    ['review {}'.format(number), 'Отзыв'],
+                )
+            )
+
+
+def pages() -> int:
+    client = server.test_client()
+    cursor = 0
+    size = 0
+    while cursor is not None:
+        response = client.get(
+            '/movies/api/v1.0/films?limit=1000&cursor={}'.format(cursor),
+            headers=HEADERS,
+        )
+        size += len(response.get_data())
+        cursor = response.get_json()['NEXT_CURSOR']
+    return size
+
+
+def stream() -> int:
+    client = server.test_client()
+    response = client.get('/movies/api/v1.0/films?format=ndjson', headers=HEADERS)
+    return len(response.get_data())
+
+
+def measure(run: Callable[[], int]) -> float:
+    started = time.perf_counter()
+    run()
+    return time.perf_counter() - started
+
+
+def reset() -> None:
+    for film in FILM_STORAGE:
+        film.encoded = None
+
+
+def main() -> None:
+    films = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    marks = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    seed(films, marks)
+    print('{:>8} {:>8} {:>10} {:>10}'.format('encoder', 'pass', 'pages s', 'ndjson s'))
+    encoders = [('json', False)]
+    if serialization.orjson is not None:
+        encoders.append(('orjson', True))
+    for name, use_orjson in encoders:
+        serialization.USE_ORJSON = use_orjson
+        reset()
+        cold_pages = measure(pages)
+        warm_pages = measure(pages)
+        reset()
+        cold_stream = measure(stream)
+        warm_stream = measure(stream)
+        print(
+            '{:>8} {:>8} {:>10.2f} {:>10.2f}'.format(
+                name, 'cold', cold_pages, cold_stream
+            )
+        )
+        print(
+            '{:>8} {:>8} {:>10.2f} {:>10.2f}'.format(
+                name, 'warm', warm_pages, warm_stream
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Память, занимаемая фильмами и оценками в каталоге.
+
+Запуск: python -m benchmarks.bench_memory [фильмов] [оценок на фильм]
+"""
+
+import random
+import sys
+import tracemalloc
+
+from movies.film import Film
+from movies.storage import FilmCatalog
+
+
+def measure(films: int, marks: int) -> int:
+    rnd = random.Random(0)
+    tracemalloc.start()
+    catalog = FilmCatalog()
+    for number in range(films):
+        film = Film('film{}'.format(number), 1900 + number % 120, [], [])
+        catalog.add(film)
+        for _ in range(marks):
+            catalog.add_mark(film, rnd.randint(0, 10))
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return used
+
+
+def main() -> None:
+    films = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    marks = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    empty = measure(films, 0)
+    full = measure(films, marks)
+    print('films:          {}'.format(films))
+    print('marks per film: {}'.format(marks))
+    print('bytes per film: {:.1f}'.format(empty / films))
+    print('bytes per mark: {:.2f}'.format((full - empty) / (films * marks)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""ТОП-100 по рейтингу Байеса: инкрементальный индекс против сортировки каталога.
+
+Запуск: python -m benchmarks.bench_ranking [фильмов] [оценок]
+"""
+
+import random
+import sys
+import time
+import timeit
+from typing import Optional
+
+from movies.film import Film, FilmKey
+from movies.ranking import Ranking, bayesian_score
+from movies.storage import Change, FilmCatalog
+
+FILMS = 100_000
+MARKS = 1_000_000
+TOP = 100
+REPEAT = 20
+
+
+def main() -> None:
+    films = int(sys.argv[1]) if len(sys.argv) > 1 else FILMS
+    marks = int(sys.argv[2]) if len(sys.argv) > 2 else MARKS
+    catalog = FilmCatalog()
+    for number in range(films):
+        catalog.add(Film('film{}'.format(number), 1900 + number % 120, [], []))
+    rnd = random.Random(1)
+    keys = list(catalog.keys())
+    weights = [1 / (rank + 1) for rank in range(films)]
+    stream = rnd.choices(keys, weights, k=marks)
+    # Средняя по каталогу медленно дрейфует от 7 к 5
+    values = [
+        min(10, max(0, round(rnd.gauss(7 - 2 * number / marks, 2))))
+        for number in range(marks)
+    ]
+
+    started = time.perf_counter()
+    for key, mark in zip(stream, values):
+        catalog.add_mark(catalog.get_by_key(key), mark)
+    plain = (time.perf_counter() - started) / marks
+
+    catalog = FilmCatalog()
+    for number in range(films):
+        catalog.add(Film('film{}'.format(number), 1900 + number % 120, [], []))
+    ranking = Ranking()
+
+    def rank(_: str, key: Optional[FilmKey], _change: Change = None) -> None:
+        if key is not None:
+            film = catalog.get_by_key(key)
+            ranking.update(key, film.count_marks, film.sum_marks)
+
+    catalog.listeners.append(rank)
+    started = time.perf_counter()
+    for key, mark in zip(stream, values):
+        catalog.add_mark(catalog.get_by_key(key), mark)
+    ranked = (time.perf_counter() - started) / marks
+
+    def scan() -> None:
+        prior = ranking.total / ranking.count
+        sorted(
+            (
+                (bayesian_score(film.count_marks, film.sum_marks, prior, 10), film.name)
+                for film in catalog
+                if film.count_marks
+            ),
+            reverse=True,
+        )[:TOP]
+
+    sort_ms = timeit.timeit(scan, number=REPEAT) / REPEAT * 1e3
+    started = time.perf_counter()
+    ranking.top('bayesian', TOP)
+    first_ms = (time.perf_counter() - started) * 1e3
+    top_ms = (
+        timeit.timeit(lambda: ranking.top('bayesian', TOP), number=REPEAT)
+        / REPEAT
+        * 1e3
+    )
+    wilson_ms = (
+        timeit.timeit(lambda: ranking.top('wilson', TOP), number=REPEAT) / REPEAT * 1e3
+    )
+    print('films {}, marks {}, prior {:.2f}'.format(films, marks, ranking.prior))
+    print(
+        'add_mark:             {:.2f} us -> {:.2f} us'.format(plain * 1e6, ranked * 1e6)
+    )
+    print('top {} by sorting:    {:.2f} ms'.format(TOP, sort_ms))
+    print(
+        'top {} bayesian:      {:.3f} ms first, {:.3f} ms next'.format(
+            TOP, first_ms, top_ms
+        )
+    )
+    print('top {} wilson:        {:.3f} ms'.format(TOP, wilson_ms))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Время восстановления каталога при старте для разных хранилищ.
+
+Запуск: python -m benchmarks.bench_recovery [фильмов ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+from movies.film import Film
+from movies.persistence import JournalBackend, SqliteBackend, StorageBackend
+from movies.storage import FilmCatalog, UserRegistry
+from movies.user import User
+
+SIZES = [10_000, 100_000]
+MARKS_PER_FILM = 5
+
+
+def fill(backend: StorageBackend, size: int) -> None:
+    films, users = FilmCatalog(), UserRegistry()
+    backend.restore(films, users)
+    # Повторная оценка заменяет прежнюю, поэтому каждую оценку ставит свой пользователь
+    raters = [
+        User('bench{}'.format(number), 'hash', {}) for number in range(MARKS_PER_FILM)
+    ]
+    for user in raters:
+        users.add(user)
+        backend.record_user(user)
+    for number in range(size):
+        film = Film('film{}'.format(number), 1900 + number % 120, [], [])
+        films.add(film)
+        backend.record_film(film)
+        for mark, user in enumerate(raters):
+            user.add_review_or_mark(film, films, mark)
+            backend.record_mark(user.name, film, mark)
+    backend.close()
+
+
+def recover(backend: StorageBackend) -> float:
+    started = time.perf_counter()
+    backend.restore(FilmCatalog(), UserRegistry())
+    elapsed = time.perf_counter() - started
+    backend.close()
+    return elapsed
+
+
+def main() -> None:
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    backends: Dict[str, Callable[[str], StorageBackend]] = {
+        'sqlite': lambda path: SqliteBackend(os.path.join(path, 'movies.db')),
+        'journal': lambda path: JournalBackend(path, snapshot_every=10**12),
+        'snapshot': lambda path: JournalBackend(path, snapshot_every=50_000),
+    }
+    print('{:>10} {:>10} {:>12}'.format('films', 'storage', 'recovery s'))
+    for size in sizes:
+        for name, factory in backends.items():
+            with tempfile.TemporaryDirectory() as path:
+                fill(factory(path), size)
+                elapsed = recover(factory(path))
+            print('{:>10} {:>10} {:>12.2f}'.format(size, name, elapsed))
+
+
+if __name__ == '__main__':
+    main()
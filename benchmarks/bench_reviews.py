@@ -0,0 +1,104 @@
+"""Память под отзывы: строки в списках фильмов и пользователей против хранилища отзывов.
+
+Каждый вариант запускается в отдельном процессе, память - прирост RSS.
+Запуск: python -m benchmarks.bench_reviews [отзывов]
+"""
+
+import gc
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from movies.reviews import ReviewStore
+
+REVIEWS = 10_000_000
+REVIEWS_PER_FILM = 100
+REVIEWS_PER_USER = 50
+READS = 10_000
+WORDS = ['word{}'.format(number) for number in range(2000)]
+
+
+def texts(count: int) -> Iterator[str]:
+    rnd = random.Random(1)
+    for _ in range(count):
+        yield ' '.join(rnd.choices(WORDS, k=rnd.randint(5, 40)))
+
+
+def rss() -> int:
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * 4096
+
+
+def fill_lists(count: int) -> Callable[[int], str]:
+    """Как раньше: строка в списке фильма и она же в истории пользователя"""
+    films: List[List[str]] = [[] for _ in range(count // REVIEWS_PER_FILM + 1)]
+    users: List[List[Tuple[float, str]]] = [
+        [] for _ in range(count // REVIEWS_PER_USER + 1)
+    ]
+    for number, text in enumerate(texts(count)):
+        films[number // REVIEWS_PER_FILM].append(text)
+        users[number % len(users)].append((float(number), text))
+    return lambda number: films[number // REVIEWS_PER_FILM][number % REVIEWS_PER_FILM]
+
+
+def fill_store(count: int, spill_dir: Optional[str] = None) -> Callable[[int], str]:
+    """Текст один раз в хранилище, фильм и пользователь держат только id"""
+    store = ReviewStore(spill_dir=spill_dir)
+    films = [array('q') for _ in range(count // REVIEWS_PER_FILM + 1)]
+    users = [(array('d'), array('q')) for _ in range(count // REVIEWS_PER_USER + 1)]
+    for number, text in enumerate(texts(count)):
+        review_id = store.add(text)
+        films[number // REVIEWS_PER_FILM].append(review_id)
+        times, ids = users[number % len(users)]
+        times.append(float(number))
+        ids.append(review_id)
+    return lambda number: store.get(
+        films[number // REVIEWS_PER_FILM][number % REVIEWS_PER_FILM]
+    )
+
+
+def run(mode: str, count: int) -> None:
+    before = rss()
+    started = time.perf_counter()
+    if mode == 'lists':
+        get = fill_lists(count)
+    elif mode == 'store':
+        get = fill_store(count)
+    else:
+        get = fill_store(count, tempfile.gettempdir())
+    filled = time.perf_counter() - started
+    gc.collect()
+    used = rss() - before
+    rnd = random.Random(2)
+    started = time.perf_counter()
+    for _ in range(READS):
+        get(rnd.randrange(count))
+    read = (time.perf_counter() - started) / READS
+    print(
+        '{:>12} {:>10} {:>10.0f} {:>10.1f} {:>10.1f}'.format(
+            count, mode, used / 2**20, filled, read * 1e6
+        )
+    )
+
+
+def main() -> None:
+    if sys.argv[1:2] == ['--run']:
+        run(sys.argv[2], int(sys.argv[3]))
+        return
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else REVIEWS
+    print(
+        '{:>12} {:>10} {:>10} {:>10} {:>10}'.format(
+            'reviews', 'layout', 'memory MB', 'fill s', 'read us'
+        )
+    )
+    for mode in ('lists', 'store', 'spill'):
+        args = [sys.executable, '-m', 'benchmarks.bench_reviews', '--run', mode]
+        subprocess.check_call(args + [str(count)])
+
+
+if __name__ == '__main__':
+    main()
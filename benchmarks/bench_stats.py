@@ -0,0 +1,84 @@
+"""Распределение оценок: обход Film.marks в цикле Python и суммы RatingTotals.
+
+Запуск: python -m benchmarks.bench_stats [фильмов] [оценок]
+"""
+
+import random
+import sys
+import timeit
+from math import sqrt
+from typing import Any, Dict, List
+
+from movies.analytics import RatingTotals, describe, histogram, numpy
+from movies.film import Film
+from movies.storage import FilmCatalog
+
+FILMS = 100_000
+MARKS = 10_000_000
+POINTS = (50, 90, 99)
+REPEAT = 5
+
+
+def loop_catalog(catalog: FilmCatalog) -> Dict[str, Any]:
+    """Как без колонок: перебираем каждую оценку каждого фильма"""
+    hist = [0] * 11
+    for film in catalog:
+        for mark in film.marks:
+            hist[mark] += 1
+    return describe(hist, POINTS)
+
+
+def loop_years(catalog: FilmCatalog) -> List[Dict[str, Any]]:
+    years: Dict[int, List[int]] = {}
+    for film in catalog:
+        row = years.setdefault(film.year, [0, 0, 0])
+        for mark in film.marks:
+            row[0] += 1
+            row[1] += mark
+            row[2] += mark * mark
+    result = []
+    for year, (count, total, squares) in sorted(years.items()):
+        mean = total / count if count else 0
+        spread = sqrt(max(0.0, squares / count - mean * mean)) if count else 0.0
+        result.append({'year': year, 'average': mean, 'stddev': spread})
+    return result
+
+
+def main() -> None:
+    films = int(sys.argv[1]) if len(sys.argv) > 1 else FILMS
+    marks = int(sys.argv[2]) if len(sys.argv) > 2 else MARKS
+    rnd = random.Random(1)
+    catalog = FilmCatalog()
+    totals = RatingTotals()
+    catalog.listeners.append(
+        lambda kind, key, change: totals.add_film(
+            key[1], catalog.get_by_key(key).marks.tobytes()
+        )
+    )
+    with catalog.bulk_load():
+        for number in range(films):
+            values = [rnd.randint(0, 10) for _ in range(marks // films)]
+            catalog.add(Film('film{}'.format(number), 1900 + number % 120, values, []))
+    catalog.listeners.clear()
+
+    def totals_catalog() -> Dict[str, Any]:
+        return describe(totals.histogram(), POINTS)
+
+    assert loop_catalog(catalog) == totals_catalog()
+    film = next(iter(catalog))
+    cases = [
+        ('loop catalog', lambda: loop_catalog(catalog)),
+        ('totals catalog', totals_catalog),
+        ('loop years', lambda: loop_years(catalog)),
+        ('totals years', totals.by_year),
+        ('film', lambda: describe(histogram(film.marks.tobytes()), POINTS)),
+    ]
+    print('numpy: {}'.format('yes' if numpy is not None else 'no'))
+    print('{:>16} {:>12}'.format('case', 'ms'))
+    for name, case in cases:
+        best = min(timeit.repeat(case, number=1, repeat=REPEAT))
+        print('{:>16} {:>12.2f}'.format(name, best * 1e3))
+
+
+if __name__ == '__main__':
+    main()
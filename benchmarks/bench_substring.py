@@ -0,0 +1,74 @@
+"""Поиск по подстроке: полный проход по названиям против триграммного индекса.
+
+Запуск: python -m benchmarks.bench_substring [размер ...]
+"""
+
+import random
+import string
+import sys
+import time
+from typing import List
+
+from movies.index import SubstringIndex
+
+SIZES = [10_000, 100_000, 1_000_000]
+QUERIES = 200
+
+
+def make_titles(size: int) -> List[str]:
+    rnd = random.Random(size)
+    words = [
+        ''.join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 8))).title()
+        for _ in range(5_000)
+    ]
+    return [' '.join(rnd.choices(words, k=rnd.randint(1, 3))) for _ in range(size)]
+
+
+def scan(titles: List[str], substring: str) -> List[str]:
+    return [title for title in titles if title.find(substring) != -1]
+
+
+def run(size: int) -> None:
+    titles = make_titles(size)
+    started = time.perf_counter()
+    index = SubstringIndex()
+    for number, title in enumerate(titles):
+        index.add((title, number), title)
+    build = time.perf_counter() - started
+
+    rnd = random.Random(0)
+    queries = []
+    for title in rnd.choices(titles, k=QUERIES):
+        start = rnd.randrange(max(1, len(title) - 4))
+        queries.append(title[start : start + 5])
+
+    started = time.perf_counter()
+    for query in queries:
+        scan(titles, query)
+    scan_ms = (time.perf_counter() - started) / QUERIES * 1000
+
+    started = time.perf_counter()
+    for query in queries:
+        list(index.search(query))
+    index_ms = (time.perf_counter() - started) / QUERIES * 1000
+
+    print(
+        '{:>10} {:>10.1f} {:>12.3f} {:>12.3f} {:>8.1f}x'.format(
+            size, build, scan_ms, index_ms, scan_ms / index_ms
+        )
+    )
+
+
+def main() -> None:
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    print(
+        '{:>10} {:>10} {:>12} {:>12} {:>9}'.format(
+            'titles', 'build s', 'scan ms', 'index ms', 'speedup'
+        )
+    )
+    for size in sizes:
+        run(size)
+
+
+if __name__ == '__main__':
+    main()
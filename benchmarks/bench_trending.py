@@ -0,0 +1,66 @@
+"""Самые оцениваемые фильмы: сортировка каталога против счетчиков Space-Saving.
+
+Запуск: python -m benchmarks.bench_trending [фильмов] [оценок]
+"""
+
+import random
+import sys
+import time
+import timeit
+from collections import Counter
+
+from movies.film import Film
+from movies.storage import FilmCatalog
+from movies.topk import Trending
+from movies.trending import CAPACITY, WINDOWS
+
+FILMS = 100_000
+MARKS = 1_000_000
+TOP = 100
+REPEAT = 20
+
+
+def main() -> None:
+    films = int(sys.argv[1]) if len(sys.argv) > 1 else FILMS
+    marks = int(sys.argv[2]) if len(sys.argv) > 2 else MARKS
+    catalog = FilmCatalog()
+    for number in range(films):
+        catalog.add(Film('film{}'.format(number), 1900 + number % 120, [], []))
+    keys = list(catalog.keys())
+    # Популярность фильмов распределена по закону Ципфа
+    weights = [1 / (rank + 1) for rank in range(films)]
+    stream = random.Random(1).choices(keys, weights, k=marks)
+
+    started = time.perf_counter()
+    for key in stream:
+        catalog.add_mark(catalog.get_by_key(key), 5)
+    plain = (time.perf_counter() - started) / marks
+
+    trending = Trending(CAPACITY, WINDOWS)
+    catalog.listeners.append(lambda kind, key, change: trending.add(key))
+    started = time.perf_counter()
+    for key in stream:
+        catalog.add_mark(catalog.get_by_key(key), 5)
+    counted = (time.perf_counter() - started) / marks
+
+    def scan() -> None:
+        sorted(catalog, key=Film.get_count_marks, reverse=True)[:TOP]
+
+    sort_ms = timeit.timeit(scan, number=REPEAT) / REPEAT * 1e3
+    all_ms = timeit.timeit(lambda: trending.top('all', TOP), number=REPEAT)
+    hour_ms = timeit.timeit(lambda: trending.top('hour', TOP), number=REPEAT)
+
+    exact = {key for key, _ in Counter(stream).most_common(TOP)}
+    found = {key for key, _, _ in trending.top('all', TOP)}
+    print('films {}, marks {}, counters {}'.format(films, marks, CAPACITY))
+    print(
+        'add_mark:          {:.2f} us -> {:.2f} us'.format(plain * 1e6, counted * 1e6)
+    )
+    print('top {} by sorting: {:.2f} ms'.format(TOP, sort_ms))
+    print('top {} all time:   {:.3f} ms'.format(TOP, all_ms / REPEAT * 1e3))
+    print('top {} last hour:  {:.3f} ms'.format(TOP, hour_ms / REPEAT * 1e3))
+    print('recall of exact top {}: {:.0%}'.format(TOP, len(exact & found) / TOP))
+
+
+if __name__ == '__main__':
+    main()
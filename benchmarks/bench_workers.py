@@ -0,0 +1,87 @@
+"""Нагрузочный тест: пропускная способность при 1, 2 и 4 рабочих процессах.
+
+Запуск: python -m benchmarks.bench_workers [клиентов] [запросов на клиента]
+Клиенты запускаются отдельными процессами, чтобы не упираться в GIL
+процесса, который создает нагрузку.
+"""
+
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+from base64 import b64encode
+from typing import Dict, List, Tuple
+
+from movies.cluster import start_workers, stop_workers
+
+HEADERS = {
+    'Authorization': 'Basic {}'.format(b64encode(b'bench:bench').decode()),
+    'Content-Type': 'application/json',
+}
+PATH = '/movies/api/v1.0/get_average/film/2000'
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return int(sock.getsockname()[1])
+
+
+def post(port: int, path: str, body: Dict[str, object]) -> None:
+    for _ in range(100):
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            connection.request('POST', path, json.dumps(body), HEADERS)
+            connection.getresponse().read()
+            connection.close()
+            return
+        except ConnectionError:
+            time.sleep(0.1)
+
+
+def client(args: Tuple[int, int]) -> int:
+    port, requests = args
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    for _ in range(requests):
+        connection.request('GET', PATH, headers=HEADERS)
+        connection.getresponse().read()
+    connection.close()
+    return requests
+
+
+def load(port: int, clients: int, requests: int) -> float:
+    with multiprocessing.Pool(clients) as pool:
+        started = time.perf_counter()
+        done: List[int] = pool.map(client, [(port, requests)] * clients)
+        elapsed = time.perf_counter() - started
+    return sum(done) / elapsed
+
+
+def main() -> None:
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    directory = tempfile.mkdtemp()
+    os.environ['MOVIES_STORAGE'] = 'sqlite://' + os.path.join(directory, 'bench.db')
+    port = free_port()
+
+    print('{:>8} {:>10}'.format('workers', 'req/s'))
+    for workers in (1, 2, 4):
+        processes = start_workers('127.0.0.1', port, workers)
+        post(
+            port,
+            '/movies/api/v1.0/create_account',
+            {'username': 'bench', 'password': 'bench'},
+        )
+        post(port, '/movies/api/v1.0/bench/add', {'name': 'film', 'year': 2000})
+        time.sleep(1)
+        rps = load(port, clients, requests)
+        stop_workers(processes)
+        print('{:>8} {:>10.0f}'.format(workers, rps))
+
+
+if __name__ == '__main__':
+    main()
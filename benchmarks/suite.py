@@ -0,0 +1,367 @@
+"""Набор нагрузочных тестов всех маршрутов API.
+
+Запуск: python -m benchmarks.suite [--films N] [--users N] [--requests N]
+        [--mode client|http|all] [--clients N] [--output файл.json]
+        [--compare прошлый.json]
+
+Каталог и пользователи создаются напрямую в хранилищах. Каждый маршрут
+вызывается через server.test_client() и через локальный HTTP-сервер
+werkzeug. Для каждого маршрута считаются запросы в секунду и задержки
+p50/p95/p99, для каталога - занятая память. Результат сохраняется в JSON,
+с --compare выводится отношение к прошлому прогону.
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import platform
+import random
+import resource
+import subprocess
+import threading
+import time
+import tracemalloc
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from movies.app import FILM_STORAGE, USER_STORAGE, server
+from movies.film import Film
+from movies.responses import RESPONSES
+from movies.user import User
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import make_server
+
+API = '/movies/api/v1.0'
+HEADERS = {
+    'Authorization': 'Basic {}'.format(b64encode(b'bench:bench').decode()),
+    'Content-Type': 'application/json',
+}
+
+Call = Tuple[str, str, Optional[bytes]]
+Sender = Callable[[str, str, Optional[bytes]], int]
+Stats = Dict[str, float]
+
+COUNTER = count()
+
+
+def film_name(number: int) -> str:
+    return 'film {}'.format(number)
+
+
+def endpoints(films: int) -> Dict[str, Callable[[random.Random], Call]]:
+    """Маршруты и генераторы запросов к ним"""
+
+    def film(rnd: random.Random) -> Tuple[str, int]:
+        number = rnd.randrange(films)
+        return film_name(number), 1900 + number % 120
+
+    def body(data: Any) -> bytes:
+        return json.dumps(data).encode()
+
+    def path(route: str, rnd: random.Random) -> str:
+        name, year = film(rnd)
+        return '{}/{}/{}/{}'.format(API, route, name, year)
+
+    def mark(rnd: random.Random) -> Call:
+        name, year = film(rnd)
+        data = {'name': name, 'year': year, 'mark': rnd.randint(0, 10)}
+        return 'POST', API + '/bench/add_mark', body(data)
+
+    def review(rnd: random.Random) -> Call:
+        name, year = film(rnd)
+        data = {'name': name, 'year': year, 'review': 'review'}
+        return 'POST', API + '/bench/add_review', body(data)
+
+    def marks_batch(rnd: random.Random) -> Call:
+        items = []
+        for _ in range(100):
+            name, year = film(rnd)
+            items.append({'name': name, 'year': year, 'mark': rnd.randint(0, 10)})
+        return 'POST', API + '/bench/add_marks_batch', body(items)
+
+    def create_film(_: random.Random) -> Call:
+        data = {'name': 'new film {}'.format(next(COUNTER)), 'year': 2020}
+        return 'POST', API + '/bench/add', body(data)
+
+    def reviews_batch(rnd: random.Random) -> Call:
+        items = []
+        for _ in range(100):
+            name, year = film(rnd)
+            items.append({'name': name, 'year': year, 'review': 'review'})
+        return 'POST', API + '/bench/add_reviews_batch', body(items)
+
+    def films_batch(_: random.Random) -> Call:
+        items = [
+            {'name': 'new film {}'.format(next(COUNTER)), 'year': 2020}
+            for _ in range(100)
+        ]
+        return 'POST', API + '/bench/add_films_batch', body(items)
+
+    def create_account(_: random.Random) -> Call:
+        data = {'username': 'new {}'.format(next(COUNTER)), 'password': 'password'}
+        return 'POST', API + '/create_account', body(data)
+
+    return {
+        'get_average': lambda rnd: ('GET', path('get_average', rnd), None),
+        'get_count_reviews': lambda rnd: ('GET', path('get_count_reviews', rnd), None),
+        'get_count_marks': lambda rnd: ('GET', path('get_count_marks', rnd), None),
+        'get_reviews': lambda rnd: ('GET', path('get_reviews', rnd), None),
+        'films': lambda rnd: ('GET', API + '/films?limit=100', None),
+        'films_ndjson': lambda rnd: ('GET', API + '/films?format=ndjson', None),
+        'substring': lambda rnd: (
+            'GET',
+            API + '/get_films/substring/film {}?limit=100'.format(rnd.randrange(100)),
+            None,
+        ),
+        'average': lambda rnd: ('GET', API + '/get_films/average/5?limit=100', None),
+        'average_range': lambda rnd: (
+            'GET',
+            API + '/get_films/average/4/6?limit=100',
+            None,
+        ),
+        'top': lambda rnd: ('GET', API + '/get_films/top?limit=100', None),
+        'bottom': lambda rnd: ('GET', API + '/get_films/bottom?limit=100', None),
+        'ranked': lambda rnd: ('GET', API + '/get_films/ranked?limit=100', None),
+        'query': lambda rnd: (
+            'GET',
+            API + '/get_films/query?substring=film 1&year_from=1950&sort=-average',
+            None,
+        ),
+        'history': lambda rnd: ('GET', API + '/bench/history?limit=100', None),
+        'trending': lambda rnd: ('GET', API + '/trending/marks?limit=100', None),
+        'stats_catalog': lambda rnd: ('GET', API + '/stats/catalog', None),
+        'stats_film': lambda rnd: ('GET', path('stats/film', rnd), None),
+        'stats_years': lambda rnd: ('GET', API + '/stats/years', None),
+        'metrics': lambda rnd: ('GET', '/metrics', None),
+        'add_mark': mark,
+        'add_review': review,
+        'add_marks_batch': marks_batch,
+        'add_reviews_batch': reviews_batch,
+        'add_films_batch': films_batch,
+        'create_film': create_film,
+        'create_account': create_account,
+    }
+
+
+# Создание аккаунта считает хеш пароля, а пакет несет сто записей, поэтому
+# запросов к ним меньше
+SLOW = {
+    'create_account': 10,
+    'add_marks_batch': 10,
+    'add_reviews_batch': 10,
+    'add_films_batch': 10,
+    'films_ndjson': 10,
+}
+
+# Первый запрос с паролем считает его хеш и открывает соединение, поэтому
+# он отправляется до замера
+WARM_UP: Call = ('GET', API + '/bench/history?limit=1', None)
+
+
+def seed(films: int, users: int, marks: int) -> Stats:
+    """Заполняем хранилища и возвращаем занятую ими память"""
+    rnd = random.Random(0)
+    FILM_STORAGE.clear()
+    USER_STORAGE.clear()
+    tracemalloc.start()
+    with FILM_STORAGE.bulk_load():
+        for number in range(films):
+            film = Film(film_name(number), 1900 + number % 120, [], [])
+            FILM_STORAGE.add(film)
+            for _ in range(marks):
+                FILM_STORAGE.add_mark(film, rnd.randint(0, 10))
+    catalog, _ = tracemalloc.get_traced_memory()
+    password = generate_password_hash('password')
+    for number in range(users):
+        USER_STORAGE.add(User('user {}'.format(number), password, {}))
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    USER_STORAGE.add(User('bench', generate_password_hash('bench'), {}))
+    return {
+        'catalog_bytes': catalog,
+        'users_bytes': used - catalog,
+        'bytes_per_film': catalog / films if films else 0.0,
+    }
+
+
+def percentile(latencies: List[float], share: float) -> float:
+    return latencies[min(len(latencies) - 1, int(len(latencies) * share))] * 1000
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int) -> Stats:
+    latencies.sort()
+    return {
+        'ops': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'errors': errors,
+    }
+
+
+def drive(
+    senders: List[Sender], make_call: Callable[[random.Random], Call], requests: int
+) -> Stats:
+    """Отправляем запросы от каждого клиента и собираем задержки"""
+
+    for sender in senders:
+        sender(*WARM_UP)
+
+    def run(number: int) -> Tuple[List[float], int]:
+        rnd = random.Random(number)
+        latencies = []
+        errors = 0
+        for _ in range(requests):
+            call = make_call(rnd)
+            started = time.perf_counter()
+            if senders[number](*call) >= 400:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(senders)) as pool:
+        results = list(pool.map(run, range(len(senders))))
+    elapsed = time.perf_counter() - started
+    return summarize(
+        [latency for latencies, _ in results for latency in latencies],
+        elapsed,
+        sum(errors for _, errors in results),
+    )
+
+
+def client_sender() -> Sender:
+    client = server.test_client()
+
+    def send(method: str, path: str, body: Optional[bytes]) -> int:
+        return client.open(path, method=method, data=body, headers=HEADERS).status_code
+
+    return send
+
+
+def http_sender(port: int) -> Sender:
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+
+    def send(method: str, path: str, body: Optional[bytes]) -> int:
+        connection.request(method, path.replace(' ', '%20'), body, HEADERS)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+
+    return send
+
+
+def run_mode(
+    mode: str, calls: Dict[str, Callable[[random.Random], Call]], args: Any
+) -> Dict[str, Stats]:
+    results = {}
+    wsgi_server = None
+    if mode == 'http':
+        wsgi_server = make_server('127.0.0.1', 0, server, threaded=True)
+        threading.Thread(target=wsgi_server.serve_forever, daemon=True).start()
+        clients = args.clients
+    else:
+        clients = 1
+    for name, make_call in calls.items():
+        if wsgi_server is not None:
+            senders = [http_sender(wsgi_server.server_port) for _ in range(clients)]
+        else:
+            senders = [client_sender()]
+        requests = min(args.requests, SLOW.get(name, args.requests))
+        results[name] = drive(senders, make_call, max(1, requests // len(senders)))
+        print(
+            '{:>6} {:>18} {:>10.0f} {:>8.2f} {:>8.2f} {:>8.2f} {:>7.0f}'.format(
+                mode,
+                name,
+                results[name]['ops'],
+                results[name]['p50_ms'],
+                results[name]['p95_ms'],
+                results[name]['p99_ms'],
+                results[name]['errors'],
+            )
+        )
+    if wsgi_server is not None:
+        wsgi_server.shutdown()
+    return results
+
+
+def commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def compare(current: Dict[str, Any], path: str) -> None:
+    """Выводим отношение запросов в секунду к прошлому прогону"""
+    with open(path, encoding='utf-8') as previous_file:
+        previous = json.load(previous_file)
+    print('\ncompared with {} ({})'.format(path, previous.get('commit', '')))
+    for mode, results in current['results'].items():
+        for name, stats in results.items():
+            old = previous.get('results', {}).get(mode, {}).get(name)
+            if old and old['ops']:
+                print(
+                    '{:>6} {:>18} {:>9.2f}x'.format(
+                        mode, name, stats['ops'] / old['ops']
+                    )
+                )
+
+
+def parse_args() -> Any:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--films', type=int, default=10000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--marks', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--mode', choices=('client', 'http', 'all'), default='all')
+    parser.add_argument('--endpoints', default='')
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--output', default='bench-results.json')
+    parser.add_argument('--compare', default='')
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    if args.no_cache:
+        RESPONSES.maxsize = 0
+    memory = seed(args.films, args.users, args.marks)
+    calls = endpoints(args.films)
+    if args.endpoints:
+        calls = {name: calls[name] for name in args.endpoints.split(',')}
+    modes = ('client', 'http') if args.mode == 'all' else (args.mode,)
+
+    print(
+        '{:>6} {:>18} {:>10} {:>8} {:>8} {:>8} {:>7}'.format(
+            'mode', 'endpoint', 'ops/s', 'p50 ms', 'p95 ms', 'p99 ms', 'errors'
+        )
+    )
+    report: Dict[str, Any] = {
+        'commit': commit(),
+        'python': platform.python_version(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'params': vars(args),
+        'memory': memory,
+        'results': {mode: run_mode(mode, calls, args) for mode in modes},
+    }
+    memory['max_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print('\nmemory: {}'.format(memory))
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=2)
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
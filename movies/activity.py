@@ -0,0 +1,74 @@
+from array import array
+from bisect import bisect_left
+from typing import Any, List, Optional, Tuple
+
+from movies.film import Film, FilmKey
+from movies.reviews import REVIEWS
+
+
+class Activity:
+    """Действия пользователя с одним фильмом: последняя оценка и все отзывы.
+
+    mark_index - позиция оценки пользователя в массиве оценок фильма,
+    по ней повторная оценка заменяется за O(1). Отзывы хранятся как id
+    в хранилище отзывов, тексты загружаются только при чтении.
+    """
+
+    __slots__ = (
+        'mark',
+        'mark_index',
+        'marked_at',
+        'review_ids',
+        'review_times',
+        'updated_at',
+    )
+
+    def __init__(self) -> None:
+        self.mark: Optional[int] = None
+        self.mark_index: Optional[int] = None
+        self.marked_at: Optional[float] = None
+        self.review_ids = array('q')
+        self.review_times = array('d')
+        self.updated_at = 0.0
+
+    @property
+    def reviews(self) -> List[Tuple[float, str]]:
+        return list(zip(self.review_times, REVIEWS.get_many(self.review_ids)))
+
+    def add_review(self, at: float, review_id: int) -> None:
+        self.review_times.append(at)
+        self.review_ids.append(review_id)
+
+    def create_dict(self, key: FilmKey) -> Any:
+        return {
+            'name': key[0],
+            'year': key[1],
+            'mark': self.mark,
+            'marked_at': self.marked_at,
+            'reviews': [{'review': review, 'time': at} for at, review in self.reviews],
+            'updated_at': self.updated_at,
+        }
+
+    def to_list(self, film: Film) -> List[Any]:
+        """Представление для снимка состояния.
+
+        Вместо текстов отзывов - их позиции в отзывах фильма: id отзывов
+        фильма возрастают, поэтому позиция находится бинарным поиском.
+        """
+        positions = [bisect_left(film.review_ids, i) for i in self.review_ids]
+        return [
+            self.mark,
+            self.mark_index,
+            self.marked_at,
+            [list(review) for review in zip(self.review_times, positions)],
+            self.updated_at,
+        ]
+
+    @classmethod
+    def from_list(cls, data: List[Any], film: Film) -> 'Activity':
+        activity = cls()
+        activity.mark, activity.mark_index, activity.marked_at = data[:3]
+        for at, position in data[3]:
+            activity.add_review(at, film.review_ids[position])
+        activity.updated_at = data[4]
+        return activity
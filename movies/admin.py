@@ -0,0 +1,62 @@
+import os
+from functools import wraps
+from typing import Any, Callable
+
+from flask import Blueprint, Response, request
+from movies.auth import auth
+from movies.profiler import PROFILER
+from movies.query import TRUE_VALUES
+from movies.serialization import jsonify
+
+api = Blueprint('admin', __name__, url_prefix='/movies/api/v1.0/admin')
+
+ADMINS = set(filter(None, os.environ.get('MOVIES_ADMINS', '').split(',')))
+
+MIN_INTERVAL = 0.001
+
+
+def admin_required(view: Callable[..., Any]) -> Callable[..., Any]:
+    """Пускаем только пользователей из MOVIES_ADMINS"""
+
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if auth.username() not in ADMINS:
+            return jsonify({'ERROR': 'Administrator rights required'}), 403
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+@api.route('/profiler/start', methods=['POST'])
+@auth.login_required
+@admin_required
+def start_profiler() -> Any:
+    """Запускаем профилировщик, interval - период снятия стеков в миллисекундах"""
+    data = request.get_json(silent=True) or {}
+    try:
+        interval = max(MIN_INTERVAL, float(data.get('interval', 5)) / 1000)
+    except (TypeError, ValueError):
+        return jsonify({'ERROR': 'Interval must be a number, check it'}), 400
+    if not PROFILER.start(interval):
+        return jsonify({'ERROR': 'Profiler is already running'}), 400
+    return jsonify({'PROFILER': 'started'})
+
+
+@api.route('/profiler/stop', methods=['POST'])
+@auth.login_required
+@admin_required
+def stop_profiler() -> Any:
+    if not PROFILER.stop():
+        return jsonify({'ERROR': 'Profiler is not running'}), 400
+    return jsonify({'PROFILER': 'stopped'})
+
+
+@api.route('/profiler', methods=['GET'])
+@auth.login_required
+@admin_required
+def get_profile() -> Any:
+    """Собранные стеки в формате collapsed, можно отфильтровать по route"""
+    text = PROFILER.collapsed(request.args.get('route'))
+    if request.args.get('clear', '').lower() in TRUE_VALUES:
+        PROFILER.clear()
+    return Response(text, mimetype='text/plain')
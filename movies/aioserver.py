@@ -0,0 +1,205 @@
+import asyncio
+import sys
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from movies import asgi
+from movies.asgi import AsgiApp, Headers, Message, application, send_error
+
+KEEP_ALIVE = 5.0
+READ_TIMEOUT = 30.0
+MAX_HEADERS = 100
+
+
+class RejectedRequest(Exception):
+    """Запрос, тело которого сервер не будет читать"""
+
+    def __init__(self, status: int, body: bytes) -> None:
+        Exception.__init__(self, body.decode())
+        self.status = status
+        self.body = body
+
+
+class HttpConnection:
+    """Одно соединение HTTP/1.1 встроенного сервера на asyncio"""
+
+    def __init__(
+        self, app: AsgiApp, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.app = app
+        self.reader = reader
+        self.writer = writer
+        self.chunked = False
+        self.keep_alive = True
+
+    async def read_request(self) -> Optional[Tuple[str, str, str, Headers]]:
+        line = await asyncio.wait_for(self.reader.readline(), KEEP_ALIVE)
+        if not line:
+            return None
+        method, target, version = line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+        headers = await asyncio.wait_for(self.read_headers(), READ_TIMEOUT)
+        return method, target, version, headers
+
+    async def read_headers(self) -> Headers:
+        """Заголовки до пустой строки, не больше MAX_HEADERS.
+
+        Лишние заголовки нельзя просто отбросить: их строки читались бы
+        как следующий запрос на том же соединении.
+        """
+        headers: Headers = []
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                return headers
+            if len(headers) >= MAX_HEADERS:
+                raise RejectedRequest(431, b'Too many request headers')
+            name, _, value = line.decode('latin-1').partition(':')
+            headers.append(
+                (
+                    name.strip().lower().encode('latin-1'),
+                    value.strip().encode('latin-1'),
+                )
+            )
+
+    async def serve(self) -> None:
+        try:
+            while self.keep_alive:
+                try:
+                    request = await self.read_request()
+                except RejectedRequest as error:
+                    await self.reject(error)
+                    break
+                if request is None:
+                    break
+                await self.handle(*request)
+                await self.writer.drain()
+        except (asyncio.TimeoutError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.writer.close()
+
+    async def reject(self, error: RejectedRequest) -> None:
+        # Запрос не дочитан, поэтому следующий запрос на соединении не разобрать
+        self.keep_alive = False
+        await send_error(self.send, error.status, error.body)
+        await self.writer.drain()
+
+    def body_length(self, headers: Headers) -> int:
+        """Длина тела запроса по Content-Length, до чтения самого тела.
+
+        Transfer-Encoding не поддерживается: тело такого запроса иначе
+        читалось бы как следующий запрос на том же соединении.
+        """
+        if any(name == b'transfer-encoding' for name, _ in headers):
+            raise RejectedRequest(501, b'Transfer-Encoding is not supported')
+        lengths = {value for name, value in headers if name == b'content-length'}
+        if not lengths:
+            return 0
+        length = lengths.pop()
+        if lengths or not length.isdigit():
+            raise RejectedRequest(400, b'Invalid Content-Length')
+        if int(length) > asgi.MAX_BODY:
+            raise RejectedRequest(413, b'Request body is too large')
+        return int(length)
+
+    async def handle(
+        self, method: str, target: str, version: str, headers: Headers
+    ) -> None:
+        values = dict(headers)
+        try:
+            length = self.body_length(headers)
+        except RejectedRequest as error:
+            await self.reject(error)
+            return
+        body = b''
+        if length:
+            body = await asyncio.wait_for(self.reader.readexactly(length), READ_TIMEOUT)
+        connection = values.get(b'connection', b'').lower()
+        self.keep_alive = (
+            connection != b'close'
+            if version == 'HTTP/1.1'
+            else connection == b'keep-alive'
+        )
+        path, _, query = target.partition('?')
+        scope: Dict[str, Any] = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': version[len('HTTP/') :],
+            'method': method.upper(),
+            'scheme': 'http',
+            'path': unquote(path),
+            'raw_path': path.encode('latin-1'),
+            'query_string': query.encode('latin-1'),
+            'root_path': '',
+            'headers': headers,
+            'client': self.writer.get_extra_info('peername'),
+            'server': self.writer.get_extra_info('sockname'),
+        }
+        messages: List[Message] = [{'type': 'http.request', 'body': body}]
+
+        async def receive() -> Message:
+            if messages:
+                return messages.pop()
+            return {'type': 'http.disconnect'}
+
+        await self.app(scope, receive, self.send)
+
+    async def send(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            status = message['status']
+            headers = message.get('headers', [])
+            self.chunked = all(name != b'content-length' for name, _ in headers)
+            lines = ['HTTP/1.1 {} {}'.format(status, HTTPStatus(status).phrase)]
+            lines += [
+                '{}: {}'.format(name.decode('latin-1'), value.decode('latin-1'))
+                for name, value in headers
+            ]
+            if self.chunked:
+                lines.append('Transfer-Encoding: chunked')
+            if not self.keep_alive:
+                lines.append('Connection: close')
+            self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+            return
+        body = message.get('body', b'')
+        if self.chunked:
+            if body:
+                self.writer.write(b'%x\r\n%s\r\n' % (len(body), body))
+            if not message.get('more_body', False):
+                self.writer.write(b'0\r\n\r\n')
+        else:
+            self.writer.write(body)
+        await self.writer.drain()
+
+
+async def start(
+    app: AsgiApp, host: str, port: int, reuse_port: bool = False
+) -> asyncio.AbstractServer:
+    async def connected(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        await HttpConnection(app, reader, writer).serve()
+
+    return await asyncio.start_server(
+        connected, host, port, reuse_port=reuse_port or None
+    )
+
+
+def serve(
+    app: AsgiApp, host: str = '127.0.0.1', port: int = 5000, reuse_port: bool = False
+) -> None:
+    """Запускаем встроенный асинхронный сервер до прерывания процесса"""
+
+    async def main() -> None:
+        async with await start(app, host, port, reuse_port) as aio_server:
+            await aio_server.serve_forever()
+
+    asyncio.run(main())
+
+
+if __name__ == '__main__':  # pragma: no cover
+    serve(
+        application,
+        sys.argv[1] if len(sys.argv) > 1 else '127.0.0.1',
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5000,
+    )
@@ -0,0 +1,125 @@
+import threading
+from math import sqrt
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+MARKS = range(11)
+
+
+def histogram(marks: bytes) -> List[int]:
+    """Число оценок каждого значения 0-10 за один проход на значение"""
+    if numpy is not None:
+        counts = numpy.bincount(numpy.frombuffer(marks, dtype=numpy.int8), minlength=11)
+        return [int(count) for count in counts]
+    return [marks.count(bytes((mark,))) for mark in MARKS]
+
+
+def percentiles(hist: Sequence[int], points: Iterable[float]) -> Dict[str, int]:
+    """Перцентили по гистограмме методом ближайшего ранга"""
+    total = sum(hist)
+    result = {}
+    for point in points:
+        rank = max(1, -(-point * total // 100))
+        running = value = 0
+        for value, count in enumerate(hist):
+            running += count
+            if running >= rank:
+                break
+        result['p{:g}'.format(point)] = value
+    return result
+
+
+def describe(hist: Sequence[int], points: Iterable[float]) -> Dict[str, Any]:
+    """Количество, средняя, отклонение, гистограмма и перцентили оценок"""
+    count = sum(hist)
+    total = sum(mark * hits for mark, hits in enumerate(hist))
+    squares = sum(mark * mark * hits for mark, hits in enumerate(hist))
+    return {
+        'COUNT': count,
+        'AVERAGE': total / count if count else 0,
+        'STDDEV': stddev(count, total, squares),
+        'HISTOGRAM': list(hist),
+        'PERCENTILES': percentiles(hist, points) if count else {},
+    }
+
+
+def stddev(count: float, total: float, squares: float) -> float:
+    if count == 0:
+        return 0.0
+    mean = total / count
+    return sqrt(max(0.0, squares / count - mean * mean))
+
+
+def year_rows(rows: Iterable[Sequence[float]]) -> List[Dict[str, Any]]:
+    """Строки по годам из года, числа фильмов, количества, суммы и суммы квадратов"""
+    return [
+        {
+            'year': int(year),
+            'films': int(films),
+            'count': int(count),
+            'average': total / count if count else 0,
+            'stddev': stddev(count, total, squares),
+        }
+        for year, films, count, total, squares in rows
+    ]
+
+
+class RatingTotals:
+    """Гистограмма оценок каталога и суммы оценок по годам.
+
+    Обновляются за O(1) на каждую оценку по ее значению и прежнему
+    значению при замене, поэтому запросы статистики каталога не
+    перебирают оценки. Новый фильм учитывается вместе с оценками,
+    с которыми он добавлен, одним проходом histogram.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hist = [0] * len(MARKS)
+        # Год - число фильмов, количество, сумма и сумма квадратов оценок
+        self._years: Dict[int, List[int]] = {}
+
+    def add_film(self, year: int, marks: bytes) -> None:
+        hist = histogram(marks) if marks else None
+        with self._lock:
+            row = self._years.setdefault(year, [0, 0, 0, 0])
+            row[0] += 1
+            if hist is None:
+                return
+            for mark, count in enumerate(hist):
+                self._hist[mark] += count
+                row[1] += count
+                row[2] += mark * count
+                row[3] += mark * mark * count
+
+    def add_mark(self, year: int, old: Optional[int], mark: int) -> None:
+        """Учитываем новую оценку или замену оценки old на mark"""
+        with self._lock:
+            row = self._years.setdefault(year, [0, 0, 0, 0])
+            self._hist[mark] += 1
+            row[2] += mark
+            row[3] += mark * mark
+            if old is None:
+                row[1] += 1
+            else:
+                self._hist[old] -= 1
+                row[2] -= old
+                row[3] -= old * old
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hist = [0] * len(MARKS)
+            self._years = {}
+
+    def histogram(self) -> List[int]:
+        with self._lock:
+            return list(self._hist)
+
+    def by_year(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [[year] + row for year, row in sorted(self._years.items())]
+        return year_rows(rows)
@@ -1,40 +1,76 @@
-from typing import Any, List, Union
-
-from flask import Flask, jsonify, make_response, request
-from flask_httpauth import HTTPBasicAuth
-from movies.exception import FilmNotFound, UserNotFound
-from movies.film import Film
+import math
+import time
+from typing import Any, Iterable, Iterator, List, Mapping, Optional
+
+from flask import Flask, Response, request
+from movies import (
+    admin,
+    batch,
+    history,
+    monitoring,
+    ratings,
+    search,
+    stats,
+    trending,
+)
+from movies.auth import CREDENTIALS, auth
+from movies.exception import (
+    FilmNotFound,
+    InvalidPage,
+    InvalidQuery,
+    Overloaded,
+    RateLimited,
+    UserNotFound,
+)
+from movies.film import FILM_FIELDS, Film
+from movies.pagination import get_cursor_params, get_page_params, paginate
+from movies.passwords import hash_in_pool
+from movies.persistence import BACKEND
+from movies.responses import cached, film_tags
+from movies.reviews import REVIEWS
+from movies.metrics import phase
+from movies.serialization import dumps, encode_film, json_response, jsonify
+from movies.storage import FILM_STORAGE, USER_STORAGE, find_film, find_user
 from movies.user import User
-from werkzeug.security import check_password_hash, generate_password_hash
 
 server = Flask(__name__)
-auth = HTTPBasicAuth()
-
-FILM_STORAGE: List[Film] = []
-USER_STORAGE: List[User] = []
-
+server.register_blueprint(monitoring.api)
+server.register_blueprint(ratings.api)
+server.register_blueprint(search.api)
+server.register_blueprint(batch.api)
+server.register_blueprint(history.api)
+server.register_blueprint(trending.api)
+server.register_blueprint(stats.api)
+server.register_blueprint(admin.api)
 
-@auth.verify_password
-def get_password(username: str, password: Any) -> Union[str, bool]:
-    for user in USER_STORAGE:
-        if user.name == username:
-            return check_password_hash(user.password, password)
-    return False
+BACKEND.restore(FILM_STORAGE, USER_STORAGE)
 
 
-@auth.error_handler
-def unauthorized() -> Any:
-    return make_response(jsonify({'ERROR': 'Unauthorized access'}), 401)
+@server.before_request
+def sync_storage() -> None:
+    """Перед записью догоняем другие процессы всегда, перед чтением - не чаще интервала"""
+    BACKEND.poll(force=request.method != 'GET')
 
 
 @server.errorhandler(UserNotFound)
-def handle_not_found_user(error: Any) -> Any:
+@server.errorhandler(FilmNotFound)
+def handle_not_found(error: Any) -> Any:
     return jsonify({'ERROR': '{0}'.format(error)}), 404
 
 
-@server.errorhandler(FilmNotFound)
-def handle_not_found_film(error: Any) -> Any:
-    return jsonify({'ERROR': '{0}'.format(error)}), 404
+@server.errorhandler(InvalidPage)
+@server.errorhandler(InvalidQuery)
+def handle_invalid_params(error: Any) -> Any:
+    return jsonify({'ERROR': '{0}'.format(error)}), 400
+
+
+@server.errorhandler(RateLimited)
+@server.errorhandler(Overloaded)
+def handle_rejected(error: Any) -> Any:
+    """429 при превышении лимита, 503 при перегрузке, с временем повтора"""
+    code = 429 if isinstance(error, RateLimited) else 503
+    headers = {'Retry-After': str(max(1, math.ceil(error.retry_after)))}
+    return jsonify({'ERROR': '{0}'.format(error)}), code, headers
 
 
 @server.route('/movies/api/v1.0/create_account', methods=['POST'])
@@ -50,30 +86,28 @@ def add_user() -> Any:
         )
 
     name_user = request.json.get('username')
-    try:
-        find_user(name_user, USER_STORAGE)
-        return (
-            jsonify(
-                {
-                    'ERROR': 'User with the same name already exist, please choose another name'
-                }
-            ),
-            400,
-        )
-    except UserNotFound:
-        pass
+    if name_user in USER_STORAGE:
+        return user_exists()
     password = str(request.json.get('password'))
-    hsh = generate_password_hash(password)
-    USER_STORAGE.append(User(name_user, hsh, {}))
+    hsh = hash_in_pool(password).result()
+    CREDENTIALS.invalidate(name_user)
+    user = User(name_user, hsh, {})
+    with BACKEND.change():
+        added = BACKEND.record_user(user) and USER_STORAGE.add(user)
+    if not added:
+        return user_exists()
     return jsonify({'ACTION': {'username': name_user}})
 
 
-def find_user(username: str, user_storage: List[User]) -> User:
-    """Смотрим наличие пользователя в хранилище"""
-    for user in user_storage:
-        if user.name == username:
-            return user
-    raise UserNotFound('Unregistered user')
+def user_exists() -> Any:
+    return (
+        jsonify(
+            {
+                'ERROR': 'User with the same name already exist, please choose another name'
+            }
+        ),
+        400,
+    )
 
 
 @server.route('/movies/api/v1.0/<username>/add', methods=['POST'])
@@ -89,22 +123,58 @@ def create_film(username: str) -> Any:
 
     name_film = request.json.get('name')
     year_film = request.json.get('year')
-    film = user.add_film(name_film, year_film, FILM_STORAGE)
-    if film is None:
+    try:
+        film = user.add_film(name_film, int(year_film), FILM_STORAGE)
+    except (TypeError, ValueError):
+        return jsonify({'ERROR': 'Year of film must be a number, check it'}), 400
+    with BACKEND.change():
+        added = film and BACKEND.record_film(film) and FILM_STORAGE.add(film)
+    if not added:
         return jsonify({'ERROR': 'This film already exist'})
-
-    FILM_STORAGE.append(film)
     return jsonify({'FILM': {'name': name_film, 'year': year_film}})
 
 
 @server.route('/movies/api/v1.0/films', methods=['GET'])
 @auth.login_required
 def get_list_films() -> Any:
-    """Получаем все имеющиеся фильмы"""
-    result = {}
-    for number, film in enumerate(FILM_STORAGE):
-        result['FILM{}'.format(number)] = film.create_dict()
-    return jsonify({'LIST OF FILMS': result})
+    """Получаем фильмы страницами по курсору или потоком в формате NDJSON"""
+    limit, cursor = get_cursor_params(request.args)
+    fields = get_fields(request.args)
+    films = FILM_STORAGE.films_from(cursor)
+    if request.args.get('format') == 'ndjson':
+        if 'limit' in request.args:
+            films = paginate(films, limit, 0)
+        return Response(stream_films(films, fields), mimetype='application/x-ndjson')
+
+    with phase('serialize'):
+        parts = [
+            b'"FILM%d":' % number + encode_film(film, fields)
+            for number, film in enumerate(paginate(films, limit, 0), cursor)
+        ]
+        end = cursor + len(parts)
+        next_cursor = end if parts and end < len(FILM_STORAGE) else None
+        return json_response(
+            b'{"LIST OF FILMS":{%s},"NEXT_CURSOR":%s}'
+            % (b','.join(parts), dumps(next_cursor))
+        )
+
+
+def get_fields(args: Mapping[str, str]) -> Optional[List[str]]:
+    """Читаем список полей фильма, которые нужно отдать клиенту"""
+    if not args.get('fields'):
+        return None
+    fields = args['fields'].split(',')
+    for field in fields:
+        if field not in FILM_FIELDS:
+            raise InvalidQuery(
+                'Fields must be chosen from: {}'.format(', '.join(FILM_FIELDS))
+            )
+    return fields
+
+
+def stream_films(films: Iterable[Film], fields: Optional[List[str]]) -> Iterator[bytes]:
+    for film in films:
+        yield encode_film(film, fields) + b'\n'
 
 
 @server.route('/movies/api/v1.0/<username>/add_review', methods=['POST'])
@@ -132,13 +202,15 @@ def add_review(username: str) -> Any:
     except ValueError:
         return jsonify({'ERROR': 'Year of film must be a number, check it'}), 404
     review_film: str = request.json.get('review')
-    film = user.add_review_or_mark(
-        Film(name_film, year_film, [], []), FILM_STORAGE, review_film
-    )
-
+    now = time.time()
+    with BACKEND.change():
+        film = user.add_review_or_mark(
+            Film(name_film, year_film, [], []), FILM_STORAGE, review_film, now
+        )
+        if film is not None:
+            BACKEND.record_review(username, film, review_film, now)
     if film is None:
         return jsonify({'ERROR': 'This film does not exist'}), 404
-
     return jsonify({'ADD_REVIEW': {'name': name_film, 'review': review_film}})
 
 
@@ -164,9 +236,13 @@ def add_mark(username: str) -> Any:
     name_film: str = request.json.get('name')
     year_film: int = int(request.json.get('year'))
     mark_film: int = int(request.json.get('mark'))
-    film = user.add_review_or_mark(
-        Film(name_film, year_film, [], []), FILM_STORAGE, mark_film
-    )
+    now = time.time()
+    with BACKEND.change():
+        film = user.add_review_or_mark(
+            Film(name_film, year_film, [], []), FILM_STORAGE, mark_film, now
+        )
+        if film is not None:
+            BACKEND.record_mark(username, film, mark_film, now)
     if film is None:
         return (
             jsonify(
@@ -176,20 +252,12 @@ def add_mark(username: str) -> Any:
             ),
             404,
         )
-
     return jsonify({'ADD_MARK': {'name': name_film, 'mark': mark_film}})
 
 
-def find_film(name: str, year: str, film_storage: List[Film]) -> Film:
-    """Ищем фильм в хранилище по параметрам: название и год"""
-    for film in film_storage:
-        if film.name == name and int(year) == film.year:
-            return film
-    raise FilmNotFound('Film does not exist')
-
-
 @server.route('/movies/api/v1.0/get_average/<name>/<year>', methods=['GET'])
 @auth.login_required
+@cached(film_tags('marks'))
 def get_average(name: str, year: str) -> Any:
     """Получаем среднюю оценку фильма по его названию и году
     или узнаем,что фильма нет в хранилище"""
@@ -199,6 +267,7 @@ def get_average(name: str, year: str) -> Any:
 
 @server.route('/movies/api/v1.0/get_count_reviews/<name>/<year>', methods=['GET'])
 @auth.login_required
+@cached(film_tags('reviews'))
 def get_count_reviews(name: str, year: str) -> Any:
     """Получаем количество отзывов фильма по его названию и году
     или узнаем,что фильма нет в хранилище"""
@@ -206,36 +275,23 @@ def get_count_reviews(name: str, year: str) -> Any:
     return jsonify({'COUNT_REVIEWS': film.get_count_reviews()})
 
 
+@server.route('/movies/api/v1.0/get_reviews/<name>/<year>', methods=['GET'])
+@auth.login_required
+def get_reviews(name: str, year: str) -> Any:
+    """Получаем отзывы фильма страницами, тексты загружаются только для страницы"""
+    limit, offset = get_page_params(request.args)
+    film: Film = find_film(name, year, FILM_STORAGE)
+    page = film.review_ids[offset : offset + limit]
+    return jsonify(
+        {'COUNT_REVIEWS': film.get_count_reviews(), 'REVIEWS': REVIEWS.get_many(page)}
+    )
+
+
 @server.route('/movies/api/v1.0/get_count_marks/<name>/<year>', methods=['GET'])
 @auth.login_required
+@cached(film_tags('marks'))
 def get_count_marks(name: str, year: str) -> Any:
     """Получаем количество оценок фильма по его названию и году
     или узнаем,что фильма нет в хранилище"""
     film: Film = find_film(name, year, FILM_STORAGE)
     return jsonify({'COUNT_MARKS': film.get_count_marks()})
-
-
-@server.route('/movies/api/v1.0/get_films/substring/<substring>', methods=['GET'])
-@auth.login_required
-def get_films_substring(substring: str) -> Any:
-    """Получаем список фильмов найденных по подстроке в названии"""
-    result: List[str] = []
-    for film in FILM_STORAGE:
-        if film.name.find(substring) != -1:
-            result.append(film.name)
-    return jsonify({'FILMS': result})
-
-
-@server.route('/movies/api/v1.0/get_films/average/<average>', methods=['GET'])
-@auth.login_required
-def get_films_average(average: str) -> Any:
-    """Получаем список фильмов, у которых средняя оценка совпадает с запросом"""
-    result: List[str] = []
-    try:
-        float(average)
-    except ValueError:
-        return jsonify({'ERROR': 'Average rating can not be a string value'}), 404
-    for film in FILM_STORAGE:
-        if film.get_average_mark() == float(average):
-            result.append(film.name)
-    return jsonify({'FILMS': result})
@@ -0,0 +1,149 @@
+import asyncio
+import io
+import sys
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask
+from movies.app import server
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+Headers = List[Tuple[bytes, bytes]]
+
+MAX_BODY = 16 * 1024 * 1024
+
+
+def build_environ(scope: Scope, body: bytes) -> Dict[str, Any]:
+    """Переводим ASGI scope в окружение WSGI для Flask"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ: Dict[str, Any] = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin-1'),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': 'HTTP/{}'.format(scope.get('http_version', '1.1')),
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        key = name.decode('latin-1').upper().replace('-', '_')
+        if key == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value.decode('latin-1')
+        elif key != 'CONTENT_LENGTH':
+            key = 'HTTP_' + key
+            if key in environ:
+                environ[key] += ',' + value.decode('latin-1')
+            else:
+                environ[key] = value.decode('latin-1')
+    return environ
+
+
+class AsgiApp:
+    """ASGI-обертка над Flask-приложением.
+
+    Запрос целиком, включая проверку пароля и генерацию хеша, выполняется
+    в пуле потоков, поэтому цикл событий не блокируется.
+    """
+
+    def __init__(self, app: Flask, workers: int = 32) -> None:
+        self.app = app
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='movies-asgi'
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+            if len(body) > MAX_BODY:
+                await send_error(send, 413, b'Request body is too large')
+                return
+        await self.handle(build_environ(scope, body), send)
+
+    async def lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def handle(self, environ: Dict[str, Any], send: Send) -> None:
+        loop = asyncio.get_running_loop()
+        started: Dict[str, Any] = {}
+        written: List[bytes] = []
+
+        def start_response(
+            status: str, headers: List[Tuple[str, str]], *_: Any
+        ) -> Callable[[bytes], object]:
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+            return written.append
+
+        result: Iterable[bytes] = await loop.run_in_executor(
+            self.executor, self.app.wsgi_app, environ, start_response
+        )
+        chunks = chain(written, result)
+        await send(
+            {
+                'type': 'http.response.start',
+                'status': started['status'],
+                'headers': started['headers'],
+            }
+        )
+        try:
+            while True:
+                chunk: Optional[bytes] = await loop.run_in_executor(
+                    self.executor, next, chunks, None
+                )
+                if chunk is None:
+                    break
+                if chunk:
+                    await send(
+                        {'type': 'http.response.body', 'body': chunk, 'more_body': True}
+                    )
+        finally:
+            close = getattr(result, 'close', None)
+            if close is not None:
+                await loop.run_in_executor(self.executor, close)
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+
+async def send_error(send: Send, status: int, body: bytes) -> None:
+    await send(
+        {
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-length', str(len(body)).encode())],
+        }
+    )
+    await send({'type': 'http.response.body', 'body': body})
+
+
+application = AsgiApp(server)
@@ -0,0 +1,108 @@
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Optional, Set, Union
+
+from flask import make_response, request
+from flask_httpauth import HTTPBasicAuth
+from movies.cache import CredentialCache
+from movies.exception import RateLimited
+from movies.limits import AdmissionGate, FailureTracker, TokenBuckets, parse_rate
+from movies.metrics import phase
+from movies.passwords import HASH_WORKERS, HASHER, hash_password, needs_rehash
+from movies.persistence import BACKEND
+from movies.serialization import jsonify
+from movies.storage import USER_STORAGE
+from movies.user import User
+from werkzeug.security import check_password_hash
+
+auth = HTTPBasicAuth()
+
+CREDENTIALS = CredentialCache(maxsize=1024, ttl=60.0)
+
+REHASHING: Set[str] = set()
+REHASHING_LOCK = threading.Lock()
+
+# Лимиты запросов 'rate,burst' в секунду на адрес клиента и на пользователя.
+# Пустая строка - без лимита
+IP_LIMIT = TokenBuckets(*parse_rate(os.environ.get('MOVIES_RATE_LIMIT_IP', '')))
+USER_LIMIT = TokenBuckets(*parse_rate(os.environ.get('MOVIES_RATE_LIMIT_USER', '')))
+
+FAILURES = FailureTracker(
+    int(os.environ.get('MOVIES_AUTH_FAILURES', '5')),
+    float(os.environ.get('MOVIES_AUTH_COOLDOWN', '30')),
+)
+
+# Проверки пароля считаются не больше чем в HASH_WORKERS потоках сразу, еще
+# MOVIES_AUTH_QUEUE ждут не дольше MOVIES_AUTH_TIMEOUT секунд, остальные - 503
+HASH_GATE = AdmissionGate(
+    HASH_WORKERS,
+    int(os.environ.get('MOVIES_AUTH_QUEUE', '64')),
+    float(os.environ.get('MOVIES_AUTH_TIMEOUT', '5')),
+)
+
+
+@auth.verify_password
+def get_password(username: str, password: Any) -> Union[str, bool]:
+    with phase('auth'):
+        address = request.remote_addr or ''
+        limit(IP_LIMIT, address)
+        limit(USER_LIMIT, username)
+        return check_credentials(username, password, address)
+
+
+def limit(buckets: TokenBuckets, key: str) -> None:
+    wait = buckets.acquire(key)
+    if wait:
+        raise RateLimited('Too many requests', wait)
+
+
+def check_credentials(username: str, password: Any, address: str = '') -> bool:
+    """Проверяем пароль: сначала по кэшу, потом по хешу, если нет блокировки"""
+    user = USER_STORAGE.get(username)
+    if user is None:
+        return False
+    if CREDENTIALS.check(username, password, user.password):
+        return True
+    key = (username, address)
+    wait = FAILURES.blocked(key)
+    if wait:
+        raise RateLimited('Too many failed logins', wait)
+    with HASH_GATE.admit():
+        valid = check_password_hash(user.password, password)
+    if valid:
+        FAILURES.succeed(key)
+        CREDENTIALS.remember(username, password, user.password)
+        if needs_rehash(user.password):
+            schedule_rehash(user, password)
+        return True
+    FAILURES.fail(key)
+    return False
+
+
+def schedule_rehash(user: User, password: Any) -> Optional['Future[None]']:
+    """Пересчитываем хеш с текущими параметрами в пуле, не задерживая вход"""
+    with REHASHING_LOCK:
+        if user.name in REHASHING:
+            return None
+        REHASHING.add(user.name)
+    return HASHER.submit(rehash, user, password)
+
+
+def rehash(user: User, password: Any) -> None:
+    try:
+        old_hash = user.password
+        new_hash = hash_password(str(password))
+        if user.password == old_hash:
+            with BACKEND.change():
+                user.password = new_hash
+                BACKEND.record_password(user)
+            CREDENTIALS.remember(user.name, password, new_hash)
+    finally:
+        with REHASHING_LOCK:
+            REHASHING.discard(user.name)
+
+
+@auth.error_handler
+def unauthorized() -> Any:
+    return make_response(jsonify({'ERROR': 'Unauthorized access'}), 401)
@@ -0,0 +1,101 @@
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Tuple
+
+from movies.film import Film
+from movies.storage import FilmCatalog, UserRegistry
+from movies.user import User
+
+Event = Tuple[Any, ...]
+
+
+class EventRecorder:
+    """Перевод изменений каталога и пользователей в события для write"""
+
+    def record_user(self, user: User) -> bool:
+        """Сохраняем пользователя, False - если имя уже занято в хранилище"""
+        return self.write(('user', user.name, user.password))
+
+    def record_password(self, user: User) -> bool:
+        """Сохраняем новый хеш пароля пользователя"""
+        return self.write(('password', user.name, user.password))
+
+    def record_film(self, film: Film) -> bool:
+        """Сохраняем фильм, False - если он уже есть в хранилище"""
+        return self.write(('film', film.name, int(film.year)))
+
+    def record_mark(
+        self, username: str, film: Film, mark: int, at: Optional[float] = None
+    ) -> bool:
+        return self.write(('mark', username, film.name, int(film.year), mark, at))
+
+    def record_review(
+        self, username: str, film: Film, review: str, at: Optional[float] = None
+    ) -> bool:
+        return self.write(('review', username, film.name, int(film.year), review, at))
+
+    def write(self, _event: Event) -> bool:
+        return True
+
+
+class StorageBackend(EventRecorder):
+    """Хранилище изменений каталога и пользователей.
+
+    Базовый класс ничего не сохраняет и используется по умолчанию,
+    когда данные живут только в памяти процесса.
+    """
+
+    def __init__(self) -> None:
+        self.films: Optional[FilmCatalog] = None
+        self.users: Optional[UserRegistry] = None
+
+    def poll(self, force: bool = False) -> int:  # pylint: disable=unused-argument
+        """Подтягиваем изменения других процессов, если хранилище общее"""
+        return 0
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Группируем несколько записей в одну операцию хранилища"""
+        yield
+
+    @contextmanager
+    def change(self) -> Iterator[None]:
+        """Изменение в памяти вместе с его записью, которые снимок не должен разделять"""
+        yield
+
+    def events(self) -> Iterator[Event]:
+        return iter(())
+
+    def restore(self, films: FilmCatalog, users: UserRegistry) -> int:
+        """Восстанавливаем состояние из хранилища, возвращаем число событий"""
+        self.films = films
+        self.users = users
+        count = 0
+        with films.bulk_load():
+            for event in self.events():
+                apply_event(event, films, users)
+                count += 1
+        return count
+
+    def close(self) -> None:
+        pass
+
+
+def apply_event(event: Event, films: FilmCatalog, users: UserRegistry) -> None:
+    """Применяем одно сохраненное изменение к хранилищам в памяти"""
+    kind = event[0]
+    if kind == 'user':
+        users.add(User(event[1], event[2], {}))
+    elif kind == 'film':
+        films.add(Film(event[1], event[2], [], []))
+    elif kind == 'password':
+        user = users.get(event[1])
+        if user is not None:
+            user.password = event[2]
+    else:
+        user = users.get(event[1])
+        if user is not None:
+            # В событиях старого формата нет времени действия
+            at = event[5] if len(event) > 5 else None
+            user.add_review_or_mark(
+                Film(event[2], event[3], [], []), films, event[4], at
+            )
@@ -0,0 +1,145 @@
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import Blueprint, request
+from movies.auth import auth
+from movies.film import Film, FilmKey
+from movies.metrics import phase
+from movies.persistence import BACKEND
+from movies.serialization import jsonify, loads
+from movies.storage import FILM_STORAGE, USER_STORAGE, film_key, find_user
+from movies.user import User
+
+api = Blueprint('batch', __name__, url_prefix='/movies/api/v1.0/<username>')
+
+MAX_BATCH = 10000
+
+Item = Dict[str, Any]
+Result = Dict[str, Any]
+FilmCache = Dict[FilmKey, Optional[Film]]
+
+
+def read_items() -> Optional[List[Item]]:
+    """Читаем элементы пакета из массива JSON или из тела в формате NDJSON"""
+    items: Any
+    if request.mimetype == 'application/x-ndjson':
+        try:
+            items = [
+                loads(line) for line in request.get_data().splitlines() if line.strip()
+            ]
+        except ValueError:
+            return None
+    else:
+        items = request.get_json(silent=True)
+    if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+        return None
+    return items
+
+
+def run_batch(
+    username: str,
+    kind: str,
+    apply: Callable[[User, Item, FilmCache], Result],
+) -> Any:
+    """Проверяем и применяем пакет за один проход, отдаем результат по каждому элементу"""
+    items = read_items()
+    if items is None:
+        return (
+            jsonify({'ERROR': 'Invalid data, please give an array of {}'.format(kind)}),
+            400,
+        )
+    if len(items) > MAX_BATCH:
+        return (
+            jsonify({'ERROR': 'Too many items, maximum is {}'.format(MAX_BATCH)}),
+            400,
+        )
+    user = find_user(username, USER_STORAGE)
+    films: FilmCache = {}
+    with BACKEND.transaction():
+        results = [apply(user, item, films) for item in items]
+    return jsonify({'RESULTS': results})
+
+
+def get_film_key(item: Item, *fields: str) -> Tuple[Optional[FilmKey], str]:
+    for field in ('name', 'year') + fields:
+        if field not in item:
+            return None, 'Invalid data, please give {}'.format(
+                ', '.join(('name', 'year') + fields)
+            )
+    try:
+        return film_key(item['name'], item['year']), ''
+    except (TypeError, ValueError):
+        return None, 'Year of film must be a number, check it'
+
+
+def lookup(key: FilmKey, films: FilmCache) -> Optional[Film]:
+    """Ищем фильм в каталоге один раз на пакет"""
+    if key not in films:
+        with phase('lookup'):
+            films[key] = FILM_STORAGE.get(*key)
+    return films[key]
+
+
+def apply_mark(user: User, item: Item, films: FilmCache) -> Result:
+    key, error = get_film_key(item, 'mark')
+    if key is None:
+        return {'ERROR': error}
+    try:
+        mark = int(item['mark'])
+    except (TypeError, ValueError):
+        return {'ERROR': 'Mark must be a number, check it'}
+    film = lookup(key, films)
+    now = time.time()
+    if film is None or user.rate_film(film, FILM_STORAGE, mark, now) is None:
+        return {
+            'ERROR': 'This film does not exist or you mark less 0 or more zero, check it'
+        }
+    BACKEND.record_mark(user.name, film, mark, now)
+    return {'ADD_MARK': {'name': film.name, 'mark': mark}}
+
+
+def apply_review(user: User, item: Item, films: FilmCache) -> Result:
+    key, error = get_film_key(item, 'review')
+    if key is None:
+        return {'ERROR': error}
+    review = item['review']
+    if not isinstance(review, str):
+        return {'ERROR': 'Review must be a text, check it'}
+    film = lookup(key, films)
+    if film is None:
+        return {'ERROR': 'This film does not exist'}
+    now = time.time()
+    user.rate_film(film, FILM_STORAGE, review, now)
+    BACKEND.record_review(user.name, film, review, now)
+    return {'ADD_REVIEW': {'name': film.name, 'review': review}}
+
+
+def apply_film(user: User, item: Item, _films: FilmCache) -> Result:
+    key, error = get_film_key(item)
+    if key is None:
+        return {'ERROR': error}
+    film = user.add_film(key[0], key[1], FILM_STORAGE)
+    if film is None or not BACKEND.record_film(film) or not FILM_STORAGE.add(film):
+        return {'ERROR': 'This film already exist'}
+    return {'FILM': {'name': film.name, 'year': item['year']}}
+
+
+@api.route('/add_marks_batch', methods=['POST'])
+@auth.login_required
+def add_marks_batch(username: str) -> Any:
+    """Добавляем пакет оценок, по одному поиску на каждый фильм"""
+    return run_batch(username, 'marks', apply_mark)
+
+
+@api.route('/add_reviews_batch', methods=['POST'])
+@auth.login_required
+def add_reviews_batch(username: str) -> Any:
+    """Добавляем пакет отзывов, по одному поиску на каждый фильм"""
+    return run_batch(username, 'reviews', apply_review)
+
+
+@api.route('/add_films_batch', methods=['POST'])
+@auth.login_required
+def add_films_batch(username: str) -> Any:
+    """Создаем пакет фильмов"""
+    return run_batch(username, 'films', apply_film)
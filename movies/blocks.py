@@ -0,0 +1,114 @@
+from bisect import bisect_left, insort
+from typing import Iterator, List, Tuple, Union
+
+AverageEntry = Tuple[Union[int, float], str, int]
+# Позиция в SortedBlocks: номер блока и позиция в блоке
+Location = Tuple[int, int]
+
+
+def upper_average(entries: List[AverageEntry], high: float) -> int:
+    """Позиция первой записи со средней оценкой больше high"""
+    low, top = 0, len(entries)
+    while low < top:
+        middle = (low + top) // 2
+        if entries[middle][0] <= high:
+            low = middle + 1
+        else:
+            top = middle
+    return low
+
+
+class SortedBlocks:
+    """Отсортированный список записей индекса, разбитый на блоки.
+
+    Вставка и удаление сдвигают только один блок не длиннее 2 * BLOCK
+    записей, а блок находится бинарным поиском по максимумам блоков,
+    поэтому изменение стоит O(log N + BLOCK) вместо O(N) у одного списка.
+    """
+
+    BLOCK = 1000
+
+    def __init__(self) -> None:
+        self._blocks: List[List[AverageEntry]] = []
+        self._maxes: List[AverageEntry] = []
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, entry: AverageEntry) -> None:
+        if not self._blocks:
+            self._blocks.append([entry])
+            self._maxes.append(entry)
+            self._len = 1
+            return
+        number = min(bisect_left(self._maxes, entry), len(self._blocks) - 1)
+        block = self._blocks[number]
+        insort(block, entry)
+        self._maxes[number] = block[-1]
+        self._len += 1
+        if len(block) > 2 * self.BLOCK:
+            self._blocks.insert(number + 1, block[self.BLOCK :])
+            del block[self.BLOCK :]
+            self._maxes.insert(number, block[-1])
+
+    def remove(self, entry: AverageEntry) -> None:
+        number = bisect_left(self._maxes, entry)
+        block = self._blocks[number]
+        del block[bisect_left(block, entry)]
+        self._len -= 1
+        if block:
+            self._maxes[number] = block[-1]
+        else:
+            del self._blocks[number]
+            del self._maxes[number]
+
+    def clear(self) -> None:
+        self._blocks = []
+        self._maxes = []
+        self._len = 0
+
+    def rebuild(self, entries: List[AverageEntry]) -> None:
+        """Заполняем блоки из уже отсортированного списка"""
+        self._blocks = [
+            entries[start : start + self.BLOCK]
+            for start in range(0, len(entries), self.BLOCK)
+        ]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(entries)
+
+    def left(self, entry: Tuple[Union[int, float], ...]) -> Location:
+        """Позиция первой записи не меньше entry"""
+        number = bisect_left(self._maxes, entry)
+        if number == len(self._blocks):
+            return number, 0
+        return number, bisect_left(self._blocks[number], entry)
+
+    def upper(self, high: float) -> Location:
+        """Позиция первой записи со средней оценкой больше high"""
+        number = upper_average(self._maxes, high)
+        if number == len(self._blocks):
+            return number, 0
+        return number, upper_average(self._blocks[number], high)
+
+    def end(self) -> Location:
+        return len(self._blocks), 0
+
+    def rank(self, location: Location) -> int:
+        """Номер позиции во всем списке"""
+        number, position = location
+        return sum(map(len, self._blocks[:number])) + position
+
+    def forward(self, location: Location) -> Iterator[AverageEntry]:
+        number, position = location
+        for block in self._blocks[number:]:
+            yield from block[position:]
+            position = 0
+
+    def backward(self, location: Location) -> Iterator[AverageEntry]:
+        """Записи перед позицией в обратном порядке"""
+        number, position = location
+        if number < len(self._blocks):
+            yield from reversed(self._blocks[number][:position])
+        for block in reversed(self._blocks[:number]):
+            yield from reversed(block)
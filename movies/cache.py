@@ -0,0 +1,165 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+CredentialKey = Tuple[str, bytes]
+Tags = Tuple[Hashable, ...]
+
+
+class CredentialCache:
+    """Кэш успешно проверенных пар (пользователь, пароль) с LRU-вытеснением и TTL.
+
+    Пароли в открытом виде не хранятся: ключом служит HMAC пароля
+    со случайным ключом процесса, а запись действительна только пока
+    хеш пароля пользователя в хранилище не изменился.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._secret = os.urandom(32)
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[CredentialKey, Tuple[str, float]]' = OrderedDict()
+
+    def _key(self, username: str, password: Any) -> CredentialKey:
+        digest = hmac.new(self._secret, str(password).encode(), hashlib.sha256).digest()
+        return username, digest
+
+    def check(self, username: str, password: Any, password_hash: str) -> bool:
+        """Проверяем, что пара уже была успешно проверена для текущего хеша"""
+        key = self._key(username, password)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_hash, expires = entry
+                if stored_hash == password_hash and expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True
+                del self._entries[key]
+            self.misses += 1
+        return False
+
+    def remember(self, username: str, password: Any, password_hash: str) -> None:
+        key = self._key(username, password)
+        with self._lock:
+            self._entries[key] = (password_hash, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: str) -> None:
+        """Удаляем все записи пользователя, например при его пересоздании"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == username]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+
+def make_etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+class ResponseCache:
+    """LRU-кэш готовых ответов, который сбрасывается по тегам.
+
+    Каждый ответ помечен тегами данных, из которых он собран. Запись
+    в эти данные увеличивает поколение тега и удаляет помеченные ответы.
+    Ответ, который считался во время такой записи, в кэш не попадает:
+    put сверяет поколения тегов с теми, что были до его вычисления.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Tuple[bytes, str, Tags]]' = OrderedDict()
+        self._tagged: Dict[Hashable, Set[str]] = {}
+        self._generations: Dict[Hashable, int] = {}
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """Тело ответа и его ETag или None, если ответа нет в кэше"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def generations(self, tags: Tags) -> Tags:
+        with self._lock:
+            return (self._epoch,) + tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def put(self, key: str, body: bytes, tags: Tags, generations: Tags) -> str:
+        """Сохраняем ответ, если его данные не менялись, пока он считался"""
+        etag = make_etag(body)
+        with self._lock:
+            current = (self._epoch,) + tuple(
+                self._generations.get(tag, 0) for tag in tags
+            )
+            if current != generations or self.maxsize <= 0:
+                return etag
+            self._drop(key)
+            self._entries[key] = (body, etag, tags)
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+        return etag
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    def invalidate(self, tags: Iterable[Hashable]) -> None:
+        """Удаляем ответы, собранные из измененных данных"""
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in list(self._tagged.get(tag, ())):
+                    self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._tagged.clear()
+            self._generations.clear()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,66 @@
+import multiprocessing
+import os
+import signal
+import sys
+from multiprocessing.process import BaseProcess
+from typing import List
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+
+def run_worker(host: str, port: int) -> None:
+    """Рабочий процесс: своя копия каталога и свой сервер на общем порту"""
+    from movies.aioserver import serve
+    from movies.asgi import application
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    serve(application, host, port, reuse_port=True)
+
+
+def check_storage() -> None:
+    """Процессам нужно общее хранилище, иначе у каждого будет свой каталог"""
+    if not os.environ.get('MOVIES_STORAGE', '').startswith('sqlite://'):
+        raise SystemExit(
+            'Several workers need a shared storage, set MOVIES_STORAGE=sqlite:///path'
+        )
+
+
+def start_workers(
+    host: str, port: int, workers: int = DEFAULT_WORKERS
+) -> List[BaseProcess]:
+    """Запускаем рабочие процессы, которые принимают соединения на одном порту"""
+    check_storage()
+    context = multiprocessing.get_context('spawn')
+    processes: List[BaseProcess] = [
+        context.Process(target=run_worker, args=(host, port), daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def stop_workers(processes: List[BaseProcess]) -> None:
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+
+def main(host: str, port: int, workers: int) -> None:  # pragma: no cover
+    processes = start_workers(host, port, workers)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_workers(processes)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else '127.0.0.1',
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5000,
+        int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_WORKERS,
+    )
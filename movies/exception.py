@@ -8,3 +8,29 @@ class FilmNotFound(Exception):
     def __init__(self, message: str = ""):
         Exception.__init__(self, message)
         self.message = message
+
+
+class InvalidPage(Exception):
+    def __init__(self, message: str = ""):
+        Exception.__init__(self, message)
+        self.message = message
+
+
+class InvalidQuery(Exception):
+    def __init__(self, message: str = ""):
+        Exception.__init__(self, message)
+        self.message = message
+
+
+class RateLimited(Exception):
+    def __init__(self, message: str = "", retry_after: float = 1.0):
+        Exception.__init__(self, message)
+        self.message = message
+        self.retry_after = retry_after
+
+
+class Overloaded(Exception):
+    def __init__(self, message: str = "", retry_after: float = 1.0):
+        Exception.__init__(self, message)
+        self.message = message
+        self.retry_after = retry_after
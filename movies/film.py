@@ -1,33 +1,118 @@
-from typing import Any, List, Union
+from array import array
+from math import sqrt
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from movies.reviews import REVIEWS
+
+FilmKey = Tuple[str, int]
+
+FILM_FIELDS = ('name', 'year', 'reviews', 'marks')
 
 
 class Film:
+    __slots__ = (
+        'name',
+        'year',
+        'marks',
+        'review_ids',
+        'count_marks',
+        'sum_marks',
+        'sum_squares',
+        'version',
+        'encoded',
+    )
+
     def __init__(
         self, name: str, year: int, list_marks: List[int], list_reviews: List[str]
     ):
         self.name = name
         self.year = year
-        self.marks = list_marks
-        self.reviews = list_reviews
+        self.marks = array('b', list_marks)
+        self.review_ids = array('q', map(REVIEWS.add, list_reviews))
+        self.count_marks, self.sum_marks, self.sum_squares = compute_aggregates(
+            self.marks
+        )
+        self.version = 0
+        self.encoded: Optional[Tuple[int, bytes, bytes]] = None
 
-    def create_dict(self) -> Any:
+    def create_dict(self, fields: Optional[Iterable[str]] = None) -> Any:
+        result: Dict[str, Any] = {}
+        for field in FILM_FIELDS if fields is None else fields:
+            if field == 'marks':
+                result[field] = self.marks.tolist()
+            else:
+                result[field] = getattr(self, field)
+        return result
+
+    def create_rating_dict(self) -> Any:
         return {
             'name': self.name,
             'year': self.year,
-            'reviews': self.reviews,
-            'marks': self.marks,
+            'average': self.get_average_mark(),
         }
 
+    def add_mark(self, mark: int) -> None:
+        """Добавляем оценку и обновляем накопленные сумму и количество"""
+        self.marks.append(mark)
+        self.count_marks += 1
+        self.sum_marks += mark
+        self.sum_squares += mark * mark
+        self.version += 1
+
+    def replace_mark(self, index: int, mark: int) -> None:
+        """Заменяем оценку на позиции index, количество оценок не меняется"""
+        old = self.marks[index]
+        self.marks[index] = mark
+        self.sum_marks += mark - old
+        self.sum_squares += mark * mark - old * old
+        self.version += 1
+
+    @property
+    def reviews(self) -> List[str]:
+        """Тексты отзывов, загружаются из хранилища отзывов при обращении"""
+        return REVIEWS.get_many(self.review_ids)
+
+    def add_review(self, review: str) -> int:
+        """Сохраняем отзыв в хранилище отзывов и возвращаем его id"""
+        review_id = REVIEWS.add(review)
+        self.review_ids.append(review_id)
+        self.version += 1
+        return review_id
+
     def get_average_mark(self) -> Union[int, float]:
-        if len(self.marks) == 0:
+        if self.count_marks == 0:
             return 0
-        sum_marks: int = 0
-        for mark in self.marks:
-            sum_marks += mark
-        return sum_marks / len(self.marks)
+        return self.sum_marks / self.count_marks
+
+    def get_stddev_mark(self) -> float:
+        if self.count_marks == 0:
+            return 0.0
+        variance = (
+            self.count_marks * self.sum_squares - self.sum_marks * self.sum_marks
+        ) / (self.count_marks * self.count_marks)
+        return sqrt(variance)
 
     def get_count_reviews(self) -> int:
-        return len(self.reviews)
+        return len(self.review_ids)
 
     def get_count_marks(self) -> int:
-        return len(self.marks)
+        return self.count_marks
+
+
+def compute_aggregates(marks: Iterable[int]) -> Tuple[int, int, int]:
+    """Пересчитываем количество, сумму и сумму квадратов по всем оценкам"""
+    count_marks = sum_marks = sum_squares = 0
+    for mark in marks:
+        count_marks += 1
+        sum_marks += mark
+        sum_squares += mark * mark
+    return count_marks, sum_marks, sum_squares
+
+
+def check_aggregates(film: Film) -> bool:
+    """Сверяем накопленные значения фильма с пересчетом по списку оценок"""
+    return compute_aggregates(film.marks) == (
+        film.count_marks,
+        film.sum_marks,
+        film.sum_squares,
+    )
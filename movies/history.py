@@ -0,0 +1,24 @@
+from typing import Any
+
+from flask import Blueprint, request
+from movies.auth import auth
+from movies.pagination import get_page_params
+from movies.serialization import jsonify
+from movies.storage import USER_STORAGE, find_user
+
+api = Blueprint('history', __name__, url_prefix='/movies/api/v1.0/<username>')
+
+
+@api.route('/history', methods=['GET'])
+@auth.login_required
+def get_history(username: str) -> Any:
+    """Получаем оценки и отзывы пользователя по фильмам, начиная с последних"""
+    limit, offset = get_page_params(request.args)
+    user = find_user(username, USER_STORAGE)
+    page = user.history(limit, offset)
+    return jsonify(
+        {
+            'COUNT': len(user.activity),
+            'HISTORY': [activity.create_dict(key) for key, activity in page],
+        }
+    )
@@ -0,0 +1,190 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Union
+
+from movies.blocks import AverageEntry, SortedBlocks
+from movies.film import FilmKey
+
+
+class AverageIndex:
+    """Упорядоченный по средней оценке индекс фильмов.
+
+    Хранит записи (средняя, название, год) в SortedBlocks, поэтому поиск
+    по точному значению, диапазону и ТОП-N выполняется за O(log N + k),
+    а перенос фильма на новую позицию не сдвигает весь индекс.
+    """
+
+    def __init__(self) -> None:
+        self._entries = SortedBlocks()
+        self._averages: Dict[FilmKey, Union[int, float]] = {}
+
+    def update(self, key: FilmKey, average: Union[int, float]) -> None:
+        """Добавляем фильм в индекс или переносим его на новую позицию"""
+        old = self._averages.get(key)
+        if old is not None:
+            if old == average:
+                return
+            self._entries.remove((old,) + key)
+        self._averages[key] = average
+        self._entries.add((average,) + key)
+
+    def remove(self, key: FilmKey) -> None:
+        old = self._averages.pop(key, None)
+        if old is not None:
+            self._entries.remove((old,) + key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._averages.clear()
+
+    def rebuild(self, averages: Iterable[Tuple[FilmKey, Union[int, float]]]) -> None:
+        """Строим индекс заново одной сортировкой за O(N log N)"""
+        self._averages = dict(averages)
+        self._entries.rebuild(
+            sorted((average,) + key for key, average in self._averages.items())
+        )
+
+    def count(self, low: float, high: float) -> int:
+        entries = self._entries
+        return max(
+            0, entries.rank(entries.upper(high)) - entries.rank(entries.left((low,)))
+        )
+
+    def between(
+        self, low: float, high: float, reverse: bool = False
+    ) -> Iterator[FilmKey]:
+        """Фильмы со средней оценкой в отрезке [low, high]"""
+        if reverse:
+            for average, name, year in self._entries.backward(
+                self._entries.upper(high)
+            ):
+                if average < low:
+                    return
+                yield name, year
+        else:
+            for average, name, year in self._entries.forward(
+                self._entries.left((low,))
+            ):
+                if average > high:
+                    return
+                yield name, year
+
+    def equal(self, average: float) -> Iterator[FilmKey]:
+        return self.between(average, average)
+
+    def ascending(self) -> Iterator[FilmKey]:
+        for _, name, year in self._entries.forward((0, 0)):
+            yield name, year
+
+    def descending(self) -> Iterator[FilmKey]:
+        for _, name, year in self._descending_entries():
+            yield name, year
+
+    def descending_items(self) -> Iterator[Tuple[Union[int, float], FilmKey]]:
+        for average, name, year in self._descending_entries():
+            yield average, (name, year)
+
+    def _descending_entries(self) -> Iterator[AverageEntry]:
+        return self._entries.backward(self._entries.end())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class SubstringIndex:
+    """Триграммный инвертированный индекс по названиям фильмов.
+
+    Списки вхождений хранят номера фильмов в порядке добавления, поэтому
+    пересечение идет бинарным поиском, а результаты отдаются лениво
+    в том же порядке, в каком фильмы попали в каталог.
+    """
+
+    def __init__(self) -> None:
+        self._keys: List[FilmKey] = []
+        self._names: List[str] = []
+        self._postings: Dict[str, List[int]] = {}
+
+    def add(self, key: FilmKey, name: str) -> None:
+        number = len(self._keys)
+        self._keys.append(key)
+        self._names.append(name)
+        for gram in trigrams(name.lower()):
+            self._postings.setdefault(gram, []).append(number)
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._names.clear()
+        self._postings.clear()
+
+    def _candidates(self, needle: str) -> Iterable[int]:
+        grams = trigrams(needle)
+        if not grams:
+            return range(len(self._keys))
+        postings = sorted((self._postings.get(gram, []) for gram in grams), key=len)
+        return (
+            number
+            for number in postings[0]
+            if all(_contains(posting, number) for posting in postings[1:])
+        )
+
+    def estimate(self, substring: str) -> int:
+        """Размер самого короткого списка вхождений для подстроки"""
+        grams = trigrams(substring.lower())
+        if not grams:
+            return len(self._keys)
+        return min(len(self._postings.get(gram, [])) for gram in grams)
+
+    def search(self, substring: str, ignore_case: bool = False) -> Iterator[FilmKey]:
+        """Фильмы, в названии которых встречается подстрока"""
+        needle = substring.lower()
+        for number in self._candidates(needle):
+            name = self._names[number]
+            if ignore_case:
+                found = needle in name.lower()
+            else:
+                found = substring in name
+            if found:
+                yield self._keys[number]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class YearIndex:
+    """Индекс фильмов по году выхода: корзина фильмов на каждый год"""
+
+    def __init__(self) -> None:
+        self._buckets: Dict[int, List[FilmKey]] = {}
+        self._years: List[int] = []
+
+    def add(self, key: FilmKey) -> None:
+        year = key[1]
+        if year not in self._buckets:
+            insort(self._years, year)
+            self._buckets[year] = []
+        self._buckets[year].append(key)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._years.clear()
+
+    def _years_between(self, low: int, high: int) -> List[int]:
+        return self._years[
+            bisect_left(self._years, low) : bisect_right(self._years, high)
+        ]
+
+    def count(self, low: int, high: int) -> int:
+        return sum(len(self._buckets[year]) for year in self._years_between(low, high))
+
+    def between(self, low: int, high: int) -> Iterator[FilmKey]:
+        """Фильмы с годом выхода в отрезке [low, high] по возрастанию года"""
+        for year in self._years_between(low, high):
+            yield from self._buckets[year]
+
+
+def _contains(posting: List[int], number: int) -> bool:
+    position = bisect_left(posting, number)
+    return position < len(posting) and posting[position] == number
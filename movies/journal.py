@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from movies.activity import Activity
+from movies.backend import Event, StorageBackend, apply_event
+from movies.film import Film, FilmKey
+from movies.storage import FilmCatalog, UserRegistry
+from movies.user import User
+
+
+def load_activity(data: Any, films: FilmCatalog) -> Dict[FilmKey, Activity]:
+    if not isinstance(data, list):
+        return {}
+    activity = {}
+    for item in data:
+        film = films.get(item[0], item[1])
+        if film is not None:
+            activity[item[0], item[1]] = Activity.from_list(item[2:], film)
+    return activity
+
+
+class SnapshotSchedule:
+    """Очередь снимков: снимок снимается после every событий журнала.
+
+    Снимок начинается только когда ни одно изменение в памяти не ждет
+    записи своего события, а новые изменения ждут, пока он сохраняется.
+    """
+
+    def __init__(self, every: int) -> None:
+        self.every = every
+        self.pending = 0
+        self.changes = 0
+        self.snapshotting = False
+        self._idle = threading.Condition()
+
+    @contextmanager
+    def change(self) -> Iterator[None]:
+        with self._idle:
+            while self.snapshotting:
+                self._idle.wait()
+            self.changes += 1
+        try:
+            yield
+        finally:
+            with self._idle:
+                self.changes -= 1
+
+    def start(self) -> bool:
+        """Начинаем снимок, если пора и никакое изменение не выполняется"""
+        with self._idle:
+            if self.changes or self.snapshotting or self.pending < self.every:
+                return False
+            self.snapshotting = True
+            return True
+
+    def finish(self) -> None:
+        with self._idle:
+            self.snapshotting = False
+            self._idle.notify_all()
+
+
+class JournalBackend(StorageBackend):
+    """Журнал изменений с дозаписью и периодическими снимками состояния.
+
+    Каждое событие дописывается строкой JSON в journal.log с порядковым
+    номером. Раз в snapshot_every событий состояние в памяти целиком
+    сохраняется в snapshot.json, и журнал начинается заново. При
+    восстановлении события с номером не больше номера снимка пропускаются.
+
+    Маршруты меняют память и пишут событие в журнал внутри change(), и
+    снимок откладывается до конца всех таких изменений. Иначе в снимок
+    попало бы изменение, событие которого запишется в журнал уже после
+    снимка и при восстановлении применится второй раз.
+    """
+
+    JOURNAL = 'journal.log'
+    SNAPSHOT = 'snapshot.json'
+
+    def __init__(self, path: str, snapshot_every: int = 10000, fsync: bool = False):
+        super().__init__()
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.schedule = SnapshotSchedule(snapshot_every)
+        self.fsync = fsync
+        self.sequence = 0
+        self.buffered = False
+        self._lock = threading.RLock()
+        # Журнал открыт все время жизни хранилища и закрывается в close()
+        self._journal = open(  # pylint: disable=consider-using-with
+            os.path.join(path, self.JOURNAL), 'a', encoding='utf-8'
+        )
+
+    def write(self, event: Event) -> bool:
+        with self._lock:
+            self.sequence += 1
+            self._journal.write(json.dumps([self.sequence] + list(event)) + '\n')
+            if not self.buffered:
+                self.flush()
+            self.schedule.pending += 1
+        self.snapshot_when_idle()
+        return True
+
+    @contextmanager
+    def change(self) -> Iterator[None]:
+        try:
+            with self.schedule.change():
+                yield
+        finally:
+            self.snapshot_when_idle()
+
+    def snapshot_when_idle(self) -> None:
+        if self.schedule.start():
+            try:
+                self.snapshot()
+            finally:
+                self.schedule.finish()
+
+    def flush(self) -> None:
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self.change(), self._lock:
+            self.buffered = True
+            try:
+                yield
+            finally:
+                self.buffered = False
+                self.flush()
+
+    def snapshot(self) -> None:
+        """Сохраняем текущее состояние и очищаем журнал"""
+        if self.films is None or self.users is None:
+            return
+        with self._lock:
+            state = {
+                'sequence': self.sequence,
+                'users': [
+                    [user.name, user.password, list(user.activity_list(self.films))]
+                    for user in self.users
+                ],
+                'films': [
+                    [film.name, film.year, film.marks.tolist(), film.reviews]
+                    for film in self.films
+                ],
+            }
+            target = os.path.join(self.path, self.SNAPSHOT)
+            with open(target + '.tmp', 'w', encoding='utf-8') as snapshot:
+                json.dump(state, snapshot)
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            os.replace(target + '.tmp', target)
+            self._journal.truncate(0)
+            self.schedule.pending = 0
+
+    def load_snapshot(self, films: FilmCatalog, users: UserRegistry) -> int:
+        target = os.path.join(self.path, self.SNAPSHOT)
+        if not os.path.exists(target):
+            return 0
+        with open(target, encoding='utf-8') as snapshot:
+            state: Dict[str, Any] = json.load(snapshot)
+        for name, year, marks, reviews in state['films']:
+            films.add(Film(name, year, marks, reviews))
+        # История ссылается на отзывы фильмов, поэтому пользователи - после фильмов.
+        # В снимках старого формата вместо истории словарь отзывов
+        for name, password, activity in state['users']:
+            users.add(User(name, password, load_activity(activity, films)))
+        return int(state['sequence'])
+
+    def events(self) -> Iterator[Event]:
+        with open(os.path.join(self.path, self.JOURNAL), encoding='utf-8') as journal:
+            for line in journal:
+                if line.strip():
+                    record: List[Any] = json.loads(line)
+                    yield tuple(record)
+
+    def restore(self, films: FilmCatalog, users: UserRegistry) -> int:
+        self.films = films
+        self.users = users
+        count = 0
+        with films.bulk_load():
+            self.sequence = self.load_snapshot(films, users)
+            for record in self.events():
+                if record[0] <= self.sequence:
+                    continue
+                apply_event(record[1:], films, users)
+                self.sequence = record[0]
+                self.schedule.pending += 1
+                count += 1
+        return count
+
+    def close(self) -> None:
+        self._journal.close()
@@ -0,0 +1,186 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterator, Tuple
+
+from movies.exception import Overloaded
+
+
+def parse_rate(value: str) -> Tuple[float, float]:
+    """Скорость и емкость корзины из строки 'rate,burst'; пустая строка - без лимита"""
+    if not value:
+        return 0.0, 0.0
+    rate, _, burst = value.partition(',')
+    return float(rate), float(burst or rate)
+
+
+class TokenBuckets:
+    """Корзины токенов по ключу: rate токенов в секунду, не больше burst.
+
+    Каждый запрос забирает токен; пустая корзина означает отказ. Хранится
+    не больше maxsize корзин с LRU-вытеснением, вытесненная корзина
+    при следующем запросе снова полная. rate <= 0 отключает лимит.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        maxsize: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.maxsize = maxsize
+        self.clock = clock
+        self.allowed = 0
+        self.limited = 0
+        self._lock = threading.Lock()
+        self._buckets: 'OrderedDict[Hashable, Tuple[float, float]]' = OrderedDict()
+
+    def acquire(self, key: Hashable) -> float:
+        """Забираем токен; 0 - запрос разрешен, иначе секунды до нового токена"""
+        if self.rate <= 0:
+            return 0.0
+        now = self.clock()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+                self.allowed += 1
+            else:
+                wait = (1 - tokens) / self.rate
+                self.limited += 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'size': len(self._buckets),
+            'allowed': self.allowed,
+            'limited': self.limited,
+        }
+
+
+class FailureTracker:
+    """Неудачные проверки пароля по ключу, например (пользователь, адрес).
+
+    После threshold неудач подряд ключ блокируется на cooldown секунд:
+    пока блокировка действует, пароль отклоняется без расчета хеша.
+    Удачная проверка сбрасывает счетчик. threshold <= 0 отключает блокировку.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 5,
+        cooldown: float = 30.0,
+        maxsize: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.maxsize = maxsize
+        self.clock = clock
+        self.failures = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, Tuple[int, float]]' = OrderedDict()
+
+    def blocked(self, key: Hashable) -> float:
+        """Секунды до конца блокировки ключа или 0, если он не заблокирован"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < self.threshold or self.threshold <= 0:
+                return 0.0
+            wait = entry[1] - self.clock()
+            if wait <= 0:
+                del self._entries[key]
+                return 0.0
+            self.rejected += 1
+            return wait
+
+    def fail(self, key: Hashable) -> None:
+        with self._lock:
+            count, _ = self._entries.get(key, (0, 0.0))
+            self._entries[key] = (count + 1, self.clock() + self.cooldown)
+            self._entries.move_to_end(key)
+            self.failures += 1
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def succeed(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        blocked = sum(count >= self.threshold for count, _ in self._entries.values())
+        return {
+            'size': len(self._entries),
+            'blocked': blocked if self.threshold > 0 else 0,
+            'failures': self.failures,
+            'rejected': self.rejected,
+        }
+
+
+class AdmissionGate:
+    """Ограничение одновременных тяжелых операций с очередью ожидания.
+
+    Одновременно выполняется не больше slots операций, еще не больше
+    queue ждут своей очереди не дольше timeout секунд. Остальные
+    запросы сразу получают Overloaded, а не копятся в потоках сервера.
+    """
+
+    def __init__(self, slots: int, queue: int, timeout: float) -> None:
+        self.slots = slots
+        self.queue = queue
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(slots)
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        with self._lock:
+            if self.active + self.waiting >= self.slots + self.queue:
+                self.shed += 1
+                raise Overloaded('Server is overloaded, try again later')
+            self.waiting += 1
+        acquired = self._semaphore.acquire(timeout=self.timeout)
+        with self._lock:
+            self.waiting -= 1
+            if not acquired:
+                self.shed += 1
+                raise Overloaded('Server is overloaded, try again later')
+            self.active += 1
+            self.admitted += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'active': self.active,
+            'waiting': self.waiting,
+            'admitted': self.admitted,
+            'shed': self.shed,
+        }
@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Границы корзин гистограмм в секундах, как принято в Prometheus
+BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class RequestTimer:
+    """Время начала запроса и накопленное время его фаз"""
+
+    __slots__ = ('started', 'phases')
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+
+_REQUEST: ContextVar[Optional[RequestTimer]] = ContextVar('request', default=None)
+
+
+class Histogram:
+    """Гистограмма длительностей с фиксированными корзинами"""
+
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        running = 0
+        for bound, count in zip(BUCKETS + (float('inf'),), self.counts):
+            running += count
+            yield ('+Inf' if bound == float('inf') else repr(bound)), running
+
+
+class RouteStats:
+    __slots__ = ('statuses', 'latency', 'phases')
+
+    def __init__(self) -> None:
+        self.statuses: Dict[int, int] = {}
+        self.latency = Histogram()
+        self.phases: Dict[str, Histogram] = {}
+
+
+class Metrics:
+    """Счетчики запросов и гистограммы длительностей по маршрутам и фазам.
+
+    Фазы (auth, lookup, serialize) отмечаются контекстным менеджером phase
+    внутри запроса и суммируются за запрос, поэтому гистограмма фазы
+    показывает ее долю в каждом запросе, а не отдельные вызовы.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.routes: Dict[Tuple[str, str], RouteStats] = {}
+
+    def start(self) -> None:
+        if self.enabled:
+            _REQUEST.set(RequestTimer())
+
+    def finish(self, route: str, method: str, status: int) -> None:
+        timer = _REQUEST.get()
+        if timer is None:
+            return
+        _REQUEST.set(None)
+        seconds = time.perf_counter() - timer.started
+        with self._lock:
+            stats = self.routes.get((route, method))
+            if stats is None:
+                stats = self.routes[route, method] = RouteStats()
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.latency.observe(seconds)
+            for name, spent in timer.phases.items():
+                histogram = stats.phases.get(name)
+                if histogram is None:
+                    histogram = stats.phases[name] = Histogram()
+                histogram.observe(spent)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.routes.clear()
+
+    def render(self, gauges: Dict[str, float]) -> str:
+        """Метрики в текстовом формате Prometheus"""
+        requests: List[str] = ['# TYPE movies_requests_total counter']
+        latency = ['# TYPE movies_request_duration_seconds histogram']
+        phases = ['# TYPE movies_phase_duration_seconds histogram']
+        with self._lock:
+            for (route, method), stats in sorted(self.routes.items()):
+                labels: Labels = (('route', route), ('method', method))
+                for status, count in sorted(stats.statuses.items()):
+                    requests.append(
+                        'movies_requests_total{} {}'.format(
+                            format_labels(labels + (('status', str(status)),)), count
+                        )
+                    )
+                latency.extend(
+                    render_histogram(
+                        'movies_request_duration_seconds', labels, stats.latency
+                    )
+                )
+                for name, histogram in sorted(stats.phases.items()):
+                    phases.extend(
+                        render_histogram(
+                            'movies_phase_duration_seconds',
+                            labels + (('phase', name),),
+                            histogram,
+                        )
+                    )
+        lines = requests + latency + phases
+        for name, value in sorted(gauges.items()):
+            lines.append('# TYPE {} gauge'.format(name))
+            lines.append('{} {}'.format(name, value))
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(labels: Labels) -> str:
+    escaped = (
+        '{}="{}"'.format(name, value.replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def render_histogram(name: str, labels: Labels, histogram: Histogram) -> List[str]:
+    lines = [
+        '{}_bucket{} {}'.format(name, format_labels(labels + (('le', bound),)), count)
+        for bound, count in histogram.cumulative()
+    ]
+    lines.append('{}_sum{} {}'.format(name, format_labels(labels), histogram.total))
+    lines.append('{}_count{} {}'.format(name, format_labels(labels), histogram.count))
+    return lines
+
+
+METRICS = Metrics(os.environ.get('MOVIES_METRICS', '1') != '0')
+
+
+class phase:  # pylint: disable=invalid-name
+    """Добавляем время блока к фазе текущего запроса"""
+
+    __slots__ = ('name', 'timer', 'started')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.timer = _REQUEST.get()
+        self.started = 0.0
+
+    def __enter__(self) -> None:
+        if self.timer is not None:
+            self.started = time.perf_counter()
+
+    def __exit__(self, *_: Any) -> None:
+        timer = self.timer
+        if timer is not None:
+            spent = time.perf_counter() - self.started
+            timer.phases[self.name] = timer.phases.get(self.name, 0.0) + spent
@@ -0,0 +1,50 @@
+from typing import Dict
+
+from flask import Blueprint, Response, request
+from movies.auth import CREDENTIALS, FAILURES, HASH_GATE, IP_LIMIT, USER_LIMIT
+from movies.metrics import METRICS
+from movies.profiler import PROFILER
+from movies.responses import RESPONSES
+from movies.reviews import REVIEWS
+from movies.storage import FILM_STORAGE, USER_STORAGE
+
+api = Blueprint('monitoring', __name__)
+
+
+def route_name() -> str:
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+@api.before_app_request
+def start_request() -> None:
+    METRICS.start()
+    PROFILER.enter(route_name())
+
+
+@api.after_app_request
+def finish_request(response: Response) -> Response:
+    """Учитываем запрос по шаблону маршрута, методу и коду ответа"""
+    PROFILER.leave()
+    METRICS.finish(route_name(), request.method, response.status_code)
+    return response
+
+
+@api.route('/metrics', methods=['GET'])
+def get_metrics() -> Response:
+    """Метрики запросов, фаз, кэшей и размеров хранилищ в формате Prometheus"""
+    gauges: Dict[str, float] = {
+        'movies_films': len(FILM_STORAGE),
+        'movies_users': len(USER_STORAGE),
+    }
+    for prefix, cache in (
+        ('movies_response_cache', RESPONSES),
+        ('movies_credential_cache', CREDENTIALS),
+        ('movies_review_store', REVIEWS),
+        ('movies_rate_limit_ip', IP_LIMIT),
+        ('movies_rate_limit_user', USER_LIMIT),
+        ('movies_auth_failures', FAILURES),
+        ('movies_auth_gate', HASH_GATE),
+    ):
+        for name, value in cache.stats().items():
+            gauges['{}_{}'.format(prefix, name)] = value
+    return Response(METRICS.render(gauges), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,37 @@
+from itertools import islice
+from typing import Iterable, Iterator, Mapping, Tuple, TypeVar
+
+from movies.exception import InvalidPage
+
+T = TypeVar('T')
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def get_page_params(args: Mapping[str, str]) -> Tuple[int, int]:
+    """Читаем limit и offset из параметров запроса"""
+    try:
+        limit = int(args.get('limit', DEFAULT_LIMIT))
+        offset = int(args.get('offset', 0))
+    except ValueError:
+        limit = offset = -1
+    if limit < 0 or offset < 0:
+        raise InvalidPage('Limit and offset must be non-negative numbers')
+    return min(limit, MAX_LIMIT), offset
+
+
+def get_cursor_params(args: Mapping[str, str]) -> Tuple[int, int]:
+    """Читаем limit и cursor (позицию в каталоге) из параметров запроса"""
+    limit, _ = get_page_params(args)
+    try:
+        cursor = int(args.get('cursor', 0))
+    except ValueError:
+        cursor = -1
+    if cursor < 0:
+        raise InvalidPage('Cursor must be a non-negative number')
+    return limit, cursor
+
+
+def paginate(items: Iterable[T], limit: int, offset: int) -> Iterator[T]:
+    return islice(items, offset, offset + limit)
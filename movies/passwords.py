@@ -0,0 +1,40 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from werkzeug.security import generate_password_hash
+
+# Метод хеширования в формате werkzeug, например pbkdf2:sha256:100000 или scrypt.
+# Пустая строка - метод werkzeug по умолчанию
+HASH_METHOD = os.environ.get('MOVIES_HASH_METHOD', '')
+
+# Хеширование занимает процессор целиком, поэтому одновременно считается
+# не больше HASH_WORKERS хешей, а остальные ядра остаются другим маршрутам
+HASH_WORKERS = int(os.environ.get('MOVIES_HASH_WORKERS', '0')) or max(
+    1, (os.cpu_count() or 1) // 2
+)
+
+HASHER = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='movies-hash')
+
+
+def hash_password(password: str, method: Optional[str] = None) -> str:
+    method = HASH_METHOD if method is None else method
+    if method:
+        return generate_password_hash(password, method)
+    return generate_password_hash(password)
+
+
+@lru_cache(maxsize=8)
+def method_prefix(method: str) -> str:
+    """Метод с параметрами, как он записан в хеше: pbkdf2:sha256:1000000"""
+    return hash_password('', method).split('$', 1)[0]
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """Хеш посчитан с другими параметрами, чем заданы сейчас"""
+    return password_hash.split('$', 1)[0] != method_prefix(HASH_METHOD)
+
+
+def hash_in_pool(password: str) -> 'Future[str]':
+    return HASHER.submit(hash_password, password)
@@ -0,0 +1,22 @@
+import os
+
+from movies.backend import StorageBackend
+from movies.journal import JournalBackend
+from movies.sqlite_backend import SqliteBackend
+
+
+def create_backend(url: str, poll_interval: float = 0.2) -> StorageBackend:
+    """Создаем хранилище по адресу: memory, sqlite:///путь или journal:///путь"""
+    if url.startswith('sqlite://'):
+        return SqliteBackend(url[len('sqlite://') :], poll_interval)
+    if url.startswith('journal://'):
+        return JournalBackend(url[len('journal://') :])
+    if url == 'memory':
+        return StorageBackend()
+    raise ValueError('Unknown storage: {}'.format(url))
+
+
+BACKEND = create_backend(
+    os.environ.get('MOVIES_STORAGE', 'memory'),
+    float(os.environ.get('MOVIES_SYNC_INTERVAL', '0.2')),
+)
@@ -0,0 +1,100 @@
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+from typing import Dict, List, Optional, Tuple
+
+MAX_DEPTH = 128
+
+
+def frame_name(frame: FrameType) -> str:
+    return '{}:{}'.format(frame.f_globals.get('__name__', '?'), frame.f_code.co_name)
+
+
+def collapse(frame: Optional[FrameType]) -> str:
+    """Стек кадра от корня к вершине в формате collapsed: a;b;c"""
+    names: List[str] = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SamplingProfiler:
+    """Профилировщик, который периодически снимает стеки потоков с запросами.
+
+    Потоки отмечают начало и конец запроса через enter и leave. Пока
+    профилировщик запущен, отдельный поток раз в interval секунд берет
+    стеки отмеченных потоков из sys._current_frames и считает одинаковые
+    стеки отдельно для каждого маршрута. Когда профилировщик остановлен,
+    enter и leave ничего не делают.
+    """
+
+    def __init__(self) -> None:
+        self.interval = 0.005
+        self.samples: 'Counter[Tuple[str, str]]' = Counter()
+        self._active: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: float = 0.005) -> bool:
+        """Запускаем сбор, False - если профилировщик уже работает"""
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self.interval = interval
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='movies-profiler', daemon=True
+            )
+            self._thread.start()
+        return True
+
+    def stop(self) -> bool:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return False
+        self._stopped.set()
+        thread.join()
+        self._active.clear()
+        return True
+
+    def enter(self, route: str) -> None:
+        if self._thread is not None:
+            self._active[threading.get_ident()] = route
+
+    def leave(self) -> None:
+        if self._active:
+            self._active.pop(threading.get_ident(), None)
+
+    def sample(self) -> None:
+        frames = sys._current_frames()  # pylint: disable=protected-access
+        for ident, route in list(self._active.items()):
+            frame = frames.get(ident)
+            if frame is not None:
+                self.samples[route, collapse(frame)] += 1
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def clear(self) -> None:
+        self.samples.clear()
+
+    def collapsed(self, route: Optional[str] = None) -> str:
+        """Стеки в формате для flamegraph.pl: маршрут;кадр;кадр число"""
+        lines = [
+            '{};{} {}'.format(sample_route, stack, count)
+            for (sample_route, stack), count in sorted(self.samples.items())
+            if route is None or sample_route == route
+        ]
+        return ''.join(line + '\n' for line in lines)
+
+
+PROFILER = SamplingProfiler()
@@ -0,0 +1,138 @@
+import heapq
+from typing import Callable, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from movies.exception import InvalidQuery
+from movies.film import Film, FilmKey
+from movies.pagination import paginate
+from movies.storage import FilmCatalog
+
+MIN_AVERAGE = 0.0
+MAX_AVERAGE = 10.0
+SORT_VALUES = ('average', '-average')
+TRUE_VALUES = ('1', 'true', 'yes')
+
+Source = Tuple[int, str, Callable[[], Iterable[FilmKey]]]
+
+
+class FilmQuery:
+    """Параметры комбинированного запроса фильмов"""
+
+    def __init__(self, args: Mapping[str, str]):
+        try:
+            self.substring: Optional[str] = args.get('substring') or None
+            self.ignore_case = args.get('ignore_case', '').lower() in TRUE_VALUES
+            year = args.get('year')
+            self.year_from = _int_arg(args.get('year_from', year))
+            self.year_to = _int_arg(args.get('year_to', year))
+            self.min_average = _float_arg(args.get('min_average'))
+            self.max_average = _float_arg(args.get('max_average'))
+        except ValueError as exc:
+            raise InvalidQuery('Year and average must be numbers, check them') from exc
+        self.sort = args.get('sort')
+        if self.sort is not None and self.sort not in SORT_VALUES:
+            raise InvalidQuery('Sort must be one of: average, -average')
+
+    @property
+    def by_year(self) -> bool:
+        return self.year_from is not None or self.year_to is not None
+
+    @property
+    def by_average(self) -> bool:
+        return self.min_average is not None or self.max_average is not None
+
+    def year_range(self) -> Tuple[int, int]:
+        low = self.year_from if self.year_from is not None else -(10**9)
+        high = self.year_to if self.year_to is not None else 10**9
+        return low, high
+
+    def average_range(self) -> Tuple[float, float]:
+        low = self.min_average if self.min_average is not None else MIN_AVERAGE
+        high = self.max_average if self.max_average is not None else MAX_AVERAGE
+        return low, high
+
+    def matches(self, film: Film) -> bool:
+        if self.by_year:
+            low, high = self.year_range()
+            if not low <= int(film.year) <= high:
+                return False
+        if self.by_average:
+            low_average, high_average = self.average_range()
+            if not low_average <= film.get_average_mark() <= high_average:
+                return False
+        if self.substring is not None:
+            if self.ignore_case:
+                return self.substring.lower() in film.name.lower()
+            return self.substring in film.name
+        return True
+
+
+class QueryPlanner:
+    """Выбирает самый избирательный индекс и лениво фильтрует остальное"""
+
+    def __init__(self, catalog: FilmCatalog):
+        self.catalog = catalog
+
+    def sources(self, query: FilmQuery) -> List[Source]:
+        """Индексы, которые могут служить источником кандидатов, с оценкой"""
+        catalog = self.catalog
+        result: List[Source] = []
+        if query.substring is not None:
+            substring = query.substring
+            result.append(
+                (
+                    catalog.names.estimate(substring),
+                    'substring',
+                    lambda: catalog.names.search(substring, query.ignore_case),
+                )
+            )
+        if query.by_year:
+            low, high = query.year_range()
+            result.append(
+                (
+                    catalog.years.count(low, high),
+                    'year',
+                    lambda: catalog.years.between(low, high),
+                )
+            )
+        if query.by_average or query.sort is not None:
+            low_average, high_average = query.average_range()
+            reverse = query.sort == '-average'
+            result.append(
+                (
+                    catalog.averages.count(low_average, high_average),
+                    'average',
+                    lambda: catalog.averages.between(
+                        low_average, high_average, reverse
+                    ),
+                )
+            )
+        return result
+
+    def plan(self, query: FilmQuery) -> Tuple[str, Callable[[], Iterable[FilmKey]]]:
+        sources = self.sources(query)
+        if not sources:
+            return 'catalog', self.catalog.keys
+        _, name, source = min(sources, key=lambda item: item[0])
+        return name, source
+
+    def execute(self, query: FilmQuery, limit: int, offset: int) -> Iterator[Film]:
+        """Отдаем страницу результатов, не собирая полный список кандидатов"""
+        name, source = self.plan(query)
+        films = (
+            film
+            for film in map(self.catalog.get_by_key, source())
+            if query.matches(film)
+        )
+        if query.sort is None or name == 'average':
+            return paginate(films, limit, offset)
+        select = heapq.nlargest if query.sort == '-average' else heapq.nsmallest
+        top = select(offset + limit, films, key=Film.get_average_mark)
+        return iter(top[offset:])
+
+
+def _int_arg(value: Optional[str]) -> Optional[int]:
+    return int(value) if value else None
+
+
+def _float_arg(value: Optional[str]) -> Optional[float]:
+    return float(value) if value else None
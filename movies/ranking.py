@@ -0,0 +1,184 @@
+import heapq
+import threading
+from itertools import islice
+from math import sqrt
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from movies.film import FilmKey
+from movies.index import AverageIndex
+
+MAX_MARK = 10
+# Квантиль нормального распределения для нижней границы 95% интервала
+WILSON_Z = 1.96
+# Шаг, с которым средняя по каталогу попадает в оценки Байеса
+PRIOR_STEP = 0.05
+
+Ranked = Tuple[float, FilmKey]
+# Минус верхняя граница оценки, индекс средней, итератор индекса и фильм
+Candidate = Tuple[float, int, Iterator[Tuple[Union[int, float], FilmKey]], FilmKey]
+
+
+def wilson_score(count: int, total: int, z: float = WILSON_Z) -> float:
+    """Нижняя граница доверительного интервала Уилсона для средней оценки.
+
+    Средняя переводится в долю от максимальной оценки, граница
+    переводится обратно в шкалу 0-10.
+    """
+    share = total / (count * MAX_MARK)
+    z2 = z * z
+    center = share + z2 / (2 * count)
+    spread = z * sqrt(share * (1 - share) / count + z2 / (4 * count * count))
+    return MAX_MARK * (center - spread) / (1 + z2 / count)
+
+
+def bayesian_score(count: int, total: int, prior: float, weight: float) -> float:
+    """Средняя оценка, к которой добавлены weight оценок, равных prior"""
+    return (weight * prior + total) / (weight + count)
+
+
+class Ranking:
+    """Рейтинги фильмов по Байесу и по нижней границе Уилсона.
+
+    Обновляется за O(log N) на каждую оценку по количеству и сумме
+    оценок фильма. Средняя по каталогу для Байеса считается за O(1) по
+    изменениям этих сумм. Она меняется с каждой оценкой, поэтому фильм
+    лежит в индексе той средней, округленной до PRIOR_STEP, с которой
+    был посчитан. Точная оценка по текущей средней отличается от
+    сохраненной не больше чем на разницу средних, и ТОП-N собирается
+    слиянием индексов по верхним границам без пересчета всего каталога.
+    """
+
+    def __init__(self, weight: float = 10.0) -> None:
+        self.weight = weight
+        self.count = 0
+        self.total = 0
+        self.dirty = False
+        self._lock = threading.Lock()
+        self._films: Dict[FilmKey, Tuple[int, int]] = {}
+        self._priors: Dict[FilmKey, int] = {}
+        self._bayesian: Dict[int, AverageIndex] = {}
+        self.wilson = AverageIndex()
+
+    @property
+    def prior(self) -> float:
+        """Средняя оценка по каталогу, округленная до PRIOR_STEP"""
+        if self.count == 0:
+            return MAX_MARK / 2
+        return round(self.total / self.count / PRIOR_STEP) * PRIOR_STEP
+
+    def update(
+        self, key: FilmKey, count: int, total: int, deferred: bool = False
+    ) -> None:
+        """Учитываем новые количество и сумму оценок фильма.
+
+        При deferred меняются только суммы, а индексы перестраиваются
+        одной сортировкой при следующем обращении, как при загрузке каталога.
+        """
+        with self._lock:
+            old_count, old_total = self._films.get(key, (0, 0))
+            self.count += count - old_count
+            self.total += total - old_total
+            if count == 0:
+                return
+            self._films[key] = count, total
+            if deferred or self.dirty:
+                self.dirty = True
+                return
+            self._place(key, count, total)
+
+    def _place(self, key: FilmKey, count: int, total: int) -> None:
+        prior = self.prior
+        bucket = round(prior / PRIOR_STEP)
+        old_bucket = self._priors.get(key)
+        if old_bucket is not None and old_bucket != bucket:
+            self._bayesian[old_bucket].remove(key)
+            if not self._bayesian[old_bucket]:
+                del self._bayesian[old_bucket]
+        self._priors[key] = bucket
+        index = self._bayesian.setdefault(bucket, AverageIndex())
+        index.update(key, bayesian_score(count, total, prior, self.weight))
+        self.wilson.update(key, wilson_score(count, total))
+
+    def _rebuild(self) -> None:
+        prior = self.prior
+        bucket = round(prior / PRIOR_STEP)
+        index = AverageIndex()
+        index.rebuild(
+            (key, bayesian_score(count, total, prior, self.weight))
+            for key, (count, total) in self._films.items()
+        )
+        self._bayesian = {bucket: index}
+        self._priors = dict.fromkeys(self._films, bucket)
+        self.wilson.rebuild(
+            (key, wilson_score(count, total))
+            for key, (count, total) in self._films.items()
+        )
+        self.dirty = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self.count = self.total = 0
+            self.dirty = False
+            self._films.clear()
+            self._priors.clear()
+            self._bayesian.clear()
+            self.wilson.clear()
+
+    def top(self, mode: str, limit: int) -> Optional[List[Ranked]]:
+        """ТОП-N фильмов по рейтингу или None, если такого рейтинга нет"""
+        with self._lock:
+            if self.dirty:
+                self._rebuild()
+            if mode in ('wilson', 'bayesian') and limit <= 0:
+                return []
+            if mode == 'wilson':
+                items = self.wilson.descending_items()
+                return [(float(score), key) for score, key in islice(items, limit)]
+            if mode == 'bayesian':
+                return self._top_bayesian(limit)
+            return None
+
+    def _top_bayesian(self, limit: int) -> List[Ranked]:
+        prior = self.prior
+        candidates: List[Candidate] = []
+        for bucket, index in self._bayesian.items():
+            push_candidate(candidates, bucket, index.descending_items(), prior)
+        best: List[Ranked] = []
+        current = round(prior / PRIOR_STEP)
+        stale = []
+        while candidates:
+            upper, bucket, items, key = heapq.heappop(candidates)
+            if len(best) == limit and -upper <= best[0][0]:
+                break
+            if bucket != current:
+                stale.append(key)
+            count, total = self._films[key]
+            ranked = (bayesian_score(count, total, prior, self.weight), key)
+            if len(best) < limit:
+                heapq.heappush(best, ranked)
+            elif ranked > best[0]:
+                heapq.heapreplace(best, ranked)
+            push_candidate(candidates, bucket, items, prior)
+        # Просмотренные фильмы переносим в индекс текущей средней, чтобы
+        # следующие запросы не проверяли их оценки заново
+        for key in stale:
+            self._place(key, *self._films[key])
+        return sorted(best, reverse=True)
+
+
+def push_candidate(
+    candidates: List[Candidate],
+    bucket: int,
+    items: Iterator[Tuple[Union[int, float], FilmKey]],
+    prior: float,
+) -> None:
+    """Кладем в кучу следующий фильм индекса с верхней границей его оценки.
+
+    Вклад средней в оценку фильма - weight / (weight + count) < 1 от нее,
+    поэтому оценка выросла не больше чем на рост средней.
+    """
+    item = next(items, None)
+    if item is not None:
+        score, key = item
+        upper = score + max(0.0, prior - bucket * PRIOR_STEP)
+        heapq.heappush(candidates, (-upper, bucket, items, key))
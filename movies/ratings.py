@@ -0,0 +1,113 @@
+import math
+import os
+from typing import Any, Iterable, Optional
+
+from flask import Blueprint, request
+from movies.auth import auth
+from movies.film import FilmKey
+from movies.pagination import get_page_params, paginate
+from movies.ranking import Ranking
+from movies.responses import averages_tags, cached
+from movies.serialization import jsonify
+from movies.storage import FILM_STORAGE, Change, stripe
+
+api = Blueprint('ratings', __name__, url_prefix='/movies/api/v1.0/get_films')
+
+# Рейтинг по умолчанию: bayesian или wilson
+RANKING_MODE = os.environ.get('MOVIES_RANKING', 'bayesian')
+
+RANKING = Ranking(float(os.environ.get('MOVIES_RANKING_WEIGHT', '10')))
+
+
+def rank(kind: str, key: Optional[FilmKey], _change: Change = None) -> None:
+    """Пересчитываем рейтинг фильма после его оценки"""
+    if key is None:
+        RANKING.clear()
+    elif kind in ('mark', 'film'):
+        film = FILM_STORAGE.get(*key)
+        if film is None:
+            return
+        # Под блокировкой фильма суммы согласованы и обновления идут по порядку
+        with stripe(key):
+            RANKING.update(key, film.count_marks, film.sum_marks, FILM_STORAGE.deferred)
+
+
+FILM_STORAGE.listeners.append(rank)
+
+
+def parse_average(value: str) -> float:
+    """Средняя оценка из пути; nan и бесконечность не сравнимы с оценками"""
+    average = float(value)
+    if not math.isfinite(average):
+        raise ValueError(value)
+    return average
+
+
+def films_page(keys: Iterable[FilmKey]) -> Any:
+    """Отдаем страницу фильмов по параметрам limit и offset"""
+    limit, offset = get_page_params(request.args)
+    films = map(FILM_STORAGE.get_by_key, paginate(keys, limit, offset))
+    return jsonify({'FILMS': [film.create_rating_dict() for film in films]})
+
+
+@api.route('/average/<average>', methods=['GET'])
+@auth.login_required
+@cached(averages_tags)
+def get_films_average(average: str) -> Any:
+    """Получаем список фильмов, у которых средняя оценка совпадает с запросом"""
+    try:
+        value = parse_average(average)
+    except ValueError:
+        return jsonify({'ERROR': 'Average rating can not be a string value'}), 404
+    limit, offset = get_page_params(request.args)
+    keys = paginate(FILM_STORAGE.averages.equal(value), limit, offset)
+    return jsonify({'FILMS': [name for name, _ in keys]})
+
+
+@api.route('/average/<low>/<high>', methods=['GET'])
+@auth.login_required
+def get_films_average_range(low: str, high: str) -> Any:
+    """Получаем фильмы со средней оценкой в диапазоне по возрастанию"""
+    try:
+        keys = FILM_STORAGE.averages.between(parse_average(low), parse_average(high))
+    except ValueError:
+        return jsonify({'ERROR': 'Average rating can not be a string value'}), 404
+    return films_page(keys)
+
+
+@api.route('/top', methods=['GET'])
+@auth.login_required
+def get_films_top() -> Any:
+    """Получаем фильмы с наибольшей средней оценкой"""
+    return films_page(FILM_STORAGE.averages.descending())
+
+
+@api.route('/bottom', methods=['GET'])
+@auth.login_required
+def get_films_bottom() -> Any:
+    """Получаем фильмы с наименьшей средней оценкой"""
+    return films_page(FILM_STORAGE.averages.ascending())
+
+
+@api.route('/ranked', methods=['GET'])
+@auth.login_required
+def get_films_ranked() -> Any:
+    """Получаем ТОП фильмов по рейтингу, учитывающему число оценок"""
+    mode = request.args.get('mode', RANKING_MODE)
+    limit, offset = get_page_params(request.args)
+    ranked = RANKING.top(mode, offset + limit)
+    if ranked is None:
+        return jsonify({'ERROR': 'Mode must be one of: bayesian, wilson'}), 400
+    films = []
+    for score, key in ranked[offset:]:
+        film = FILM_STORAGE.get_by_key(key)
+        films.append(
+            {
+                'name': film.name,
+                'year': film.year,
+                'score': round(score, 4),
+                'average': film.get_average_mark(),
+                'count': film.get_count_marks(),
+            }
+        )
+    return jsonify({'MODE': mode, 'PRIOR': round(RANKING.prior, 2), 'FILMS': films})
@@ -0,0 +1,84 @@
+import os
+from functools import wraps
+from typing import Any, Callable, Optional
+
+from flask import current_app, make_response, request
+from movies.cache import ResponseCache, Tags
+from movies.film import FilmKey
+from movies.storage import FILM_STORAGE, Change, film_key
+
+RESPONSES = ResponseCache(int(os.environ.get('MOVIES_RESPONSE_CACHE', '4096')))
+
+AVERAGES = 'averages'
+NAMES = 'names'
+
+View = Callable[..., Any]
+
+
+def invalidate(kind: str, key: Optional[FilmKey], _change: Change = None) -> None:
+    """Сбрасываем ответы, которые зависят от измененных данных фильма"""
+    if key is None:
+        RESPONSES.clear()
+    elif kind == 'mark':
+        RESPONSES.invalidate((('marks', key), AVERAGES))
+    elif kind == 'review':
+        RESPONSES.invalidate((('reviews', key),))
+    else:
+        RESPONSES.invalidate((('marks', key), ('reviews', key), AVERAGES, NAMES))
+
+
+FILM_STORAGE.listeners.append(invalidate)
+
+
+def film_tags(field: str) -> Callable[..., Optional[Tags]]:
+    """Теги ответа, собранного из оценок или отзывов одного фильма"""
+
+    def tags(name: str, year: str) -> Optional[Tags]:
+        try:
+            return ((field, film_key(name, year)),)
+        except ValueError:
+            return None
+
+    return tags
+
+
+def names_tags(**_: Any) -> Tags:
+    return (NAMES,)
+
+
+def averages_tags(**_: Any) -> Tags:
+    return (AVERAGES,)
+
+
+def cached(tags: Callable[..., Optional[Tags]]) -> Callable[[View], View]:
+    """Кэшируем успешные ответы GET по пути с параметрами и отдаем 304 по ETag.
+
+    tags получает аргументы представления и возвращает теги данных
+    ответа или None, если ответ кэшировать не нужно.
+    """
+
+    def decorator(view: View) -> View:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = request.full_path
+            entry = RESPONSES.get(key)
+            if entry is None:
+                view_tags = tags(**kwargs)
+                if view_tags is None:
+                    return view(*args, **kwargs)
+                generations = RESPONSES.generations(view_tags)
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                etag = RESPONSES.put(key, response.get_data(), view_tags, generations)
+                response.headers['X-Cache'] = 'MISS'
+            else:
+                body, etag = entry
+                response = current_app.response_class(body, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+            response.set_etag(etag)
+            return response.make_conditional(request)
+
+        return wrapper
+
+    return decorator
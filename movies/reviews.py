@@ -0,0 +1,143 @@
+import os
+import tempfile
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple, Union, cast
+
+Block = Union[bytes, Tuple[int, int]]
+OpenBlock = Tuple['array[int]', bytes]
+
+# Быстрый уровень zlib: сжатие в несколько раз дешевле, а размер больше на ~15%
+LEVEL = 1
+
+
+def encode_block(texts: List[str]) -> bytes:
+    """Сжимаем блок отзывов: смещения текстов от начала блока, затем тексты в UTF-8"""
+    encoded = [text.encode() for text in texts]
+    header = (len(encoded) + 1) * array('I').itemsize
+    offsets = array('I', accumulate(map(len, encoded), initial=header))
+    return zlib.compress(offsets.tobytes() + b''.join(encoded), LEVEL)
+
+
+def open_block(data: bytes, size: int) -> OpenBlock:
+    raw = zlib.decompress(data)
+    offsets = array('I')
+    offsets.frombytes(raw[: (size + 1) * offsets.itemsize])
+    return offsets, raw
+
+
+def block_text(block: OpenBlock, position: int) -> str:
+    """Декодируем из распакованного блока только нужный отзыв"""
+    offsets, raw = block
+    return raw[offsets[position] : offsets[position + 1]].decode()
+
+
+class ReviewStore:
+    """Хранилище текстов отзывов, на которые фильмы и пользователи ссылаются по id.
+
+    Каждый отзыв хранится один раз. Новые отзывы лежат строками в
+    горячем блоке, заполненный блок из block_size отзывов сжимается zlib
+    и, если задан spill_path, выгружается в файл. Тексты холодных блоков
+    распаковываются только при чтении, последние cache_blocks
+    распакованных блоков держатся в LRU-кэше.
+
+    spill_dir - каталог, в котором каждое хранилище создает свой безымянный
+    временный файл, поэтому рабочие процессы с одними настройками не
+    пишут в один файл, а файл удаляется вместе с процессом.
+    """
+
+    def __init__(
+        self,
+        block_size: int = 128,
+        cache_blocks: int = 64,
+        spill_dir: Optional[str] = None,
+    ) -> None:
+        self.block_size = block_size
+        self.cache_blocks = cache_blocks
+        self.compressed_bytes = 0
+        self.loads = 0
+        self._hot: List[str] = []
+        self._blocks: List[Block] = []
+        self._cache: 'OrderedDict[int, OpenBlock]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._spill = (
+            tempfile.TemporaryFile(prefix='reviews-', dir=spill_dir)
+            if spill_dir
+            else None
+        )
+
+    def __len__(self) -> int:
+        return len(self._blocks) * self.block_size + len(self._hot)
+
+    def add(self, text: str) -> int:
+        """Сохраняем отзыв и возвращаем его id"""
+        with self._lock:
+            review_id = len(self._blocks) * self.block_size + len(self._hot)
+            self._hot.append(text)
+            if len(self._hot) == self.block_size:
+                self._seal()
+        return review_id
+
+    def _seal(self) -> None:
+        data = encode_block(self._hot)
+        self.compressed_bytes += len(data)
+        block: Block = data
+        if self._spill is not None:
+            offset = self._spill.seek(0, os.SEEK_END)
+            self._spill.write(data)
+            block = (offset, len(data))
+        self._blocks.append(block)
+        self._hot = []
+
+    def _block(self, number: int) -> OpenBlock:
+        opened = self._cache.get(number)
+        if opened is not None:
+            self._cache.move_to_end(number)
+            return opened
+        block = self._blocks[number]
+        if isinstance(block, tuple):
+            spill = cast(BinaryIO, self._spill)
+            spill.seek(block[0])
+            block = spill.read(block[1])
+        opened = open_block(block, self.block_size)
+        self.loads += 1
+        self._cache[number] = opened
+        while len(self._cache) > self.cache_blocks:
+            self._cache.popitem(last=False)
+        return opened
+
+    def get(self, review_id: int) -> str:
+        return self.get_many((review_id,))[0]
+
+    def get_many(self, review_ids: Iterable[int]) -> List[str]:
+        """Тексты отзывов по id, каждый холодный блок распаковывается один раз"""
+        result = []
+        with self._lock:
+            sealed = len(self._blocks)
+            for review_id in review_ids:
+                number, position = divmod(review_id, self.block_size)
+                if number == sealed:
+                    result.append(self._hot[position])
+                else:
+                    result.append(block_text(self._block(number), position))
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'reviews': len(self),
+                'hot': len(self._hot),
+                'blocks': len(self._blocks),
+                'compressed_bytes': self.compressed_bytes,
+                'spilled': int(self._spill is not None),
+                'loads': self.loads,
+            }
+
+
+REVIEWS = ReviewStore(
+    int(os.environ.get('MOVIES_REVIEW_BLOCK', '128')),
+    spill_dir=os.environ.get('MOVIES_REVIEW_SPILL') or None,
+)
@@ -0,0 +1,35 @@
+from typing import Any
+
+from flask import Blueprint, request
+from movies.auth import auth
+from movies.pagination import get_page_params, paginate
+from movies.query import TRUE_VALUES, FilmQuery, QueryPlanner
+from movies.responses import cached, names_tags
+from movies.serialization import jsonify
+from movies.storage import FILM_STORAGE
+
+api = Blueprint('search', __name__, url_prefix='/movies/api/v1.0/get_films')
+
+PLANNER = QueryPlanner(FILM_STORAGE)
+
+
+@api.route('/substring/<substring>', methods=['GET'])
+@auth.login_required
+@cached(names_tags)
+def get_films_substring(substring: str) -> Any:
+    """Получаем список фильмов найденных по подстроке в названии"""
+    limit, offset = get_page_params(request.args)
+    ignore_case = request.args.get('ignore_case', '').lower() in TRUE_VALUES
+    keys = FILM_STORAGE.names.search(substring, ignore_case)
+    return jsonify({'FILMS': [name for name, _ in paginate(keys, limit, offset)]})
+
+
+@api.route('/query', methods=['GET'])
+@auth.login_required
+def get_films_query() -> Any:
+    """Получаем фильмы по подстроке, году и средней оценке
+    с опциональной сортировкой по средней оценке"""
+    query = FilmQuery(request.args)
+    limit, offset = get_page_params(request.args)
+    films = PLANNER.execute(query, limit, offset)
+    return jsonify({'FILMS': [film.create_rating_dict() for film in films]})
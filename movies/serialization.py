@@ -0,0 +1,60 @@
+import json
+import os
+from typing import Any, Iterable, Optional
+
+from flask import Response
+from movies.film import Film
+from movies.metrics import phase
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+# MOVIES_JSON=json выключает orjson, даже если он установлен
+USE_ORJSON = orjson is not None and os.environ.get('MOVIES_JSON') != 'json'
+
+ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def dumps(data: Any) -> bytes:
+    """Компактный JSON в UTF-8: через orjson, если он есть, иначе стандартный json"""
+    if USE_ORJSON:
+        return orjson.dumps(data)
+    return ENCODER.encode(data).encode()
+
+
+def loads(data: bytes) -> Any:
+    if USE_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_response(body: bytes, status: int = 200) -> Response:
+    return Response(body, status=status, mimetype='application/json')
+
+
+def jsonify(data: Any) -> Response:
+    """Замена flask.jsonify с учетом времени в фазе serialize"""
+    with phase('serialize'):
+        return json_response(dumps(data))
+
+
+def encode_film(film: Film, fields: Optional[Iterable[str]] = None) -> bytes:
+    """JSON фильма без прохода create_dict по списку полей.
+
+    Название, год и оценки фильма кэшируются в самом фильме вместе с
+    его версией и кодируются заново, только если фильм изменился.
+    Отзывы в кэш не попадают и вставляются при каждом запросе, иначе
+    один проход по каталогу держал бы в памяти все тексты несжатыми.
+    """
+    if fields is not None:
+        return dumps(film.create_dict(fields))
+    version = film.version
+    encoded = film.encoded
+    if encoded is None or encoded[0] != version:
+        head = dumps({'name': film.name, 'year': film.year})[:-1]
+        tail = b',"marks":' + dumps(film.marks.tolist()) + b'}'
+        encoded = film.encoded = (version, head + b',"reviews":', tail)
+    reviews = dumps(film.reviews) if film.review_ids else b'[]'
+    return encoded[1] + reviews + encoded[2]
@@ -0,0 +1,229 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from movies.backend import Event, StorageBackend, apply_event
+from movies.storage import FilmCatalog, UserRegistry
+
+MarkKey = Tuple[str, str, int]
+
+
+class AppliedRows:
+    """Строки базы, которые процесс уже применил к копии в памяти.
+
+    last - последний прочитанный rowid каждой таблицы, own - свои записи,
+    которые догон еще не встретил. Повторная оценка заменяет прежнюю,
+    поэтому для пары (пользователь, фильм) хранится rowid последней
+    примененной оценки, и более старая чужая оценка пропускается.
+    """
+
+    def __init__(self, tables: Iterable[str]) -> None:
+        self.last = {table: 0 for table in tables}
+        self.own: Dict[str, Set[int]] = {table: set() for table in self.last}
+        self.marks: Dict[MarkKey, int] = {}
+
+    def written(self, table: str, rowid: int, event: Event) -> None:
+        self.own[table].add(rowid)
+        if event[0] == 'mark':
+            self.marks[(event[1], event[2], event[3])] = rowid
+
+    def read(self, table: str, rowid: int) -> bool:
+        """Запоминаем прочитанную строку, False - если это своя запись"""
+        self.last[table] = rowid
+        if rowid in self.own[table]:
+            self.own[table].discard(rowid)
+            return False
+        return True
+
+    def latest_mark(self, rowid: int, row: Event) -> bool:
+        """Отзыв или оценка новее уже примененной оценки того же пользователя"""
+        if row[4] is not None:
+            return True
+        key = (row[0], row[1], row[2])
+        if self.marks.get(key, 0) > rowid:
+            return False
+        self.marks[key] = rowid
+        return True
+
+
+class SqliteBackend(StorageBackend):
+    """Встроенная база SQLite с индексами по (название, год) и имени пользователя.
+
+    Одну базу могут делить несколько процессов. Каждый держит копию
+    каталога в памяти и догоняет чужие изменения по возрастающим rowid
+    таблиц, когда PRAGMA data_version показывает, что другой процесс
+    что-то записал. Свои записи процесс уже применил и при догоне
+    пропускает. Имя пользователя и фильм сначала занимаются в базе,
+    поэтому уникальность соблюдается между процессами. Новый хеш пароля
+    добавляется строкой в passwords, а не меняет users, иначе другие
+    процессы его бы не увидели. Из чужих оценок
+    применяются только более новые, чем своя, иначе процессы,
+    применившие оценки в разном порядке, расходились бы.
+    """
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS users (name TEXT PRIMARY KEY, password TEXT)',
+        'CREATE TABLE IF NOT EXISTS passwords ('
+        'id INTEGER PRIMARY KEY, name TEXT, password TEXT)',
+        'CREATE TABLE IF NOT EXISTS films ('
+        'id INTEGER PRIMARY KEY, name TEXT, year INTEGER, UNIQUE (name, year))',
+        'CREATE TABLE IF NOT EXISTS activity ('
+        'id INTEGER PRIMARY KEY, username TEXT, film_id INTEGER, '
+        'mark INTEGER, review TEXT, created REAL)',
+        'CREATE INDEX IF NOT EXISTS activity_username ON activity (username)',
+    )
+    QUERIES = {
+        'users': 'SELECT rowid, name, password FROM users WHERE rowid > ? ORDER BY rowid',
+        'passwords': 'SELECT id, name, password FROM passwords '
+        'WHERE id > ? ORDER BY id',
+        'films': 'SELECT id, name, year FROM films WHERE id > ? ORDER BY id',
+        'activity': 'SELECT activity.id, activity.username, films.name, films.year, '
+        'activity.mark, activity.review, activity.created FROM activity '
+        'JOIN films ON films.id = activity.film_id '
+        'WHERE activity.id > ? ORDER BY activity.id',
+    }
+
+    def __init__(self, path: str, poll_interval: float = 0.2) -> None:
+        super().__init__()
+        self.poll_interval = poll_interval
+        self._lock = threading.RLock()
+        self._sync_lock = threading.RLock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        for statement in self.SCHEMA:
+            self._connection.execute(statement)
+        columns = [
+            row[1] for row in self._connection.execute('PRAGMA table_info(activity)')
+        ]
+        if 'created' not in columns:
+            self._connection.execute('ALTER TABLE activity ADD COLUMN created REAL')
+        self._applied = AppliedRows(self.QUERIES)
+        self._data_version = -1
+        self._polled = 0.0
+
+    def write(self, event: Event) -> bool:
+        kind = event[0]
+        with self._lock:
+            if kind == 'user':
+                table = 'users'
+                cursor = self._connection.execute(
+                    'INSERT OR IGNORE INTO users (name, password) VALUES (?, ?)',
+                    event[1:],
+                )
+            elif kind == 'password':
+                table = 'passwords'
+                cursor = self._connection.execute(
+                    'INSERT INTO passwords (name, password) '
+                    'SELECT name, ? FROM users WHERE name = ?',
+                    (event[2], event[1]),
+                )
+            elif kind == 'film':
+                table = 'films'
+                cursor = self._connection.execute(
+                    'INSERT OR IGNORE INTO films (name, year) VALUES (?, ?)',
+                    event[1:],
+                )
+            else:
+                table = 'activity'
+                mark, review = (event[4], None) if kind == 'mark' else (None, event[4])
+                cursor = self._connection.execute(
+                    'INSERT INTO activity (username, film_id, mark, review, created) '
+                    'SELECT ?, id, ?, ?, ? FROM films WHERE name = ? AND year = ?',
+                    (event[1], mark, review, event[5], event[2], event[3]),
+                )
+            if cursor.rowcount != 1 or cursor.lastrowid is None:
+                return False
+            self._applied.written(table, cursor.lastrowid, event)
+            return True
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._sync_lock, self._lock:
+            self._connection.execute('BEGIN')
+            try:
+                yield
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+            self._connection.execute('COMMIT')
+
+    @contextmanager
+    def change(self) -> Iterator[None]:
+        # Догон не должен вклиниться между изменением в памяти и его записью,
+        # иначе rowid записи не совпадет с порядком применения
+        with self._sync_lock:
+            yield
+
+    def changes(self) -> List[Tuple[str, int, Event]]:
+        """Новые строки всех таблиц, которых этот процесс еще не видел"""
+        result: List[Tuple[str, int, Event]] = []
+        with self._lock:
+            self._data_version = self._connection.execute(
+                'PRAGMA data_version'
+            ).fetchone()[0]
+            for table, query in self.QUERIES.items():
+                last = self._applied.last[table]
+                for row in self._connection.execute(query, (last,)):
+                    if self._applied.read(table, row[0]):
+                        result.append((table, row[0], tuple(row[1:])))
+        return result
+
+    def events(self) -> Iterator[Event]:
+        with self._lock:
+            rows = [
+                (table, tuple(row[1:]))
+                for table, query in self.QUERIES.items()
+                for row in self._connection.execute(query, (0,)).fetchall()
+            ]
+        for table, row in rows:
+            yield to_event(table, row)
+
+    def sync(self) -> int:
+        """Применяем к копии в памяти изменения других процессов"""
+        if self.films is None or self.users is None:
+            return 0
+        with self._sync_lock:
+            changes = self.changes()
+            for table, rowid, row in changes:
+                if table != 'activity' or self._applied.latest_mark(rowid, row):
+                    apply_event(to_event(table, row), self.films, self.users)
+        return len(changes)
+
+    def poll(self, force: bool = False) -> int:
+        now = time.monotonic()
+        if not force and now - self._polled < self.poll_interval:
+            return 0
+        self._polled = now
+        with self._lock:
+            version = self._connection.execute('PRAGMA data_version').fetchone()[0]
+        if version == self._data_version:
+            return 0
+        return self.sync()
+
+    def restore(self, films: FilmCatalog, users: UserRegistry) -> int:
+        self.films = films
+        self.users = users
+        with films.bulk_load():
+            return self.sync()
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def to_event(table: str, row: Event) -> Event:
+    """Переводим строку таблицы SQLite в событие хранилища"""
+    if table == 'users':
+        return ('user',) + row
+    if table == 'passwords':
+        return ('password',) + row
+    if table == 'films':
+        return ('film',) + row
+    username, name, year, mark, review, created = row
+    if review is None:
+        return 'mark', username, name, year, mark, created
+    return 'review', username, name, year, review, created
@@ -0,0 +1,67 @@
+from typing import Any, List, Optional
+
+from flask import Blueprint, request
+from movies.analytics import RatingTotals, describe, histogram
+from movies.auth import auth
+from movies.exception import InvalidQuery
+from movies.film import FilmKey
+from movies.serialization import jsonify
+from movies.storage import FILM_STORAGE, Change, find_film
+
+api = Blueprint('stats', __name__, url_prefix='/movies/api/v1.0/stats')
+
+TOTALS = RatingTotals()
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 99.0)
+
+
+def track(kind: str, key: Optional[FilmKey], change: Change = None) -> None:
+    """Обновляем гистограмму каталога и суммы по годам после изменения оценок"""
+    if key is None:
+        TOTALS.clear()
+    elif kind == 'mark' and change is not None:
+        TOTALS.add_mark(key[1], *change)
+    elif kind == 'film' and change is not None:
+        film = FILM_STORAGE.get(*key)
+        if film is not None:
+            TOTALS.add_film(key[1], film.marks[: change[1]].tobytes())
+
+
+FILM_STORAGE.listeners.append(track)
+
+
+def get_points() -> List[float]:
+    """Читаем список перцентилей из параметра p, например p=50,90,99"""
+    if not request.args.get('p'):
+        return list(DEFAULT_PERCENTILES)
+    try:
+        points = [float(point) for point in request.args['p'].split(',')]
+    except ValueError:
+        points = [-1.0]
+    if not all(0 <= point <= 100 for point in points):
+        raise InvalidQuery('Percentiles must be numbers from 0 to 100')
+    return points
+
+
+@api.route('/catalog', methods=['GET'])
+@auth.login_required
+def get_catalog_stats() -> Any:
+    """Получаем распределение всех оценок каталога"""
+    points = get_points()
+    return jsonify(describe(TOTALS.histogram(), points))
+
+
+@api.route('/film/<name>/<year>', methods=['GET'])
+@auth.login_required
+def get_film_stats(name: str, year: str) -> Any:
+    """Получаем распределение оценок одного фильма"""
+    points = get_points()
+    film = find_film(name, year, FILM_STORAGE)
+    return jsonify(describe(histogram(film.marks.tobytes()), points))
+
+
+@api.route('/years', methods=['GET'])
+@auth.login_required
+def get_years_stats() -> Any:
+    """Получаем число фильмов и оценок, среднюю и отклонение по годам выхода"""
+    return jsonify({'YEARS': TOTALS.by_year()})
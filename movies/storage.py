@@ -0,0 +1,208 @@
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from movies.exception import FilmNotFound, InvalidQuery, UserNotFound
+from movies.film import Film, FilmKey
+from movies.index import AverageIndex, SubstringIndex, YearIndex
+from movies.metrics import phase
+
+if TYPE_CHECKING:  # pragma: no cover
+    from movies.user import User
+
+# Прежняя оценка или None и новая оценка; для нового фильма - None и
+# число оценок, с которыми он добавлен
+Change = Optional[Tuple[Optional[int], int]]
+Listener = Callable[[str, Optional[FilmKey], Change], None]
+
+
+STRIPES = [threading.Lock() for _ in range(64)]
+
+
+def film_key(name: str, year: Union[int, str]) -> FilmKey:
+    """Ключ фильма в каталоге: название и год выхода"""
+    return name, int(year)
+
+
+def stripe(key: FilmKey) -> threading.Lock:
+    """Блокировка, защищающая оценки и отзывы фильма"""
+    return STRIPES[hash(key) % len(STRIPES)]
+
+
+class FilmCatalog:
+    """Каталог фильмов с поиском, вставкой и проверкой дубликатов за O(1).
+
+    Вставка фильма и обновление индексов идут под общей блокировкой
+    каталога, а оценки и отзывы одного фильма - под одной из STRIPES
+    блокировок, выбранной по ключу фильма, поэтому запись в разные фильмы
+    почти не конкурирует. После каждого изменения вызываются listeners
+    с видом изменения ('film', 'mark', 'review' или 'clear'), ключом фильма
+    и для 'mark' и 'film' значениями из Change.
+    """
+
+    def __init__(self) -> None:
+        self._films: Dict[FilmKey, Film] = {}
+        self._order: List[FilmKey] = []
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self.averages = AverageIndex()
+        self.deferred = False
+        self.names = SubstringIndex()
+        self.years = YearIndex()
+        self.listeners: List[Listener] = []
+
+    def _notify(self, kind: str, key: Optional[FilmKey], change: Change = None) -> None:
+        for listener in self.listeners:
+            listener(kind, key, change)
+
+    def get(self, name: str, year: Union[int, str]) -> Optional[Film]:
+        return self._films.get(film_key(name, year))
+
+    def get_by_key(self, key: FilmKey) -> Film:
+        return self._films[key]
+
+    def add(self, film: Film) -> bool:
+        """Добавляем фильм, если фильма с таким ключом еще нет"""
+        key = film_key(film.name, film.year)
+        with self._lock:
+            if key in self._films:
+                return False
+            # Оценки, добавленные после вставки, придут своими событиями
+            marks = len(film.marks)
+            self._films[key] = film
+            self._order.append(key)
+            self.names.add(key, film.name)
+            self.years.add(key)
+            self._update_average(key, film)
+        self._notify('film', key, (None, marks))
+        return True
+
+    def add_mark(self, film: Film, mark: int) -> int:
+        """Добавляем оценку фильму из каталога и обновляем индексы.
+
+        Возвращаем позицию оценки в массиве оценок фильма.
+        """
+        key = film_key(film.name, film.year)
+        with stripe(key):
+            film.add_mark(mark)
+            index = len(film.marks) - 1
+            self._update_average(key, film)
+        self._notify('mark', key, (None, mark))
+        return index
+
+    def replace_mark(self, film: Film, index: int, mark: int) -> None:
+        key = film_key(film.name, film.year)
+        with stripe(key):
+            old = film.marks[index]
+            film.replace_mark(index, mark)
+            self._update_average(key, film)
+        self._notify('mark', key, (old, mark))
+
+    def add_review(self, film: Film, review: str) -> int:
+        key = film_key(film.name, film.year)
+        with stripe(key):
+            review_id = film.add_review(review)
+        self._notify('review', key)
+        return review_id
+
+    def _update_average(self, key: FilmKey, film: Film) -> None:
+        if not self.deferred:
+            with self._index_lock:
+                self.averages.update(key, film.get_average_mark())
+
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
+        """Откладываем обновление индекса средних до конца массовой загрузки"""
+        self.deferred = True
+        try:
+            yield
+        finally:
+            self.deferred = False
+            with self._index_lock:
+                self.averages.rebuild(
+                    (key, film.get_average_mark())
+                    for key, film in list(self._films.items())
+                )
+
+    def clear(self) -> None:
+        with self._lock, self._index_lock:
+            self._films.clear()
+            self._order.clear()
+            self.averages.clear()
+            self.names.clear()
+            self.years.clear()
+        self._notify('clear', None)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._films
+
+    def films_from(self, position: int) -> Iterator[Film]:
+        """Фильмы в порядке добавления, начиная с заданной позиции"""
+        for number in range(position, len(self._order)):
+            yield self._films[self._order[number]]
+
+    def keys(self) -> Iterator[FilmKey]:
+        yield from self._order
+
+    def __iter__(self) -> Iterator[Film]:
+        return self.films_from(0)
+
+    def __len__(self) -> int:
+        return len(self._films)
+
+
+class UserRegistry:
+    """Реестр пользователей с доступом по имени за O(1)"""
+
+    def __init__(self) -> None:
+        self._users: Dict[str, 'User'] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional['User']:
+        return self._users.get(name)
+
+    def add(self, user: 'User') -> bool:
+        """Добавляем пользователя, если имя еще не занято"""
+        with self._lock:
+            if user.name in self._users:
+                return False
+            self._users[user.name] = user
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._users
+
+    def __iter__(self) -> Iterator['User']:
+        return iter(list(self._users.values()))
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+
+FILM_STORAGE = FilmCatalog()
+USER_STORAGE = UserRegistry()
+
+
+def find_user(username: str, user_storage: UserRegistry) -> 'User':
+    """Смотрим наличие пользователя в хранилище"""
+    with phase('lookup'):
+        user = user_storage.get(username)
+    if user is None:
+        raise UserNotFound('Unregistered user')
+    return user
+
+
+def find_film(name: str, year: str, film_storage: FilmCatalog) -> Film:
+    """Ищем фильм в хранилище по параметрам: название и год"""
+    try:
+        with phase('lookup'):
+            film = film_storage.get(name, year)
+    except ValueError as error:
+        raise InvalidQuery('Year of film must be a number, check it') from error
+    if film is None:
+        raise FilmNotFound('Film does not exist')
+    return film
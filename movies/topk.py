@@ -0,0 +1,185 @@
+import heapq
+import threading
+import time
+from collections import deque
+from itertools import count as sequence
+from operator import itemgetter
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+Key = TypeVar('Key', bound=Hashable)
+
+# Ключ, оценка числа событий сверху и максимальная ошибка этой оценки
+Hitter = Tuple[Key, int, int]
+
+
+class SpaceSaving(Generic[Key]):
+    """Приближенный подсчет самых частых ключей алгоритмом Space-Saving.
+
+    Хранится не больше capacity счетчиков. Новый ключ при заполненной
+    таблице вытесняет ключ с наименьшим счетчиком и наследует его
+    значение как ошибку, поэтому счетчик никогда не меньше точного, а
+    ключ с частотой больше n / capacity гарантированно в таблице. Кучу
+    минимумов не обновляем при увеличении счетчика: устаревшие записи
+    исправляются при вытеснении.
+    """
+
+    __slots__ = ('capacity', 'counts', 'errors', '_heap', '_sequence')
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.counts: Dict[Key, int] = {}
+        self.errors: Dict[Key, int] = {}
+        self._heap: List[Tuple[int, int, Key]] = []
+        self._sequence = sequence()
+
+    def add(self, key: Key, count: int = 1) -> None:
+        counts = self.counts
+        if key in counts:
+            counts[key] += count
+            return
+        error = 0
+        if len(counts) >= self.capacity:
+            error = self._evict()
+        counts[key] = error + count
+        self.errors[key] = error
+        heapq.heappush(self._heap, (error + count, next(self._sequence), key))
+
+    def _evict(self) -> int:
+        """Удаляем ключ с наименьшим счетчиком и возвращаем этот счетчик"""
+        heap = self._heap
+        while True:
+            stored, _, key = heap[0]
+            current = self.counts[key]
+            if current == stored:
+                heapq.heappop(heap)
+                del self.counts[key]
+                del self.errors[key]
+                return current
+            heapq.heapreplace(heap, (current, next(self._sequence), key))
+
+    def top(self, limit: int) -> List[Hitter[Key]]:
+        keys = heapq.nlargest(limit, self.counts.items(), key=itemgetter(1))
+        return [(key, value, self.errors[key]) for key, value in keys]
+
+    def hitters(self) -> Iterator[Hitter[Key]]:
+        errors = self.errors
+        return ((key, value, errors[key]) for key, value in self.counts.items())
+
+
+def merge(groups: Iterable[Iterable[Hitter[Key]]], limit: int) -> List[Hitter[Key]]:
+    """Складываем счетчики и ошибки нескольких таблиц и берем limit наибольших"""
+    counts: Dict[Key, int] = {}
+    errors: Dict[Key, int] = {}
+    for group in groups:
+        for key, value, error in group:
+            counts[key] = counts.get(key, 0) + value
+            errors[key] = errors.get(key, 0) + error
+    keys = heapq.nlargest(limit, counts.items(), key=itemgetter(1))
+    return [(key, value, errors[key]) for key, value in keys]
+
+
+class SlidingSpaceSaving(Generic[Key]):
+    """Самые частые ключи за последние window секунд.
+
+    Окно разбито на slots интервалов, у каждого своя таблица Space-Saving.
+    Таблицы вышедших из окна интервалов выбрасываются целиком, поэтому
+    память ограничена slots * capacity счетчиками, а границы окна точны
+    до длины интервала. Закрытые интервалы уже не меняются: их сумма,
+    урезанная до capacity ключей, считается один раз на интервал, и
+    запрос складывает только ее и таблицу текущего интервала.
+    """
+
+    def __init__(self, window: float, slots: int, capacity: int) -> None:
+        self.width = window / slots
+        self.slots = slots
+        self.capacity = capacity
+        self._ring: Deque[Tuple[int, SpaceSaving[Key]]] = deque()
+        self._closed: Tuple[Optional[int], List[Hitter[Key]]] = (None, [])
+
+    def _expire(self, index: int) -> None:
+        while self._ring and self._ring[0][0] <= index - self.slots:
+            self._ring.popleft()
+
+    def add(self, key: Key, now: float, count: int = 1) -> None:
+        index = int(now // self.width)
+        if not self._ring or self._ring[-1][0] != index:
+            self._ring.append((index, SpaceSaving(self.capacity)))
+            self._expire(index)
+        self._ring[-1][1].add(key, count)
+
+    def top(self, limit: int, now: float) -> List[Hitter[Key]]:
+        index = int(now // self.width)
+        self._expire(index)
+        if self._closed[0] != index:
+            closed = (summary.hitters() for i, summary in self._ring if i != index)
+            self._closed = (index, merge(closed, self.capacity))
+        groups: List[Iterable[Hitter[Key]]] = [self._closed[1]]
+        if self._ring and self._ring[-1][0] == index:
+            groups.append(self._ring[-1][1].hitters())
+        return merge(groups, limit)
+
+
+class Trending(Generic[Key]):
+    """Самые частые ключи за все время и за скользящие окна.
+
+    windows - имя окна и его параметры: длина в секундах и число интервалов.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        windows: Dict[str, Tuple[float, int]],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity = capacity
+        self.window_params = windows
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.all_time: SpaceSaving[Key] = SpaceSaving(capacity)
+        self.windows = self._windows()
+
+    def _windows(self) -> Dict[str, SlidingSpaceSaving[Key]]:
+        return {
+            name: SlidingSpaceSaving(window, slots, self.capacity)
+            for name, (window, slots) in self.window_params.items()
+        }
+
+    @property
+    def periods(self) -> List[str]:
+        return ['all'] + list(self.windows)
+
+    def add(self, key: Key, count: int = 1, recent: bool = True) -> None:
+        """Учитываем события; recent=False - старые события только для всего времени"""
+        with self._lock:
+            self.all_time.add(key, count)
+            if recent:
+                now = self.clock()
+                for window in self.windows.values():
+                    window.add(key, now, count)
+
+    def top(self, period: str, limit: int) -> Optional[List[Hitter[Key]]]:
+        """Самые частые ключи за период или None, если такого периода нет"""
+        with self._lock:
+            if period == 'all':
+                return self.all_time.top(limit)
+            window = self.windows.get(period)
+            if window is None:
+                return None
+            return window.top(limit, self.clock())
+
+    def clear(self) -> None:
+        with self._lock:
+            self.all_time = SpaceSaving(self.capacity)
+            self.windows = self._windows()
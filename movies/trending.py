@@ -0,0 +1,85 @@
+import os
+from typing import Any, Dict, Optional
+
+from flask import Blueprint, request
+from movies.auth import auth
+from movies.film import FilmKey
+from movies.pagination import get_page_params
+from movies.serialization import jsonify
+from movies.storage import FILM_STORAGE, Change
+from movies.topk import Trending
+
+api = Blueprint('trending', __name__, url_prefix='/movies/api/v1.0/trending')
+
+CAPACITY = int(os.environ.get('MOVIES_TRENDING_CAPACITY', '1000'))
+
+# Окна: длина в секундах и число интервалов, на которые окно разбито
+WINDOWS = {'hour': (3600.0, 60), 'day': (86400.0, 96)}
+
+TRENDING: Dict[str, Trending[FilmKey]] = {
+    'marks': Trending(CAPACITY, WINDOWS),
+    'reviews': Trending(CAPACITY, WINDOWS),
+}
+
+KINDS = {'mark': 'marks', 'review': 'reviews'}
+
+
+def record(kind: str, key: Optional[FilmKey], _change: Change = None) -> None:
+    """Считаем оценки и отзывы фильмов, повторная оценка тоже считается.
+
+    При восстановлении каталога события старые и попадают только
+    в счетчики за все время, но не в окна. Фильм из снимка состояния
+    добавляется сразу со всеми оценками и отзывами.
+    """
+    if key is None:
+        for trending in TRENDING.values():
+            trending.clear()
+    elif kind in KINDS:
+        TRENDING[KINDS[kind]].add(key, recent=not FILM_STORAGE.deferred)
+    elif kind == 'film':
+        film = FILM_STORAGE.get(*key)
+        if film is None:
+            return
+        for name, count in (
+            ('marks', film.get_count_marks()),
+            ('reviews', film.get_count_reviews()),
+        ):
+            if count:
+                TRENDING[name].add(key, count, recent=False)
+
+
+FILM_STORAGE.listeners.append(record)
+
+
+@api.route('/<kind>', methods=['GET'])
+@auth.login_required
+def get_trending(kind: str) -> Any:
+    """Получаем фильмы с наибольшим числом оценок или отзывов за период.
+
+    Счет приближенный: count - оценка сверху, error - ее наибольшая ошибка.
+    """
+    trending = TRENDING.get(kind)
+    if trending is None:
+        return jsonify({'ERROR': 'Kind must be one of: marks, reviews'}), 404
+    limit, _ = get_page_params(request.args)
+    period = request.args.get('period', 'all')
+    hitters = trending.top(period, min(limit, CAPACITY))
+    if hitters is None:
+        return (
+            jsonify(
+                {
+                    'ERROR': 'Period must be one of: {}'.format(
+                        ', '.join(trending.periods)
+                    )
+                }
+            ),
+            400,
+        )
+    return jsonify(
+        {
+            'FILMS': [
+                {'name': key[0], 'year': key[1], 'count': count, 'error': error}
+                for key, count, error in hitters
+            ]
+        }
+    )
@@ -1,41 +1,88 @@
-from typing import Any, Dict, List, Union
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, List, Mapping, Optional, Tuple, Union
 
-from movies.film import Film
+from movies.activity import Activity
+from movies.film import Film, FilmKey
+from movies.pagination import paginate
+from movies.storage import FilmCatalog, film_key
 
 
 class User:
+    """Пользователь и его действия с фильмами.
+
+    activity упорядочен по времени последнего действия, поэтому история
+    отдается от новых фильмов к старым без сортировки.
+    """
+
+    __slots__ = ('name', 'password', 'activity', 'lock')
+
     def __init__(
-        self, name: str, password: str, reviews: Dict[str, str],
+        self,
+        name: str,
+        password: str,
+        activity: Optional[Mapping[FilmKey, Activity]] = None,
     ):
         self.name = name
         self.password = password
-        self.reviews = reviews
+        self.activity: 'OrderedDict[FilmKey, Activity]' = OrderedDict(activity or {})
+        self.lock = threading.Lock()
 
     def add_review_or_mark(
-        self, film: Film, storage: List[Film], data: Any
+        self, film: Film, storage: FilmCatalog, data: Any, at: Optional[float] = None
     ) -> Union[Film, None]:
-        needed_film = None
-        for item in storage:
-            if item.name == film.name and item.year == film.year:
-                needed_film = item
-                break
+        needed_film = storage.get(film.name, film.year)
 
         if needed_film is not None:
-            if isinstance(data, str):
-                needed_film.reviews.append(data)
+            return self.rate_film(needed_film, storage, data, at)
+        return None
 
+    def rate_film(
+        self, film: Film, storage: FilmCatalog, data: Any, at: Optional[float] = None
+    ) -> Union[Film, None]:
+        """Добавляем отзыв или оценку фильму, уже найденному в каталоге.
+
+        Повторная оценка того же фильма заменяет прежнюю.
+        """
+        if isinstance(data, int) and (data < 0 or data > 10):
+            return None
+        if not isinstance(data, (int, str)):
+            return film
+        at = time.time() if at is None else at
+        key = film_key(film.name, film.year)
+        with self.lock:
+            activity = self.activity.get(key)
+            if activity is None:
+                activity = self.activity[key] = Activity()
+            if isinstance(data, str):
+                activity.add_review(at, storage.add_review(film, data))
+            elif activity.mark_index is None:
+                activity.mark_index = storage.add_mark(film, data)
+            else:
+                storage.replace_mark(film, activity.mark_index, data)
             if isinstance(data, int):
-                if data < 0 or data > 10:
-                    return None
-                needed_film.marks.append(data)
+                activity.mark = data
+                activity.marked_at = at
+            activity.updated_at = at
+            self.activity.move_to_end(key)
+        return film
 
-            self.reviews[film.name + str(film.year)] = data
-            return needed_film
-        return None
+    def history(self, limit: int, offset: int) -> List[Tuple[FilmKey, Activity]]:
+        """Страница действий пользователя, начиная с последнего"""
+        with self.lock:
+            return list(paginate(reversed(self.activity.items()), limit, offset))
+
+    def activity_list(self, storage: FilmCatalog) -> Iterable[List[Any]]:
+        with self.lock:
+            items = list(self.activity.items())
+        for key, activity in items:
+            film = storage.get(*key)
+            if film is not None:
+                yield [key[0], key[1]] + activity.to_list(film)
 
-    def add_film(self, name: str, year: int, storage: List[Film]) -> Union[Film, None]:
-        for film in storage:
-            if film.name == name and int(film.year) == year:
-                return None
+    def add_film(self, name: str, year: int, storage: FilmCatalog) -> Union[Film, None]:
+        if storage.get(name, year) is not None:
+            return None
         film = Film(name, year, [], [])
         return film
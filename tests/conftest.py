@@ -0,0 +1,40 @@
+from base64 import b64encode
+
+import pytest
+from movies.app import FILM_STORAGE, USER_STORAGE, server
+from movies.auth import FAILURES
+from movies.user import User
+from werkzeug.security import generate_password_hash
+
+
+@pytest.fixture()
+def login():
+    return "login"
+
+
+@pytest.fixture()
+def password():
+    return "password"
+
+
+@pytest.fixture()
+def header(login, password):
+    token = b64encode(f'{login}:{password}'.encode()).decode()
+    return {'Authorization': f'Basic {token}'}
+
+
+@pytest.fixture()
+def registered(login, password):
+    FILM_STORAGE.clear()
+    USER_STORAGE.clear()
+    FAILURES.clear()
+    USER_STORAGE.add(User(login, generate_password_hash(password), {}))
+    yield USER_STORAGE.get(login)
+    FILM_STORAGE.clear()
+    USER_STORAGE.clear()
+
+
+@pytest.fixture()
+def client(registered):
+    with server.test_client() as client:
+        yield client
@@ -2,9 +2,17 @@ from base64 import b64encode
 
 import pytest
 from flask import json
-from movies.app import FILM_STORAGE, USER_STORAGE, find_film, find_user, server
+from movies.app import (
+    CREDENTIALS,
+    FILM_STORAGE,
+    USER_STORAGE,
+    find_film,
+    find_user,
+    server,
+)
 from movies.exception import FilmNotFound, UserNotFound
 from movies.film import Film
+from movies.storage import FilmCatalog, UserRegistry
 from movies.user import User
 from werkzeug.security import generate_password_hash
 
@@ -27,7 +35,7 @@ def header(login, password):
 
 @pytest.fixture(autouse=True)
 def user_auth(login, password):
-    USER_STORAGE.append(User("login", generate_password_hash(password), {}))
+    USER_STORAGE.add(User("login", generate_password_hash(password), {}))
     return USER_STORAGE
 
 
@@ -57,7 +65,9 @@ def user_not_exist():
 
 @pytest.fixture()
 def user_storage(user_exist):
-    return [user_exist]
+    storage = UserRegistry()
+    storage.add(user_exist)
+    return storage
 
 
 @pytest.fixture()
@@ -74,7 +84,9 @@ def film_not_exist():
 
 @pytest.fixture()
 def film_storage(film_exist):
-    return [film_exist]
+    storage = FilmCatalog()
+    storage.add(film_exist)
+    return storage
 
 
 def test_find_not_exist_user(user_not_exist, user_storage):
@@ -158,6 +170,46 @@ def test_create_film(client, header):
     assert data['FILM'] == {'name': 'film', 'year': 2010}
 
 
+def test_create_film_bad_year(client, header):
+    response = client.post(
+        '/movies/api/v1.0/login/add',
+        headers=header,
+        data=json.dumps({'name': 'film', 'year': 'year'}),
+        content_type='application/json',
+    )
+    data = json.loads(response.get_data())
+    assert response.status_code == 400
+    assert data['ERROR'] == 'Year of film must be a number, check it'
+
+
+def test_create_film_twice(client, header):
+    test_create_film(client, header)
+    response = client.post(
+        '/movies/api/v1.0/login/add',
+        headers=header,
+        data=json.dumps({'name': 'film', 'year': '2010'}),
+        content_type='application/json',
+    )
+    data = json.loads(response.get_data())
+    assert data['ERROR'] == 'This film already exist'
+
+
+def test_unauthorized(client):
+    token = b64encode(b'login:wrong').decode()
+    data = client.get(
+        '/movies/api/v1.0/films', headers={'Authorization': f'Basic {token}'}
+    )
+    assert data.status_code == 401
+
+
+def test_credentials_cached(client, header):
+    CREDENTIALS.clear()
+    hits = CREDENTIALS.hits
+    client.get('/movies/api/v1.0/films', headers=header)
+    client.get('/movies/api/v1.0/films', headers=header)
+    assert CREDENTIALS.hits == hits + 1
+
+
 def test_get_films_empty(client, header):
     data = client.get('/movies/api/v1.0/films', headers=header)
     assert b'LIST OF FILMS' in data.get_data()
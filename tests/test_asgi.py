@@ -0,0 +1,204 @@
+import asyncio
+import http.client
+import socket
+import threading
+
+import pytest
+from flask import json
+from movies.aioserver import start
+from movies.asgi import AsgiApp, build_environ
+from movies.app import FILM_STORAGE, server
+from movies.film import Film
+
+
+@pytest.fixture()
+def app(registered):
+    FILM_STORAGE.add(Film('film', 2010, [4, 6], []))
+    return AsgiApp(server, workers=4)
+
+
+def call(app, scope, body=b''):
+    messages = [{'type': 'http.request', 'body': body}]
+    sent = []
+
+    async def receive():
+        return messages.pop()
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+def http_scope(method, path, headers, query=b''):
+    return {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query,
+        'headers': [
+            (name.lower().encode(), value.encode()) for name, value in headers.items()
+        ],
+    }
+
+
+def test_build_environ():
+    environ = build_environ(
+        http_scope('GET', '/path', {'Content-Type': 'text/plain', 'X-A': '1'}), b'body'
+    )
+    assert environ['CONTENT_TYPE'] == 'text/plain'
+    assert environ['CONTENT_LENGTH'] == '4'
+    assert environ['HTTP_X_A'] == '1'
+    assert environ['wsgi.input'].read() == b'body'
+
+
+def test_same_response_as_flask(app, header):
+    sent = call(
+        app, http_scope('GET', '/movies/api/v1.0/get_average/film/2010', header)
+    )
+    assert sent[0]['status'] == 200
+    body = b''.join(message.get('body', b'') for message in sent[1:])
+    assert json.loads(body) == {'AVERAGE': 5}
+    assert sent[-1]['more_body'] is False
+
+
+def test_post_and_unauthorized(app):
+    body = json.dumps({'username': 'new', 'password': 'secret'}).encode()
+    sent = call(
+        app,
+        http_scope(
+            'POST',
+            '/movies/api/v1.0/create_account',
+            {'Content-Type': 'application/json'},
+        ),
+        body,
+    )
+    assert sent[0]['status'] == 200
+    sent = call(app, http_scope('GET', '/movies/api/v1.0/films', {}))
+    assert sent[0]['status'] == 401
+
+
+def test_body_too_large(app, monkeypatch):
+    monkeypatch.setattr('movies.asgi.MAX_BODY', 1)
+    sent = call(app, http_scope('POST', '/', {}), b'body')
+    assert sent[0]['status'] == 413
+
+
+def test_lifespan(app):
+    messages = [{'type': 'lifespan.shutdown'}, {'type': 'lifespan.startup'}]
+    sent = []
+
+    async def receive():
+        return messages.pop()
+
+    async def send(message):
+        sent.append(message['type'])
+
+    asyncio.run(app({'type': 'lifespan'}, receive, send))
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+
+@pytest.fixture()
+def address(app):
+    loop = asyncio.new_event_loop()
+    aio_server = loop.run_until_complete(start(app, '127.0.0.1', 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield aio_server.sockets[0].getsockname()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    aio_server.close()
+    loop.close()
+
+
+def test_http_server(address, header):
+    connection = http.client.HTTPConnection(*address)
+    for _ in range(2):
+        connection.request(
+            'GET', '/movies/api/v1.0/get_count_marks/film/2010', headers=header
+        )
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.read()) == {'COUNT_MARKS': 2}
+    connection.request(
+        'GET',
+        '/movies/api/v1.0/films?format=ndjson&fields=name',
+        headers=dict(header, Connection='close'),
+    )
+    response = connection.getresponse()
+    assert response.getheader('Transfer-Encoding') == 'chunked'
+    assert json.loads(response.read()) == {'name': 'film'}
+    connection.close()
+
+
+def raw_request(address, data):
+    with socket.create_connection(address, timeout=5) as connection:
+        connection.sendall(data)
+        received = b''
+        while True:
+            chunk = connection.recv(65536)
+            if not chunk:
+                return received
+            received += chunk
+
+
+@pytest.mark.parametrize(
+    'headers, status',
+    [
+        (b'Transfer-Encoding: chunked\r\n', b'501'),
+        (b'Content-Length: 100\r\n', b'413'),
+        (b'Content-Length: -1\r\n', b'400'),
+        (b'Content-Length: 5\r\nContent-Length: 6\r\n', b'400'),
+    ],
+)
+def test_http_server_rejects_body(address, monkeypatch, headers, status):
+    monkeypatch.setattr('movies.asgi.MAX_BODY', 10)
+    body = b'5\r\nhello\r\n0\r\n\r\nGET /metrics HTTP/1.1\r\n\r\n'
+    received = raw_request(
+        address,
+        b'POST /movies/api/v1.0/create_account HTTP/1.1\r\nHost: x\r\n'
+        + headers
+        + b'\r\n'
+        + body,
+    )
+    assert received.startswith(b'HTTP/1.1 ' + status)
+    assert received.count(b'HTTP/1.1') == 1
+    assert b'Connection: close' in received
+
+
+def test_http_server_reads_body(address):
+    connection = http.client.HTTPConnection(*address)
+    connection.request(
+        'POST',
+        '/movies/api/v1.0/create_account',
+        body=json.dumps({'username': 'new', 'password': 'secret'}),
+        headers={'Content-Type': 'application/json', 'Connection': 'close'},
+    )
+    assert connection.getresponse().status == 200
+    connection.close()
+
+
+def test_http_server_rejects_too_many_headers(address):
+    headers = b''.join(b'X-%d: 1\r\n' % number for number in range(100))
+    received = raw_request(
+        address,
+        b'GET /movies/api/v1.0/films HTTP/1.1\r\nHost: x\r\n'
+        + headers
+        + b'GET /metrics HTTP/1.1\r\n\r\n',
+    )
+    assert received.startswith(b'HTTP/1.1 431')
+    assert received.count(b'HTTP/1.1') == 1
+    assert b'Connection: close' in received
+
+
+@pytest.mark.parametrize(
+    'data',
+    [
+        b'GET /metrics HTTP/1.1\r\nHost: x\r\n',
+        b'POST /metrics HTTP/1.1\r\nContent-Length: 5\r\n\r\nab',
+    ],
+)
+def test_http_server_times_out_slow_client(address, monkeypatch, data):
+    monkeypatch.setattr('movies.aioserver.READ_TIMEOUT', 0.1)
+    assert raw_request(address, data) == b''
@@ -0,0 +1,94 @@
+import pytest
+from flask import json
+from movies.app import FILM_STORAGE
+from movies.film import Film
+
+
+@pytest.fixture()
+def film(registered):
+    film = Film('film', 2010, [], [])
+    FILM_STORAGE.add(film)
+    return film
+
+
+def post(client, header, route, body, content_type='application/json'):
+    response = client.post(
+        '/movies/api/v1.0/login/' + route,
+        headers=header,
+        data=body,
+        content_type=content_type,
+    )
+    return response.status_code, json.loads(response.get_data())
+
+
+def test_marks_batch(client, header, film):
+    items = [
+        {'name': 'film', 'year': 2010, 'mark': 5},
+        {'name': 'film', 'year': '2010', 'mark': '7'},
+        {'name': 'film', 'year': 2010, 'mark': 11},
+        {'name': 'film', 'year': 2010, 'mark': 'bad'},
+        {'name': 'other', 'year': 2010, 'mark': 5},
+        {'name': 'film', 'mark': 5},
+    ]
+    status, data = post(client, header, 'add_marks_batch', json.dumps(items))
+    assert status == 200
+    assert data['RESULTS'][:2] == [
+        {'ADD_MARK': {'name': 'film', 'mark': 5}},
+        {'ADD_MARK': {'name': 'film', 'mark': 7}},
+    ]
+    assert all('ERROR' in result for result in data['RESULTS'][2:])
+    assert data['RESULTS'][5]['ERROR'] == 'Invalid data, please give name, year, mark'
+    assert film.marks.tolist() == [7]
+    assert film.get_average_mark() == 7
+
+
+def test_reviews_batch_ndjson(client, header, film):
+    body = '\n'.join(
+        [
+            json.dumps({'name': 'film', 'year': 2010, 'review': 'good'}),
+            json.dumps({'name': 'film', 'year': 2010, 'review': 5}),
+            '',
+            json.dumps({'name': 'film', 'year': 'year', 'review': 'bad'}),
+            json.dumps({'name': 'other', 'year': 2010, 'review': 'bad'}),
+        ]
+    )
+    status, data = post(
+        client, header, 'add_reviews_batch', body, 'application/x-ndjson'
+    )
+    assert data['RESULTS'] == [
+        {'ADD_REVIEW': {'name': 'film', 'review': 'good'}},
+        {'ERROR': 'Review must be a text, check it'},
+        {'ERROR': 'Year of film must be a number, check it'},
+        {'ERROR': 'This film does not exist'},
+    ]
+    assert film.reviews == ['good']
+
+
+def test_films_batch(client, header, film):
+    items = [{'name': 'new', 'year': 2020}, {'name': 'new', 'year': 2020}]
+    status, data = post(client, header, 'add_films_batch', json.dumps(items))
+    assert data['RESULTS'] == [
+        {'FILM': {'name': 'new', 'year': 2020}},
+        {'ERROR': 'This film already exist'},
+    ]
+    assert FILM_STORAGE.get('new', 2020) is not None
+
+
+@pytest.mark.parametrize(
+    'body, content_type',
+    [
+        ('{"name": "film"}', 'application/json'),
+        ('[1, 2]', 'application/json'),
+        ('{"name": ', 'application/x-ndjson'),
+    ],
+)
+def test_bad_batch(client, header, film, body, content_type):
+    status, data = post(client, header, 'add_films_batch', body, content_type)
+    assert status == 400
+    assert data['ERROR'] == 'Invalid data, please give an array of films'
+
+
+def test_batch_too_large(client, header, film, monkeypatch):
+    monkeypatch.setattr('movies.batch.MAX_BATCH', 1)
+    status, data = post(client, header, 'add_films_batch', json.dumps([{}, {}]))
+    assert status == 400
@@ -0,0 +1,87 @@
+import pytest
+from movies.cache import CredentialCache, ResponseCache, make_etag
+
+
+@pytest.fixture()
+def cache():
+    return CredentialCache(maxsize=2, ttl=60.0)
+
+
+def test_miss_then_hit(cache):
+    assert cache.check('user', 'password', 'hash') is False
+    cache.remember('user', 'password', 'hash')
+    assert cache.check('user', 'password', 'hash') is True
+    assert cache.stats() == {'size': 1, 'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+
+
+def test_wrong_password(cache):
+    cache.remember('user', 'password', 'hash')
+    assert cache.check('user', 'other', 'hash') is False
+
+
+def test_changed_hash(cache):
+    cache.remember('user', 'password', 'hash')
+    assert cache.check('user', 'password', 'new_hash') is False
+    assert cache.stats()['size'] == 0
+
+
+def test_expired():
+    cache = CredentialCache(ttl=-1.0)
+    cache.remember('user', 'password', 'hash')
+    assert cache.check('user', 'password', 'hash') is False
+
+
+def test_evict_oldest(cache):
+    cache.remember('first', 'password', 'hash')
+    cache.remember('second', 'password', 'hash')
+    cache.remember('third', 'password', 'hash')
+    assert cache.check('first', 'password', 'hash') is False
+    assert cache.check('third', 'password', 'hash') is True
+
+
+def test_invalidate(cache):
+    cache.remember('user', 'password', 'hash')
+    cache.remember('other', 'password', 'hash')
+    cache.invalidate('user')
+    assert cache.check('user', 'password', 'hash') is False
+    assert cache.check('other', 'password', 'hash') is True
+
+
+def test_empty_stats(cache):
+    assert cache.stats()['hit_ratio'] == 0.0
+
+
+def test_response_cache_invalidate():
+    cache = ResponseCache(maxsize=2)
+    generations = cache.generations(('film',))
+    etag = cache.put('/a', b'body', ('film',), generations)
+    assert cache.get('/a') == (b'body', etag)
+    cache.invalidate(('other',))
+    assert cache.get('/a') is not None
+    cache.invalidate(('film',))
+    assert cache.get('/a') is None
+    assert cache.stats() == {'size': 0, 'hits': 2, 'misses': 1, 'hit_ratio': 2 / 3}
+
+
+def test_response_cache_skips_stale():
+    cache = ResponseCache()
+    generations = cache.generations(('film',))
+    cache.invalidate(('film',))
+    cache.put('/a', b'old', ('film',), generations)
+    assert cache.get('/a') is None
+    generations = cache.generations(())
+    cache.clear()
+    cache.put('/b', b'old', (), generations)
+    assert cache.get('/b') is None
+
+
+def test_response_cache_evicts():
+    cache = ResponseCache(maxsize=2)
+    for key in ('/a', '/b', '/c'):
+        cache.put(key, key.encode(), ('tag',), cache.generations(('tag',)))
+    assert cache.get('/a') is None
+    assert cache.get('/c') == (b'/c', make_etag(b'/c'))
+    cache.put('/c', b'new', ('tag',), cache.generations(('tag',)))
+    assert cache.get('/c')[0] == b'new'
+    cache.invalidate(('tag',))
+    assert cache.stats()['size'] == 0
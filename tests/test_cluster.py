@@ -0,0 +1,161 @@
+import http.client
+import socket
+import time
+from base64 import b64encode
+
+import pytest
+from flask import json
+from movies.cluster import check_storage, start_workers, stop_workers
+from movies.film import Film
+from movies.persistence import SqliteBackend
+from movies.storage import FilmCatalog, UserRegistry
+from movies.user import User
+
+
+def worker(path):
+    backend = SqliteBackend(str(path), poll_interval=0)
+    films, users = FilmCatalog(), UserRegistry()
+    backend.restore(films, users)
+    return backend, films, users
+
+
+def test_workers_share_changes(tmp_path):
+    first, films_first, users_first = worker(tmp_path / 'movies.db')
+    second, films_second, users_second = worker(tmp_path / 'movies.db')
+    user = User('user', 'hash', {})
+    film = Film('film', 2010, [], [])
+    assert first.record_user(user) and users_first.add(user)
+    assert first.record_film(film) and films_first.add(film)
+    user.add_review_or_mark(film, films_first, 8)
+    first.record_mark('user', film, 8)
+
+    assert first.poll() == 0
+    assert second.poll() == 3
+    assert second.poll() == 0
+    assert users_second.get('user').password == 'hash'
+    assert films_second.get('film', 2010).marks.tolist() == [8]
+    assert films_second.averages.count(8, 8) == 1
+    assert films_first.get('film', 2010).marks.tolist() == [8]
+    first.close()
+    second.close()
+
+
+def test_claims_are_unique(tmp_path):
+    first, _, _ = worker(tmp_path / 'movies.db')
+    second, _, _ = worker(tmp_path / 'movies.db')
+    assert first.record_user(User('user', 'first', {}))
+    assert not second.record_user(User('user', 'second', {}))
+    assert second.record_film(Film('film', 2010, [], []))
+    assert not first.record_film(Film('film', 2010, [], []))
+    assert not first.record_mark('user', Film('other', 2010, [], []), 5)
+    first.close()
+    second.close()
+
+
+def test_poll_interval(tmp_path):
+    first, _, _ = worker(tmp_path / 'movies.db')
+    second = SqliteBackend(str(tmp_path / 'movies.db'), poll_interval=60)
+    users = UserRegistry()
+    second.restore(FilmCatalog(), users)
+    second.poll(force=True)
+    first.record_user(User('user', 'hash', {}))
+    assert second.poll() == 0
+    assert second.poll(force=True) == 1
+    assert 'user' in users
+    first.close()
+    second.close()
+
+
+def test_check_storage(monkeypatch):
+    monkeypatch.setenv('MOVIES_STORAGE', 'memory')
+    with pytest.raises(SystemExit):
+        check_storage()
+
+
+def request(port, method, path, body=None, headers=None):
+    for _ in range(100):
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            connection.request(method, path, body, headers or {})
+            response = connection.getresponse()
+            return response.status, json.loads(response.read())
+        except ConnectionError:
+            time.sleep(0.1)
+    raise AssertionError('Workers did not start')
+
+
+def test_cluster(tmp_path, monkeypatch):
+    monkeypatch.setenv('MOVIES_STORAGE', 'sqlite://' + str(tmp_path / 'movies.db'))
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    processes = start_workers('127.0.0.1', port, 2)
+    try:
+        body = json.dumps({'username': 'user', 'password': 'password'})
+        headers = {'Content-Type': 'application/json'}
+        assert request(port, 'POST', '/movies/api/v1.0/create_account', body, headers)[
+            1
+        ] == {'ACTION': {'username': 'user'}}
+        token = b64encode(b'user:password').decode()
+        headers['Authorization'] = 'Basic ' + token
+        film = json.dumps({'name': 'film', 'year': 2010})
+        results = [
+            request(port, 'POST', '/movies/api/v1.0/user/add', film, headers)[1]
+            for _ in range(4)
+        ]
+        assert results.count({'FILM': {'name': 'film', 'year': 2010}}) == 1
+        assert results.count({'ERROR': 'This film already exist'}) == 3
+    finally:
+        stop_workers(processes)
+
+
+def test_password_update(tmp_path):
+    first, _, users_first = worker(tmp_path / 'movies.db')
+    user = User('user', 'old', {})
+    assert first.record_user(user) and users_first.add(user)
+    user.password = 'new'
+    assert first.record_password(user)
+    assert not first.record_password(User('other', 'hash', {}))
+    users = UserRegistry()
+    SqliteBackend(str(tmp_path / 'movies.db')).restore(FilmCatalog(), users)
+    assert users.get('user').password == 'new'
+    first.close()
+
+
+def test_workers_agree_on_replaced_mark(tmp_path):
+    first, films_first, users_first = worker(tmp_path / 'movies.db')
+    second, films_second, users_second = worker(tmp_path / 'movies.db')
+    user = User('user', 'hash', {})
+    film = Film('film', 2010, [], [])
+    assert first.record_user(user) and users_first.add(user)
+    assert first.record_film(film) and films_first.add(film)
+    second.poll(force=True)
+    for backend, films, users, mark in (
+        (first, films_first, users_first, 3),
+        (second, films_second, users_second, 7),
+    ):
+        film = films.get('film', 2010)
+        with backend.change():
+            users.get('user').rate_film(film, films, mark)
+            backend.record_mark('user', film, mark)
+    first.poll(force=True)
+    second.poll(force=True)
+    restarted, films_restarted, _ = worker(tmp_path / 'movies.db')
+    for films in (films_first, films_second, films_restarted):
+        assert films.get('film', 2010).marks.tolist() == [7]
+    for backend in (first, second, restarted):
+        backend.close()
+
+
+def test_workers_share_password_update(tmp_path):
+    first, _, users_first = worker(tmp_path / 'movies.db')
+    second, _, users_second = worker(tmp_path / 'movies.db')
+    user = User('user', 'old', {})
+    assert first.record_user(user) and users_first.add(user)
+    assert second.poll(force=True) == 1
+    user.password = 'new'
+    assert first.record_password(user)
+    assert second.poll(force=True) == 1
+    assert users_second.get('user').password == 'new'
+    first.close()
+    second.close()
@@ -0,0 +1,113 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask import json
+from movies.app import FILM_STORAGE, USER_STORAGE, server
+from movies.film import Film, check_aggregates
+from movies.storage import FilmCatalog, UserRegistry
+from movies.user import User
+
+WRITERS = 32
+OPERATIONS = 4000
+
+
+@pytest.fixture(autouse=True)
+def fast_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def run(task, count):
+    with ThreadPoolExecutor(max_workers=WRITERS) as pool:
+        return list(pool.map(task, range(count)))
+
+
+def test_no_lost_marks_and_reviews():
+    catalog = FilmCatalog()
+    films = [Film('film{}'.format(number), 2000, [], []) for number in range(4)]
+    for film in films:
+        catalog.add(film)
+    users = [User('user{}'.format(number), 'hash', {}) for number in range(1000)]
+
+    def write(number):
+        film = films[number % len(films)]
+        users[number // len(films)].rate_film(film, catalog, number % 11)
+        catalog.add_review(film, 'review')
+
+    run(write, OPERATIONS)
+    assert sum(film.get_count_marks() for film in films) == OPERATIONS
+    assert sum(film.get_count_reviews() for film in films) == OPERATIONS
+    for film in films:
+        assert check_aggregates(film)
+        key = (film.name, film.year)
+        assert key in list(catalog.averages.equal(film.get_average_mark()))
+    assert len(catalog.averages) == len(films)
+
+
+def test_concurrent_mark_replacement():
+    catalog = FilmCatalog()
+    films = [Film('film{}'.format(number), 2000, [], []) for number in range(4)]
+    for film in films:
+        catalog.add(film)
+    users = [User('user{}'.format(number), 'hash', {}) for number in range(8)]
+
+    def write(number):
+        film = films[number % len(films)]
+        users[number % len(users)].rate_film(film, catalog, number % 11)
+
+    run(write, OPERATIONS)
+    for film in films:
+        key = (film.name, film.year)
+        latest = sorted(
+            user.activity[key].mark for user in users if key in user.activity
+        )
+        assert sorted(film.marks.tolist()) == latest
+        assert check_aggregates(film)
+        assert key in list(catalog.averages.equal(film.get_average_mark()))
+
+
+def test_no_duplicate_films_or_users():
+    catalog, registry = FilmCatalog(), UserRegistry()
+    added_films = run(
+        lambda number: catalog.add(Film('film{}'.format(number % 100), 2000, [], [])),
+        OPERATIONS,
+    )
+    added_users = run(
+        lambda number: registry.add(User('user{}'.format(number % 100), 'hash', {})),
+        OPERATIONS,
+    )
+    assert added_films.count(True) == 100
+    assert added_users.count(True) == 100
+    assert len(catalog) == len(list(catalog.keys())) == len(catalog.names) == 100
+    assert len(registry) == 100
+
+
+def test_concurrent_requests(registered, header):
+    FILM_STORAGE.add(Film('film', 2000, [], []))
+
+    def request(number):
+        with server.test_client() as client:
+            if number % 2:
+                response = client.post(
+                    '/movies/api/v1.0/create_account',
+                    data=json.dumps({'username': 'new', 'password': 'password'}),
+                    content_type='application/json',
+                )
+                return 'ACTION' in json.loads(response.get_data())
+            client.post(
+                '/movies/api/v1.0/login/add_mark',
+                headers=header,
+                data=json.dumps({'name': 'film', 'year': 2000, 'mark': number % 11}),
+                content_type='application/json',
+            )
+            return False
+
+    created = run(request, 40)
+    assert created.count(True) == 1
+    assert len(USER_STORAGE) == 2
+    film = FILM_STORAGE.get('film', 2000)
+    assert film.get_count_marks() == 1
+    assert check_aggregates(film)
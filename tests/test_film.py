@@ -1,5 +1,5 @@
 import pytest
-from movies.film import Film
+from movies.film import Film, check_aggregates
 
 
 @pytest.fixture()
@@ -30,6 +30,15 @@ def test_create_dict(film):
     assert actual['year'] == 2010
 
 
+def test_create_dict_marks(film_with_data):
+    assert film_with_data.create_dict()['marks'] == [5, 4]
+
+
+def test_slots(film):
+    with pytest.raises(AttributeError):
+        film.rating = 5
+
+
 def test_get_average(film, film_with_data):
     actual = film.get_average_mark()
     assert actual == 0
@@ -43,3 +52,37 @@ def test_get_count_reviews(film_with_data):
 
 def test_get_count_marks(film_with_data):
     assert film_with_data.get_count_marks() == 2
+
+
+def test_add_mark(film):
+    film.add_mark(4)
+    film.add_mark(10)
+    assert film.marks.tolist() == [4, 10]
+    assert film.get_count_marks() == 2
+    assert film.get_average_mark() == 7
+    assert film.get_stddev_mark() == 3.0
+    assert check_aggregates(film) is True
+
+
+def test_add_review(film):
+    film.add_review('review')
+    assert film.reviews == ['review']
+    assert film.get_count_reviews() == 1
+
+
+def test_get_stddev(film, film_with_data):
+    assert film.get_stddev_mark() == 0.0
+    assert film_with_data.get_stddev_mark() == 0.5
+
+
+def test_check_aggregates(film_with_data):
+    assert check_aggregates(film_with_data) is True
+    film_with_data.marks.append(1)
+    assert check_aggregates(film_with_data) is False
+
+
+def test_create_dict_fields(film_with_data):
+    assert film_with_data.create_dict(['name', 'marks']) == {
+        'name': 'film',
+        'marks': [5, 4],
+    }
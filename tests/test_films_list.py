@@ -0,0 +1,57 @@
+import pytest
+from flask import json
+from movies.app import FILM_STORAGE
+from movies.film import Film
+
+
+@pytest.fixture()
+def films(registered):
+    for number in range(5):
+        FILM_STORAGE.add(Film('film{}'.format(number), 2000, [number], ['review']))
+
+
+def get_page(client, header, query):
+    response = client.get('/movies/api/v1.0/films' + query, headers=header)
+    return response.status_code, json.loads(response.get_data())
+
+
+def test_pages(client, header, films):
+    status, data = get_page(client, header, '?limit=2')
+    assert list(data['LIST OF FILMS']) == ['FILM0', 'FILM1']
+    assert data['NEXT_CURSOR'] == 2
+    status, data = get_page(client, header, '?limit=2&cursor=4')
+    assert list(data['LIST OF FILMS']) == ['FILM4']
+    assert data['NEXT_CURSOR'] is None
+
+
+def test_fields(client, header, films):
+    status, data = get_page(client, header, '?limit=1&fields=name,marks')
+    assert data['LIST OF FILMS'] == {'FILM0': {'name': 'film0', 'marks': [0]}}
+
+
+@pytest.mark.parametrize('query', ['?fields=name,password', '?cursor=-1'])
+def test_bad_params(client, header, films, query):
+    status, data = get_page(client, header, query)
+    assert status == 400
+    assert 'ERROR' in data
+
+
+def test_ndjson(client, header, films):
+    response = client.get(
+        '/movies/api/v1.0/films?format=ndjson&cursor=1&fields=name', headers=header
+    )
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'name': 'film1'},
+        {'name': 'film2'},
+        {'name': 'film3'},
+        {'name': 'film4'},
+    ]
+
+
+def test_ndjson_limit(client, header, films):
+    response = client.get(
+        '/movies/api/v1.0/films?format=ndjson&limit=2', headers=header
+    )
+    assert len(response.get_data(as_text=True).splitlines()) == 2
@@ -0,0 +1,62 @@
+import pytest
+from flask import json
+from movies.app import FILM_STORAGE, USER_STORAGE
+from movies.film import Film
+
+
+@pytest.fixture()
+def rated(client, header, registered):
+    for name in ('first', 'second', 'third'):
+        FILM_STORAGE.add(Film(name, 2010, [], []))
+    for name, data in [
+        ('first', {'mark': 3}),
+        ('second', {'review': 'good'}),
+        ('third', {'mark': 5}),
+        ('first', {'mark': 9}),
+        ('first', {'review': 'better'}),
+    ]:
+        route = 'add_mark' if 'mark' in data else 'add_review'
+        client.post(
+            '/movies/api/v1.0/login/' + route,
+            headers=header,
+            data=json.dumps(dict(name=name, year=2010, **data)),
+            content_type='application/json',
+        )
+    return client
+
+
+def history(client, header, query=''):
+    response = client.get('/movies/api/v1.0/login/history' + query, headers=header)
+    return response.status_code, json.loads(response.get_data())
+
+
+def test_history_newest_first(rated, header):
+    status, data = history(rated, header)
+    assert status == 200
+    assert data['COUNT'] == 3
+    assert [item['name'] for item in data['HISTORY']] == ['first', 'third', 'second']
+    first = data['HISTORY'][0]
+    assert first['mark'] == 9
+    assert [review['review'] for review in first['reviews']] == ['better']
+    assert first['marked_at'] <= first['updated_at']
+    assert data['HISTORY'][2]['mark'] is None
+
+
+def test_mark_replaced(rated):
+    film = FILM_STORAGE.get('first', 2010)
+    assert film.marks.tolist() == [9]
+    assert film.get_average_mark() == 9
+    assert list(FILM_STORAGE.averages.equal(9)) == [('first', 2010)]
+    assert USER_STORAGE.get('login').activity[('first', 2010)].mark_index == 0
+
+
+def test_history_page(rated, header):
+    status, data = history(rated, header, '?limit=1&offset=1')
+    assert [item['name'] for item in data['HISTORY']] == ['third']
+    assert history(rated, header, '?offset=5')[1]['HISTORY'] == []
+    assert history(rated, header, '?limit=-1')[0] == 400
+
+
+def test_history_unknown_user(client, header, registered):
+    response = client.get('/movies/api/v1.0/nobody/history', headers=header)
+    assert response.status_code == 404
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+from movies.blocks import SortedBlocks
+from movies.index import AverageIndex, YearIndex
+
+
+@pytest.fixture()
+def index():
+    averages = AverageIndex()
+    averages.update(('a', 2000), 5)
+    averages.update(('b', 2001), 7.5)
+    averages.update(('c', 2002), 5)
+    averages.update(('d', 2003), 0)
+    return averages
+
+
+def test_equal(index):
+    assert list(index.equal(5)) == [('a', 2000), ('c', 2002)]
+    assert list(index.equal(6)) == []
+
+
+def test_between(index):
+    assert list(index.between(1, 8)) == [('a', 2000), ('c', 2002), ('b', 2001)]
+    assert list(index.between(8, 10)) == []
+
+
+def test_order(index):
+    assert list(index.descending())[0] == ('b', 2001)
+    assert list(index.ascending())[0] == ('d', 2003)
+
+
+def test_update_moves_entry(index):
+    index.update(('d', 2003), 9)
+    index.update(('a', 2000), 5)
+    assert list(index.descending())[0] == ('d', 2003)
+    assert list(index.equal(0)) == []
+    assert len(index) == 4
+
+
+def test_clear(index):
+    index.clear()
+    assert len(index) == 0
+
+
+def test_count_and_reverse(index):
+    assert index.count(5, 7.5) == 3
+    assert index.count(8, 1) == 0
+    assert list(index.between(5, 7.5, reverse=True))[0] == ('b', 2001)
+
+
+def test_years():
+    years = YearIndex()
+    for key in [('a', 2001), ('b', 1999), ('c', 2001), ('d', 2010)]:
+        years.add(key)
+    assert list(years.between(2000, 2010)) == [('a', 2001), ('c', 2001), ('d', 2010)]
+    assert years.count(1990, 2001) == 3
+    years.clear()
+    assert list(years.between(0, 3000)) == []
+
+
+def test_rebuild(index):
+    index.rebuild([(('x', 2000), 3), (('y', 2000), 1)])
+    assert list(index.ascending()) == [('y', 2000), ('x', 2000)]
+    index.update(('x', 2000), 0)
+    assert list(index.ascending())[0] == ('x', 2000)
+
+
+def test_blocks_match_sorted_list(monkeypatch):
+    monkeypatch.setattr(SortedBlocks, 'BLOCK', 4)
+    rnd = random.Random(1)
+    index, expected = AverageIndex(), {}
+    for _ in range(2000):
+        key = ('film{}'.format(rnd.randrange(60)), 2000)
+        if rnd.random() < 0.2:
+            index.remove(key)
+            expected.pop(key, None)
+        else:
+            expected[key] = rnd.randrange(21) / 2
+            index.update(key, expected[key])
+        entries = sorted((average,) + key for key, average in expected.items())
+        low, high = sorted(rnd.randrange(21) / 2 for _ in range(2))
+        inside = [
+            (name, year) for average, name, year in entries if low <= average <= high
+        ]
+        assert list(index.between(low, high)) == inside
+        assert list(index.between(low, high, reverse=True)) == inside[::-1]
+        assert index.count(low, high) == len(inside)
+    assert list(index.ascending()) == [(name, year) for _, name, year in entries]
+    assert len(index) == len(expected)
+    index.rebuild(expected.items())
+    assert list(index.descending_items())[0][0] == entries[-1][0]
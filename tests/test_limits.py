@@ -0,0 +1,129 @@
+import threading
+from base64 import b64encode
+
+import pytest
+from movies import auth
+from movies.exception import Overloaded
+from movies.limits import AdmissionGate, FailureTracker, TokenBuckets, parse_rate
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def basic(username, password):
+    token = b64encode('{}:{}'.format(username, password).encode()).decode()
+    return {'Authorization': 'Basic ' + token}
+
+
+def test_parse_rate():
+    assert parse_rate('') == (0.0, 0.0)
+    assert parse_rate('5') == (5.0, 5.0)
+    assert parse_rate('2,10') == (2.0, 10.0)
+
+
+def test_token_buckets():
+    clock = Clock()
+    buckets = TokenBuckets(2, 3, maxsize=2, clock=clock)
+    assert [buckets.acquire('a') for _ in range(3)] == [0, 0, 0]
+    assert buckets.acquire('a') == pytest.approx(0.5)
+    clock.now += 0.5
+    assert buckets.acquire('a') == 0
+    assert buckets.acquire('b') == buckets.acquire('c') == 0
+    assert buckets.stats() == {'size': 2, 'allowed': 6, 'limited': 1}
+    assert buckets.acquire('a') == 0
+    assert TokenBuckets(0, 0).acquire('a') == 0
+
+
+def test_failure_tracker():
+    clock = Clock()
+    failures = FailureTracker(threshold=2, cooldown=10, clock=clock)
+    failures.fail('a')
+    assert failures.blocked('a') == 0
+    failures.fail('a')
+    assert failures.blocked('a') == 10
+    failures.succeed('a')
+    assert failures.blocked('a') == 0
+    failures.fail('b')
+    failures.fail('b')
+    assert failures.stats() == {'size': 1, 'blocked': 1, 'failures': 4, 'rejected': 1}
+    clock.now += 10
+    assert failures.blocked('b') == 0
+    assert failures.stats()['size'] == 0
+
+
+def test_admission_gate_sheds():
+    gate = AdmissionGate(slots=1, queue=1, timeout=0.05)
+    started, release = threading.Event(), threading.Event()
+
+    def hold():
+        with gate.admit():
+            started.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    started.wait()
+    with pytest.raises(Overloaded):
+        with gate.admit():
+            pass
+    gate.queue = 0
+    with pytest.raises(Overloaded):
+        with gate.admit():
+            pass
+    release.set()
+    holder.join()
+    with gate.admit():
+        assert gate.stats()['active'] == 1
+    assert gate.stats() == {'active': 0, 'waiting': 0, 'admitted': 2, 'shed': 2}
+
+
+@pytest.fixture()
+def counted(monkeypatch):
+    calls = []
+
+    def check(password_hash, password):
+        calls.append(password)
+        return password == 'password'
+
+    monkeypatch.setattr(auth, 'check_password_hash', check)
+    auth.CREDENTIALS.clear()
+    yield calls
+    auth.CREDENTIALS.clear()
+
+
+def test_failed_logins_skip_hash(client, counted):
+    url = '/movies/api/v1.0/get_films/average/5'
+    for _ in range(auth.FAILURES.threshold):
+        assert client.get(url, headers=basic('login', 'wrong')).status_code == 401
+    response = client.get(url, headers=basic('login', 'password'))
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert len(counted) == auth.FAILURES.threshold
+    metrics = client.get('/metrics').get_data(as_text=True)
+    assert 'movies_auth_failures_rejected' in metrics
+    auth.FAILURES.clear()
+    assert client.get(url, headers=basic('login', 'password')).status_code == 200
+
+
+def test_rate_limit(client, counted, monkeypatch):
+    monkeypatch.setattr(auth, 'USER_LIMIT', TokenBuckets(1, 2))
+    url = '/movies/api/v1.0/get_films/average/5'
+    codes = [
+        client.get(url, headers=basic('login', 'password')).status_code
+        for _ in range(3)
+    ]
+    assert codes == [200, 200, 429]
+
+
+def test_overloaded(client, counted, monkeypatch):
+    monkeypatch.setattr(auth, 'HASH_GATE', AdmissionGate(0, 0, 0))
+    response = client.get(
+        '/movies/api/v1.0/get_films/average/5', headers=basic('login', 'password')
+    )
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
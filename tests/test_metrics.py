@@ -0,0 +1,79 @@
+import pytest
+from movies.app import FILM_STORAGE
+from movies.film import Film
+from movies.metrics import METRICS, Histogram, Metrics, phase
+
+AVERAGE = '/movies/api/v1.0/get_average/<name>/<year>'
+
+
+@pytest.fixture()
+def metrics(client, header):
+    FILM_STORAGE.add(Film('film', 2010, [4, 6], []))
+    METRICS.clear()
+    client.get('/movies/api/v1.0/get_average/film/2010', headers=header)
+    client.get('/movies/api/v1.0/get_average/other/2010', headers=header)
+    client.get('/unknown')
+    text = client.get('/metrics').get_data(as_text=True)
+    return text.splitlines()
+
+
+def test_requests_by_route(metrics):
+    labels = 'route="{}",method="GET"'.format(AVERAGE)
+    assert 'movies_requests_total{{{},status="200"}} 1'.format(labels) in metrics
+    assert 'movies_requests_total{{{},status="404"}} 1'.format(labels) in metrics
+    assert (
+        'movies_requests_total{route="unmatched",method="GET",status="404"} 1'
+        in metrics
+    )
+    assert 'movies_request_duration_seconds_count{{{}}} 2'.format(labels) in metrics
+    assert (
+        'movies_request_duration_seconds_bucket{{{},le="+Inf"}} 2'.format(labels)
+        in metrics
+    )
+
+
+def test_phases(metrics):
+    labels = 'route="{}",method="GET"'.format(AVERAGE)
+    for name in ('auth', 'lookup', 'serialize'):
+        line = 'movies_phase_duration_seconds_count{{{},phase="{}"}} 2'
+        assert line.format(labels, name) in metrics
+
+
+def test_gauges(metrics):
+    assert 'movies_films 1' in metrics
+    assert 'movies_users 1' in metrics
+    assert any(line.startswith('movies_response_cache_hits ') for line in metrics)
+    assert any(line.startswith('movies_credential_cache_size ') for line in metrics)
+
+
+def test_histogram():
+    histogram = Histogram()
+    for seconds in (0.00005, 0.003, 10.0):
+        histogram.observe(seconds)
+    buckets = dict(histogram.cumulative())
+    assert buckets['0.0001'] == 1
+    assert buckets['0.0025'] == 1
+    assert buckets['0.005'] == 2
+    assert buckets['2.5'] == 2
+    assert buckets['+Inf'] == 3
+    assert histogram.count == 3
+
+
+def test_disabled():
+    metrics = Metrics(enabled=False)
+    metrics.start()
+    with phase('auth'):
+        pass
+    metrics.finish('/route', 'GET', 200)
+    assert metrics.render({}) == (
+        '# TYPE movies_requests_total counter\n'
+        '# TYPE movies_request_duration_seconds histogram\n'
+        '# TYPE movies_phase_duration_seconds histogram\n'
+    )
+
+
+def test_escaped_labels():
+    metrics = Metrics()
+    metrics.start()
+    metrics.finish('/"quoted"\\', 'GET', 200)
+    assert 'route="/\\"quoted\\"\\\\"' in metrics.render({})
@@ -0,0 +1,102 @@
+import time
+from base64 import b64encode
+
+import pytest
+from flask import json
+from movies import auth, passwords
+from movies.app import USER_STORAGE
+from movies.persistence import JournalBackend
+from movies.storage import FilmCatalog, UserRegistry
+from movies.user import User
+from werkzeug.security import check_password_hash
+
+CHEAP = 'pbkdf2:sha256:1000'
+CHEAPER = 'pbkdf2:sha256:500'
+
+
+@pytest.fixture()
+def cheap(monkeypatch):
+    monkeypatch.setattr(passwords, 'HASH_METHOD', CHEAP)
+    auth.CREDENTIALS.clear()
+    yield
+    auth.CREDENTIALS.clear()
+
+
+def basic(username, password):
+    token = b64encode('{}:{}'.format(username, password).encode()).decode()
+    return {'Authorization': 'Basic ' + token}
+
+
+def test_hash_password(cheap):
+    password_hash = passwords.hash_password('secret')
+    assert password_hash.startswith(CHEAP + '$')
+    assert check_password_hash(password_hash, 'secret')
+    assert not passwords.needs_rehash(password_hash)
+    assert passwords.needs_rehash(passwords.hash_password('secret', CHEAPER))
+    assert passwords.method_prefix('pbkdf2:sha256:1000') == CHEAP
+
+
+def test_create_account_uses_method(client, cheap):
+    response = client.post(
+        '/movies/api/v1.0/create_account',
+        data=json.dumps({'username': 'new', 'password': 'secret'}),
+        content_type='application/json',
+    )
+    assert response.status_code == 200
+    assert USER_STORAGE.get('new').password.startswith(CHEAP + '$')
+
+
+def test_rehash_on_login(client, cheap, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(auth.BACKEND, 'record_password', recorded.append)
+    user = User('old', passwords.hash_password('secret', CHEAPER), {})
+    USER_STORAGE.add(user)
+    response = client.get(
+        '/movies/api/v1.0/get_count_marks/film/2010', headers=basic('old', 'secret')
+    )
+    assert response.status_code == 404
+    for _ in range(500):
+        if not auth.REHASHING:
+            break
+        time.sleep(0.01)
+    assert user.password.startswith(CHEAP + '$')
+    assert check_password_hash(user.password, 'secret')
+    assert recorded == [user]
+    assert auth.CREDENTIALS.check('old', 'secret', user.password)
+
+
+def test_rehash_once(cheap, monkeypatch):
+    user = User('user', passwords.hash_password('secret', CHEAPER), {})
+    monkeypatch.setattr(auth, 'REHASHING', {'user'})
+    assert auth.schedule_rehash(user, 'secret') is None
+
+
+def test_rehash_skips_changed_password(cheap, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(auth.BACKEND, 'record_password', recorded.append)
+    user = User('user', 'old', {})
+    original = passwords.hash_password
+
+    def change_meanwhile(password):
+        user.password = 'changed'
+        return original(password)
+
+    monkeypatch.setattr(auth, 'hash_password', change_meanwhile)
+    auth.rehash(user, 'secret')
+    assert user.password == 'changed'
+    assert recorded == []
+
+
+def test_password_event_is_replayed(tmp_path):
+    backend = JournalBackend(str(tmp_path))
+    films, users = FilmCatalog(), UserRegistry()
+    backend.restore(films, users)
+    user = User('user', 'old', {})
+    users.add(user)
+    backend.record_user(user)
+    user.password = 'new'
+    backend.record_password(user)
+    backend.close()
+    users = UserRegistry()
+    JournalBackend(str(tmp_path)).restore(FilmCatalog(), users)
+    assert users.get('user').password == 'new'
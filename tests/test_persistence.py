@@ -0,0 +1,169 @@
+import sqlite3
+import threading
+
+import pytest
+from movies.film import Film
+from movies.persistence import (
+    JournalBackend,
+    SqliteBackend,
+    StorageBackend,
+    create_backend,
+)
+from movies.storage import FilmCatalog, UserRegistry
+from movies.user import User
+
+
+def fill(backend):
+    films, users = FilmCatalog(), UserRegistry()
+    backend.restore(films, users)
+    user, other = User('user', 'hash', {}), User('other', 'hash', {})
+    film = Film('film', 2010, [], [])
+    for added in (user, other):
+        users.add(added)
+        backend.record_user(added)
+    films.add(film)
+    backend.record_film(film)
+    for at, (rater, mark) in enumerate([(user, 4), (other, 8), (user, 6)]):
+        rater.add_review_or_mark(film, films, mark, float(at))
+        backend.record_mark(rater.name, film, mark, float(at))
+    user.add_review_or_mark(film, films, 'review', 3.0)
+    backend.record_review('user', film, 'review', 3.0)
+    backend.close()
+
+
+def check(backend):
+    films, users = FilmCatalog(), UserRegistry()
+    backend.restore(films, users)
+    film = films.get('film', 2010)
+    user = users.get('user')
+    assert user.password == 'hash'
+    assert film.marks.tolist() == [6, 8]
+    assert film.reviews == ['review']
+    assert films.averages.count(7, 7) == 1
+    activity = user.activity[('film', 2010)]
+    assert (activity.mark, activity.marked_at) == (6, 2.0)
+    assert activity.reviews == [(3.0, 'review')]
+    assert users.get('other').activity[('film', 2010)].mark == 8
+    backend.close()
+
+
+def test_memory_backend():
+    backend = StorageBackend()
+    fill(backend)
+    assert list(backend.events()) == []
+
+
+def test_sqlite_backend(tmp_path):
+    path = str(tmp_path / 'movies.db')
+    fill(SqliteBackend(path))
+    check(SqliteBackend(path))
+
+
+@pytest.mark.parametrize('snapshot_every', [1, 3, 100])
+def test_journal_backend(tmp_path, snapshot_every):
+    fill(JournalBackend(str(tmp_path), snapshot_every))
+    check(JournalBackend(str(tmp_path), snapshot_every))
+
+
+def test_journal_skips_events_in_snapshot(tmp_path):
+    backend = JournalBackend(str(tmp_path), snapshot_every=100)
+    films, users = FilmCatalog(), UserRegistry()
+    backend.restore(films, users)
+    film = Film('film', 2010, [], [])
+    films.add(film)
+    backend.record_film(film)
+    films.add_mark(film, 5)
+    backend.write(('mark', 'nobody', 'film', 2010, 5))
+    journal = (tmp_path / 'journal.log').read_text()
+    backend.snapshot()
+    (tmp_path / 'journal.log').write_text(journal)
+    backend.close()
+
+    restored = FilmCatalog()
+    JournalBackend(str(tmp_path)).restore(restored, UserRegistry())
+    assert restored.get('film', 2010).marks.tolist() == [5]
+
+
+def test_create_backend(tmp_path):
+    assert type(create_backend('memory')) is StorageBackend
+    assert isinstance(create_backend('sqlite://' + str(tmp_path / 'db')), SqliteBackend)
+    assert isinstance(create_backend('journal://' + str(tmp_path)), JournalBackend)
+    with pytest.raises(ValueError):
+        create_backend('redis://localhost')
+
+
+def test_sqlite_transaction(tmp_path):
+    backend = SqliteBackend(str(tmp_path / 'movies.db'))
+    with backend.transaction():
+        backend.record_user(User('first', 'hash', {}))
+    with pytest.raises(RuntimeError):
+        with backend.transaction():
+            backend.record_user(User('second', 'hash', {}))
+            raise RuntimeError('rollback')
+    assert [event[1] for event in backend.events()] == ['first']
+
+
+def test_journal_transaction(tmp_path):
+    backend = JournalBackend(str(tmp_path))
+    with backend.transaction():
+        backend.record_user(User('first', 'hash', {}))
+        backend.record_user(User('second', 'hash', {}))
+        assert backend.buffered is True
+    assert backend.buffered is False
+    assert len(list(backend.events())) == 2
+
+
+def test_sqlite_adds_activity_time(tmp_path):
+    path = str(tmp_path / 'movies.db')
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE activity (id INTEGER PRIMARY KEY, username TEXT, '
+        'film_id INTEGER, mark INTEGER, review TEXT)'
+    )
+    connection.close()
+    fill(SqliteBackend(path))
+    check(SqliteBackend(path))
+
+
+def test_journal_snapshot_waits_for_change(tmp_path):
+    backend = JournalBackend(str(tmp_path), snapshot_every=2)
+    films, users = FilmCatalog(), UserRegistry()
+    backend.restore(films, users)
+    user, film = User('user', 'hash', {}), Film('film', 2010, [], [])
+    users.add(user)
+    backend.record_user(user)
+    films.add(film)
+    with backend.change():
+        user.add_review_or_mark(film, films, 'hello', 1.0)
+        # Запись другого потока в промежутке между изменением памяти и журналом
+        other = threading.Thread(target=backend.record_film, args=(film,))
+        other.start()
+        other.join()
+        assert not (tmp_path / 'snapshot.json').exists()
+        backend.record_review('user', film, 'hello', 1.0)
+    assert (tmp_path / 'snapshot.json').exists()
+    backend.close()
+
+    restored = FilmCatalog()
+    JournalBackend(str(tmp_path)).restore(restored, UserRegistry())
+    assert restored.get('film', 2010).reviews == ['hello']
+
+
+def test_journal_change_waits_for_snapshot(tmp_path):
+    backend = JournalBackend(str(tmp_path), snapshot_every=1)
+    schedule = backend.schedule
+    schedule.pending = 1
+    assert schedule.start()
+    entered = threading.Event()
+
+    def change():
+        with backend.change():
+            entered.set()
+
+    thread = threading.Thread(target=change)
+    thread.start()
+    assert not entered.wait(0.05)
+    schedule.finish()
+    thread.join()
+    assert entered.is_set()
+    backend.close()
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+from flask import json
+from movies import admin
+from movies.profiler import PROFILER, SamplingProfiler, collapse
+
+PROFILER_URL = '/movies/api/v1.0/admin/profiler'
+
+
+@pytest.fixture()
+def admin_header(header, login, monkeypatch):
+    monkeypatch.setattr(admin, 'ADMINS', {login})
+    yield header
+    PROFILER.stop()
+    PROFILER.clear()
+
+
+def busy(profiler, route, done):
+    profiler.enter(route)
+    while not done.is_set():
+        sum(range(1000))
+    profiler.leave()
+
+
+def test_sampling():
+    profiler = SamplingProfiler()
+    done = threading.Event()
+    assert profiler.start(0.001)
+    assert not profiler.start(0.001)
+    thread = threading.Thread(target=busy, args=(profiler, '/route', done))
+    thread.start()
+    time.sleep(0.1)
+    done.set()
+    thread.join()
+    assert profiler.stop()
+    assert not profiler.stop()
+    lines = profiler.collapsed().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(' ', 1)
+    assert stack.startswith('/route;')
+    assert 'tests.test_profiler:busy' in stack
+    assert int(count) > 0
+    assert profiler.collapsed('/other') == ''
+    profiler.clear()
+    assert profiler.collapsed() == ''
+
+
+def test_idle_profiler_ignores_requests():
+    profiler = SamplingProfiler()
+    profiler.enter('/route')
+    profiler.sample()
+    profiler.leave()
+    assert profiler.collapsed() == ''
+
+
+def test_collapse():
+    assert collapse(None) == ''
+    frame = collapse(__import__('sys')._getframe())
+    assert frame.endswith('tests.test_profiler:test_collapse')
+
+
+def test_admin_only(client, header):
+    assert client.post(PROFILER_URL + '/start', headers=header).status_code == 403
+    assert client.get(PROFILER_URL, headers=header).status_code == 403
+    assert client.get(PROFILER_URL).status_code == 401
+
+
+def test_profiler_endpoints(client, admin_header):
+    response = client.post(
+        PROFILER_URL + '/start',
+        data=json.dumps({'interval': 1}),
+        headers=admin_header,
+        content_type='application/json',
+    )
+    assert json.loads(response.get_data()) == {'PROFILER': 'started'}
+    response = client.post(PROFILER_URL + '/start', headers=admin_header)
+    assert response.status_code == 400
+    PROFILER.samples['/route', 'a;b'] += 2
+    response = client.get(PROFILER_URL + '?route=/route&clear=1', headers=admin_header)
+    assert response.mimetype == 'text/plain'
+    assert response.get_data(as_text=True) == '/route;a;b 2\n'
+    assert PROFILER.collapsed() == ''
+    response = client.post(PROFILER_URL + '/stop', headers=admin_header)
+    assert json.loads(response.get_data()) == {'PROFILER': 'stopped'}
+    response = client.post(PROFILER_URL + '/stop', headers=admin_header)
+    assert response.status_code == 400
+
+
+def test_invalid_interval(client, admin_header):
+    response = client.post(
+        PROFILER_URL + '/start',
+        data=json.dumps({'interval': 'fast'}),
+        headers=admin_header,
+        content_type='application/json',
+    )
+    assert response.status_code == 400
+    assert not PROFILER.running
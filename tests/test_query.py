@@ -0,0 +1,93 @@
+import pytest
+from flask import json
+from movies.app import FILM_STORAGE
+from movies.exception import InvalidQuery
+from movies.film import Film
+from movies.query import FilmQuery, QueryPlanner
+from movies.storage import FilmCatalog
+
+
+@pytest.fixture()
+def catalog():
+    storage = FilmCatalog()
+    for number in range(20):
+        storage.add(
+            Film('film {}'.format(number), 2000 + number % 4, [number % 11], [])
+        )
+    storage.add(Film('Matrix', 1999, [9, 10], []))
+    return storage
+
+
+def names(films):
+    return [film.name for film in films]
+
+
+def test_query_params():
+    query = FilmQuery({'year': '2001', 'min_average': '2.5', 'substring': ''})
+    assert (query.year_from, query.year_to) == (2001, 2001)
+    assert query.average_range() == (2.5, 10.0)
+    assert query.substring is None
+
+
+@pytest.mark.parametrize(
+    'args', [{'year': 'year'}, {'max_average': 'high'}, {'sort': 'name'}]
+)
+def test_bad_query(args):
+    with pytest.raises(InvalidQuery):
+        FilmQuery(args)
+
+
+def test_plan_most_selective(catalog):
+    planner = QueryPlanner(catalog)
+    assert planner.plan(FilmQuery({}))[0] == 'catalog'
+    assert planner.plan(FilmQuery({'substring': 'Matr', 'year': '1999'}))[0] == (
+        'substring'
+    )
+    assert planner.plan(FilmQuery({'substring': 'film', 'year': '1999'}))[0] == 'year'
+    query = FilmQuery({'year_from': '1990', 'min_average': '9.5'})
+    assert planner.plan(query)[0] == 'average'
+
+
+def test_execute_filters(catalog):
+    planner = QueryPlanner(catalog)
+    query = FilmQuery({'substring': 'FILM', 'ignore_case': '1', 'year': '2001'})
+    assert names(planner.execute(query, 100, 0)) == [
+        'film 1',
+        'film 5',
+        'film 9',
+        'film 13',
+        'film 17',
+    ]
+
+
+def test_execute_sorted_by_heap(catalog):
+    planner = QueryPlanner(catalog)
+    query = FilmQuery({'year': '2001', 'sort': '-average'})
+    assert names(planner.execute(query, 2, 1)) == ['film 17', 'film 5']
+    query = FilmQuery({'year': '2001', 'sort': 'average'})
+    assert names(planner.execute(query, 2, 0)) == ['film 1', 'film 13']
+
+
+def test_execute_sorted_by_index(catalog):
+    planner = QueryPlanner(catalog)
+    query = FilmQuery({'sort': '-average', 'max_average': '9'})
+    assert names(planner.execute(query, 2, 0)) == ['film 9', 'film 8']
+
+
+def test_query_endpoint(client, header):
+    FILM_STORAGE.add(Film('Alien', 1979, [8], []))
+    FILM_STORAGE.add(Film('Aliens', 1986, [9], []))
+    response = client.get(
+        '/movies/api/v1.0/get_films/query?substring=Alien&year_from=1980&sort=-average',
+        headers=header,
+    )
+    assert json.loads(response.get_data())['FILMS'] == [
+        {'name': 'Aliens', 'year': 1986, 'average': 9}
+    ]
+
+
+def test_query_endpoint_bad_params(client, header):
+    response = client.get(
+        '/movies/api/v1.0/get_films/query?sort=random', headers=header
+    )
+    assert response.status_code == 400
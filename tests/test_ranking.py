@@ -0,0 +1,99 @@
+import random
+
+import pytest
+from flask import json
+from movies.app import FILM_STORAGE
+from movies.film import Film
+from movies.ranking import Ranking, bayesian_score, wilson_score
+from movies.ratings import RANKING
+
+
+def test_scores_prefer_many_marks():
+    assert wilson_score(1, 10) < wilson_score(1000, 9000) < 9
+    assert 0 <= wilson_score(3, 0) < wilson_score(3, 30) < 10
+    assert bayesian_score(1, 10, 5, 10) == pytest.approx(60 / 11)
+    assert bayesian_score(1000, 9000, 5, 10) > bayesian_score(1, 10, 5, 10)
+
+
+def brute_force(films, ranking, limit):
+    prior = ranking.prior
+    scores = [
+        (bayesian_score(count, total, prior, ranking.weight), key)
+        for key, (count, total) in films.items()
+    ]
+    return sorted(scores, reverse=True)[:limit]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_incremental_top_matches_full_sort(seed):
+    rnd = random.Random(seed)
+    ranking = Ranking(weight=5)
+    films = {}
+    for step in range(3000):
+        key = ('film{}'.format(rnd.randrange(200)), 2000)
+        count, total = films.get(key, (0, 0))
+        # Средняя по каталогу сначала высокая, потом падает
+        mark = rnd.randint(7, 10) if step < 1000 else rnd.randint(0, 6)
+        films[key] = count + 1, total + mark
+        ranking.update(key, *films[key])
+    assert ranking.count == sum(count for count, _ in films.values())
+    assert len(ranking._bayesian) > 1
+    expected = brute_force(films, ranking, 20)
+    actual = ranking.top('bayesian', 20)
+    assert [key for _, key in actual] == [key for _, key in expected]
+    assert [score for score, _ in actual] == pytest.approx(
+        [score for score, _ in expected]
+    )
+    wilson = sorted(
+        ((wilson_score(*value), key) for key, value in films.items()), reverse=True
+    )
+    assert ranking.top('wilson', 5) == wilson[:5]
+
+
+def test_deferred_updates_rebuild_once():
+    ranking = Ranking()
+    ranking.update(('a', 2000), 1, 10, deferred=True)
+    ranking.update(('b', 2000), 100, 900, deferred=True)
+    ranking.update(('a', 2000), 2, 10)
+    assert ranking.dirty
+    assert [key for _, key in ranking.top('bayesian', 5)] == [('b', 2000), ('a', 2000)]
+    assert not ranking.dirty
+    assert ranking.top('bayesian', 0) == []
+    assert ranking.top('average', 5) is None
+    ranking.clear()
+    assert ranking.top('wilson', 5) == []
+    assert ranking.prior == 5
+
+
+@pytest.fixture()
+def ranked(client, header, registered):
+    FILM_STORAGE.add(Film('single', 2010, [], []))
+    FILM_STORAGE.add(Film('popular', 2010, [9] * 50, []))
+    FILM_STORAGE.add(Film('bad', 2010, [], []))
+    FILM_STORAGE.add_mark(FILM_STORAGE.get('single', 2010), 10)
+    for _ in range(20):
+        FILM_STORAGE.add_mark(FILM_STORAGE.get('bad', 2010), 2)
+    return client
+
+
+def get(client, header, query=''):
+    response = client.get('/movies/api/v1.0/get_films/ranked' + query, headers=header)
+    return response.status_code, json.loads(response.get_data())
+
+
+@pytest.mark.parametrize('mode', ['bayesian', 'wilson'])
+def test_ranked_endpoint(ranked, header, mode):
+    status, data = get(ranked, header, '?mode=' + mode)
+    assert status == 200
+    assert [film['name'] for film in data['FILMS']] == ['popular', 'single', 'bad']
+    assert data['FILMS'][1]['average'] == 10
+    assert data['FILMS'][1]['count'] == 1
+    _, data = get(ranked, header, '?mode={}&limit=1&offset=1'.format(mode))
+    assert [film['name'] for film in data['FILMS']] == ['single']
+
+
+def test_ranked_prior_and_errors(ranked, header):
+    _, data = get(ranked, header)
+    assert data['MODE'] == 'bayesian'
+    assert data['PRIOR'] == pytest.approx(RANKING.total / RANKING.count, abs=0.03)
+    assert get(ranked, header, '?mode=average')[0] == 400
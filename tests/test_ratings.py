@@ -0,0 +1,64 @@
+import pytest
+from flask import json
+from movies.app import FILM_STORAGE
+from movies.film import Film
+
+
+@pytest.fixture()
+def films(registered):
+    for name, marks in [('low', [1, 2]), ('middle', [5]), ('high', [9, 10])]:
+        FILM_STORAGE.add(Film(name, 2010, marks, []))
+
+
+def get_json(client, header, url):
+    response = client.get(url, headers=header)
+    return response.status_code, json.loads(response.get_data())
+
+
+def test_top(client, header, films):
+    status, data = get_json(client, header, '/movies/api/v1.0/get_films/top?limit=2')
+    assert status == 200
+    assert data['FILMS'] == [
+        {'name': 'high', 'year': 2010, 'average': 9.5},
+        {'name': 'middle', 'year': 2010, 'average': 5},
+    ]
+
+
+def test_bottom(client, header, films):
+    status, data = get_json(
+        client, header, '/movies/api/v1.0/get_films/bottom?limit=1&offset=1'
+    )
+    assert [film['name'] for film in data['FILMS']] == ['middle']
+
+
+def test_bad_page(client, header, films):
+    status, data = get_json(client, header, '/movies/api/v1.0/get_films/top?limit=-1')
+    assert status == 400
+    assert data['ERROR'] == 'Limit and offset must be non-negative numbers'
+
+
+def test_range(client, header, films):
+    status, data = get_json(client, header, '/movies/api/v1.0/get_films/average/1/5')
+    assert [film['name'] for film in data['FILMS']] == ['low', 'middle']
+
+
+@pytest.mark.parametrize('path', ['a/5', 'nan', '0/nan', 'nan/nan', '-inf/inf'])
+def test_bad_range(client, header, films, path):
+    status, data = get_json(
+        client, header, '/movies/api/v1.0/get_films/average/' + path
+    )
+    assert status == 404
+    assert data['ERROR'] == 'Average rating can not be a string value'
+
+
+def test_average_updated_by_mark(client, header, films):
+    client.post(
+        '/movies/api/v1.0/login/add_mark',
+        headers=header,
+        data=json.dumps({'name': 'low', 'year': 2010, 'mark': 10}),
+        content_type='application/json',
+    )
+    status, data = get_json(client, header, '/movies/api/v1.0/get_films/average/5.0')
+    assert data['FILMS'] == ['middle']
+    status, data = get_json(client, header, '/movies/api/v1.0/get_films/top?limit=1')
+    assert data['FILMS'][0]['name'] == 'high'
@@ -0,0 +1,105 @@
+import pytest
+from flask import json
+from movies.app import FILM_STORAGE
+from movies.film import Film
+from movies.responses import RESPONSES
+
+AVERAGE = '/movies/api/v1.0/get_average/film/2010'
+REVIEWS = '/movies/api/v1.0/get_count_reviews/film/2010'
+SUBSTRING = '/movies/api/v1.0/get_films/substring/fil'
+BY_AVERAGE = '/movies/api/v1.0/get_films/average/5'
+
+
+@pytest.fixture()
+def film(registered):
+    FILM_STORAGE.add(Film('film', 2010, [4, 6], []))
+
+
+def get(client, header, url, **headers):
+    response = client.get(url, headers=dict(header, **headers))
+    return response
+
+
+def post(client, header, url, data):
+    return client.post(
+        url, data=json.dumps(data), headers=header, content_type='application/json'
+    )
+
+
+def test_hit_after_miss(client, header, film):
+    first = get(client, header, AVERAGE)
+    second = get(client, header, AVERAGE)
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert json.loads(second.get_data()) == {'AVERAGE': 5}
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert RESPONSES.stats()['hits'] >= 1
+
+
+def test_not_modified(client, header, film):
+    etag = get(client, header, AVERAGE).headers['ETag']
+    response = get(client, header, AVERAGE, **{'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    response = get(client, header, AVERAGE, **{'If-None-Match': '"other"'})
+    assert response.status_code == 200
+
+
+def test_mark_invalidates(client, header, film):
+    get(client, header, AVERAGE)
+    get(client, header, BY_AVERAGE)
+    get(client, header, REVIEWS)
+    post(
+        client,
+        header,
+        '/movies/api/v1.0/login/add_mark',
+        {'name': 'film', 'year': 2010, 'mark': 8},
+    )
+    assert json.loads(get(client, header, AVERAGE).get_data()) == {'AVERAGE': 6}
+    assert json.loads(get(client, header, BY_AVERAGE).get_data()) == {'FILMS': []}
+    assert get(client, header, REVIEWS).headers['X-Cache'] == 'HIT'
+
+
+def test_review_invalidates(client, header, film):
+    get(client, header, REVIEWS)
+    post(
+        client,
+        header,
+        '/movies/api/v1.0/login/add_review',
+        {'name': 'film', 'year': 2010, 'review': 'good'},
+    )
+    response = get(client, header, REVIEWS)
+    assert response.headers['X-Cache'] == 'MISS'
+    assert json.loads(response.get_data()) == {'COUNT_REVIEWS': 1}
+
+
+def test_create_film_invalidates(client, header, film):
+    assert json.loads(get(client, header, SUBSTRING).get_data()) == {'FILMS': ['film']}
+    post(client, header, '/movies/api/v1.0/login/add', {'name': 'film 2', 'year': 2011})
+    assert json.loads(get(client, header, SUBSTRING).get_data()) == {
+        'FILMS': ['film', 'film 2']
+    }
+
+
+def test_errors_are_not_cached(client, header, film):
+    for _ in range(2):
+        response = get(client, header, '/movies/api/v1.0/get_average/other/2010')
+        assert response.status_code == 404
+        assert 'X-Cache' not in response.headers
+    response = get(client, header, '/movies/api/v1.0/get_films/average/abc')
+    assert response.status_code == 404
+    assert 'X-Cache' not in response.headers
+
+
+def test_clear_invalidates(client, header, film):
+    get(client, header, AVERAGE)
+    FILM_STORAGE.clear()
+    assert RESPONSES.stats()['size'] == 0
+
+
+def test_invalid_year_is_not_cached(client, header, film):
+    response = get(client, header, '/movies/api/v1.0/get_count_marks/film/2010')
+    assert response.headers['X-Cache'] == 'MISS'
+    response = get(client, header, '/movies/api/v1.0/get_count_marks/film/year')
+    assert response.status_code == 400
+    assert 'X-Cache' not in response.headers
@@ -0,0 +1,76 @@
+import pytest
+from flask import json
+from movies.app import FILM_STORAGE
+from movies.film import Film
+from movies.reviews import ReviewStore, block_text, encode_block, open_block
+
+
+@pytest.fixture(params=[False, True], ids=['memory', 'spill'])
+def store(request, tmp_path):
+    spill_dir = str(tmp_path) if request.param else None
+    return ReviewStore(block_size=4, cache_blocks=1, spill_dir=spill_dir)
+
+
+def test_block_roundtrip():
+    texts = ['', 'хороший фильм', 'a\x00b', 'x' * 1000]
+    block = open_block(encode_block(texts), len(texts))
+    assert [block_text(block, position) for position in range(4)] == texts
+
+
+def test_store_keeps_order(store):
+    texts = ['review {}'.format(number) for number in range(10)]
+    ids = [store.add(text) for text in texts]
+    assert ids == list(range(10))
+    assert len(store) == 10
+    assert store.get_many(reversed(ids)) == texts[::-1]
+    assert store.get(9) == 'review 9'
+    stats = store.stats()
+    assert (stats['blocks'], stats['hot']) == (2, 2)
+    assert stats['compressed_bytes'] > 0
+
+
+def test_stores_do_not_share_spill_file(tmp_path):
+    stores = [ReviewStore(block_size=2, spill_dir=str(tmp_path)) for _ in range(2)]
+    for number in range(4):
+        for prefix, store in zip('ab', stores):
+            store.add('{}{}'.format(prefix, number))
+    assert stores[0].get_many(range(4)) == ['a0', 'a1', 'a2', 'a3']
+    assert stores[1].get_many(range(4)) == ['b0', 'b1', 'b2', 'b3']
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cold_blocks_loaded_lazily(store):
+    for number in range(12):
+        store.add('review {}'.format(number))
+    assert store.loads == 0
+    assert store.get_many([0, 1, 2, 3]) == [
+        'review 0',
+        'review 1',
+        'review 2',
+        'review 3',
+    ]
+    assert store.loads == 1
+    store.get(5)
+    store.get(0)
+    assert store.loads == 3
+
+
+def test_film_references_reviews():
+    film = Film('film', 2010, [], ['first'])
+    review_id = film.add_review('second')
+    assert film.review_ids[-1] == review_id
+    assert film.reviews == ['first', 'second']
+    assert film.get_count_reviews() == 2
+
+
+def test_reviews_page(client, header, registered):
+    FILM_STORAGE.add(Film('film', 2010, [], ['first', 'second', 'third']))
+    response = client.get(
+        '/movies/api/v1.0/get_reviews/film/2010?limit=2&offset=1', headers=header
+    )
+    data = json.loads(response.get_data())
+    assert data == {'COUNT_REVIEWS': 3, 'REVIEWS': ['second', 'third']}
+    response = client.get('/movies/api/v1.0/get_reviews/other/2010', headers=header)
+    assert response.status_code == 404
+    response = client.get('/movies/api/v1.0/get_reviews/film/abc', headers=header)
+    assert response.status_code == 400
@@ -0,0 +1,72 @@
+import pytest
+from flask import json
+from movies.app import FILM_STORAGE
+from movies.film import Film
+from movies.index import SubstringIndex, trigrams
+
+
+@pytest.fixture()
+def index():
+    names = SubstringIndex()
+    for number, name in enumerate(['Matrix', 'Matrix Reloaded', 'Alien', 'Aliens']):
+        names.add((name, 1990 + number), name)
+    return names
+
+
+def test_trigrams():
+    assert trigrams('abcd') == {'abc', 'bcd'}
+    assert trigrams('ab') == set()
+
+
+def test_search(index):
+    assert [name for name, _ in index.search('Matrix')] == [
+        'Matrix',
+        'Matrix Reloaded',
+    ]
+    assert [name for name, _ in index.search('ien')] == ['Alien', 'Aliens']
+    assert list(index.search('matrix')) == []
+    assert list(index.search('Predator')) == []
+
+
+def test_search_ignore_case(index):
+    assert [name for name, _ in index.search('RELOAD', ignore_case=True)] == [
+        'Matrix Reloaded'
+    ]
+
+
+def test_search_short(index):
+    assert [name for name, _ in index.search('s')] == ['Aliens']
+    assert len(list(index.search(''))) == 4
+
+
+def test_clear(index):
+    index.clear()
+    assert len(index) == 0
+    assert list(index.search('Alien')) == []
+
+
+@pytest.fixture()
+def films(registered):
+    for number in range(5):
+        FILM_STORAGE.add(Film('Film {}'.format(number), 2000, [], []))
+
+
+def test_substring_page(client, header, films):
+    response = client.get(
+        '/movies/api/v1.0/get_films/substring/Film?limit=2&offset=1', headers=header
+    )
+    assert json.loads(response.get_data())['FILMS'] == ['Film 1', 'Film 2']
+
+
+def test_substring_ignore_case(client, header, films):
+    response = client.get(
+        '/movies/api/v1.0/get_films/substring/film 4?ignore_case=1', headers=header
+    )
+    assert json.loads(response.get_data())['FILMS'] == ['Film 4']
+
+
+def test_substring_bad_page(client, header, films):
+    response = client.get(
+        '/movies/api/v1.0/get_films/substring/Film?offset=x', headers=header
+    )
+    assert response.status_code == 400
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+from movies import serialization
+from movies.app import FILM_STORAGE
+from movies.film import Film
+from movies.serialization import dumps, encode_film, jsonify, loads
+
+
+@pytest.fixture(params=[True, False], ids=['orjson', 'json'])
+def encoder(request, monkeypatch):
+    if request.param and serialization.orjson is None:
+        pytest.skip('orjson is not installed')
+    monkeypatch.setattr(serialization, 'USE_ORJSON', request.param)
+
+
+def test_dumps(encoder):
+    data = {'name': 'Фильм', 'marks': [1, 2], 'average': 1.5, 'next': None}
+    assert b' ' not in dumps(data)
+    assert 'Фильм'.encode() in dumps(data)
+    assert loads(dumps(data)) == data
+
+
+def test_encode_film(encoder):
+    film = Film('Фильм "1"', 2010, [4, 6], ['good'])
+    assert json.loads(encode_film(film)) == film.create_dict()
+    assert json.loads(encode_film(film, ['name'])) == {'name': 'Фильм "1"'}
+
+
+def test_encoded_film_is_cached():
+    film = Film('film', 2010, [4], [])
+    assert json.loads(encode_film(film)) == film.create_dict()
+    first = film.encoded
+    encode_film(film)
+    assert film.encoded is first
+    film.add_mark(6)
+    assert json.loads(encode_film(film))['marks'] == [4, 6]
+    film.add_review('good')
+    assert json.loads(encode_film(film))['reviews'] == ['good']
+
+
+def test_listing_does_not_cache_reviews(client, header):
+    text = 'review text ' * 50
+    for number in range(20):
+        FILM_STORAGE.add(Film('film{}'.format(number), 2010, [5], [text] * 10))
+    response = client.get('/movies/api/v1.0/films?limit=100', headers=header)
+    assert response.get_json()['LIST OF FILMS']['FILM0']['reviews'] == [text] * 10
+    cached = sum(len(film.encoded[1]) + len(film.encoded[2]) for film in FILM_STORAGE)
+    assert 0 < cached < 100 * len(FILM_STORAGE)
+
+
+def test_jsonify():
+    response = jsonify({'ERROR': 'error'})
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.get_data()) == {'ERROR': 'error'}
@@ -0,0 +1,137 @@
+import pytest
+from flask import json
+from movies.analytics import (
+    RatingTotals,
+    describe,
+    histogram,
+    percentiles,
+    year_rows,
+)
+from movies.app import FILM_STORAGE
+from movies.film import Film
+from movies.stats import TOTALS
+from movies.user import User
+
+
+def test_histogram_and_percentiles():
+    hist = histogram(bytes([0, 5, 5, 7, 10, 10, 10]))
+    assert hist == [1, 0, 0, 0, 0, 2, 0, 1, 0, 0, 3]
+    assert percentiles(hist, [0, 50, 90, 100]) == {
+        'p0': 0,
+        'p50': 7,
+        'p90': 10,
+        'p100': 10,
+    }
+
+
+def test_describe():
+    data = describe([0, 0, 2, 0, 2, 0, 0, 0, 0, 0, 0], [50])
+    assert data['COUNT'] == 4
+    assert data['AVERAGE'] == 3
+    assert data['STDDEV'] == 1
+    assert data['PERCENTILES'] == {'p50': 2}
+    assert describe([0] * 11, [50])['PERCENTILES'] == {}
+
+
+def loop_totals(films):
+    hist = [0] * 11
+    years = {}
+    for film in films:
+        row = years.setdefault(film.year, [0, 0, 0, 0])
+        row[0] += 1
+        for mark in film.marks:
+            hist[mark] += 1
+            row[1] += 1
+            row[2] += mark
+            row[3] += mark * mark
+    return hist, year_rows([year] + row for year, row in sorted(years.items()))
+
+
+def test_year_rows():
+    films = [
+        Film('a', 2000, [2, 4], []),
+        Film('b', 2000, [6], []),
+        Film('c', 1990, [], []),
+    ]
+    assert loop_totals(films)[1] == [
+        {'year': 1990, 'films': 1, 'count': 0, 'average': 0, 'stddev': 0.0},
+        {
+            'year': 2000,
+            'films': 2,
+            'count': 3,
+            'average': 4,
+            'stddev': pytest.approx((8 / 3) ** 0.5),
+        },
+    ]
+
+
+def test_rating_totals():
+    totals = RatingTotals()
+    totals.add_film(2000, bytes([2, 4]))
+    totals.add_film(2000, b'')
+    totals.add_mark(2000, None, 6)
+    totals.add_mark(2000, 6, 10)
+    assert totals.histogram() == [0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1]
+    assert totals.by_year() == [
+        {
+            'year': 2000,
+            'films': 2,
+            'count': 3,
+            'average': pytest.approx(16 / 3),
+            'stddev': pytest.approx(((4 + 16 + 100) / 3 - (16 / 3) ** 2) ** 0.5),
+        }
+    ]
+    totals.clear()
+    assert totals.histogram() == [0] * 11
+
+
+def test_totals_follow_catalog(registered):
+    FILM_STORAGE.add(Film('old', 1990, [1, 3], []))
+    films = [FILM_STORAGE.get('old', 1990), Film('new', 2020, [], [])]
+    FILM_STORAGE.add(films[1])
+    users = [User('user{}'.format(number), 'hash', {}) for number in range(3)]
+    for step in range(30):
+        user, film = users[step % 3], films[step % 2]
+        user.rate_film(film, FILM_STORAGE, step % 11)
+    assert (TOTALS.histogram(), TOTALS.by_year()) == loop_totals(FILM_STORAGE)
+
+
+@pytest.fixture()
+def rated(client, header, registered):
+    FILM_STORAGE.add(Film('old', 1990, [1, 3], []))
+    FILM_STORAGE.add(Film('new', 2020, [10], []))
+    return client
+
+
+def get(client, header, path):
+    response = client.get('/movies/api/v1.0/stats/' + path, headers=header)
+    return response.status_code, json.loads(response.get_data())
+
+
+def test_catalog_stats(rated, header):
+    status, data = get(rated, header, 'catalog')
+    assert status == 200
+    assert data['HISTOGRAM'] == [0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 1]
+    assert data['PERCENTILES'] == {'p50': 3, 'p90': 10, 'p99': 10}
+    FILM_STORAGE.add_mark(FILM_STORAGE.get('old', 1990), 5)
+    _, data = get(rated, header, 'catalog?p=25')
+    assert data['COUNT'] == 4
+    assert data['PERCENTILES'] == {'p25': 1}
+
+
+def test_film_and_year_stats(rated, header):
+    _, data = get(rated, header, 'film/old/1990')
+    assert data['AVERAGE'] == 2
+    assert data['HISTOGRAM'][1] == data['HISTOGRAM'][3] == 1
+    _, data = get(rated, header, 'years')
+    assert [year['year'] for year in data['YEARS']] == [1990, 2020]
+    assert get(rated, header, 'film/other/1990')[0] == 404
+    assert get(rated, header, 'film/old/abc') == (
+        400,
+        {'ERROR': 'Year of film must be a number, check it'},
+    )
+
+
+@pytest.mark.parametrize('query', ['p=abc', 'p=101', 'p=50,-1'])
+def test_invalid_percentiles(rated, header, query):
+    assert get(rated, header, 'catalog?' + query)[0] == 400
@@ -0,0 +1,72 @@
+import pytest
+from movies.film import Film
+from movies.storage import FilmCatalog, UserRegistry, film_key
+from movies.user import User
+
+
+@pytest.fixture()
+def catalog():
+    storage = FilmCatalog()
+    storage.add(Film('film', 2010, [], []))
+    return storage
+
+
+def test_film_key():
+    assert film_key('film', '2010') == ('film', 2010)
+
+
+def test_get(catalog):
+    assert catalog.get('film', 2010).name == 'film'
+    assert catalog.get('film', '2010').year == 2010
+    assert catalog.get('film', 2011) is None
+
+
+def test_add_duplicate(catalog):
+    assert catalog.add(Film('film', 2010, [], [])) is False
+    assert catalog.add(Film('film', 2011, [], [])) is True
+    assert len(catalog) == 2
+
+
+def test_contains_and_iter(catalog):
+    assert ('film', 2010) in catalog
+    assert [film.name for film in catalog] == ['film']
+
+
+def test_clear(catalog):
+    catalog.clear()
+    assert len(catalog) == 0
+
+
+@pytest.fixture()
+def registry():
+    storage = UserRegistry()
+    storage.add(User('user', 'hash', {}))
+    return storage
+
+
+def test_registry_get(registry):
+    assert registry.get('user').password == 'hash'
+    assert registry.get('other') is None
+
+
+def test_registry_add_duplicate(registry):
+    assert registry.add(User('user', 'other', {})) is False
+    assert registry.add(User('other', 'hash', {})) is True
+    assert len(registry) == 2
+    assert 'other' in registry
+    assert sorted(user.name for user in registry) == ['other', 'user']
+
+
+def test_registry_clear(registry):
+    registry.clear()
+    assert len(registry) == 0
+
+
+def test_bulk_load(catalog):
+    with catalog.bulk_load():
+        film = Film('other', 2011, [], [])
+        catalog.add(film)
+        catalog.add_mark(film, 7)
+        assert list(catalog.averages.equal(7)) == []
+    assert list(catalog.averages.equal(7)) == [('other', 2011)]
+    assert len(catalog.averages) == 2
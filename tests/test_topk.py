@@ -0,0 +1,96 @@
+import random
+from collections import Counter
+
+import pytest
+from flask import json
+from movies.app import FILM_STORAGE
+from movies.film import Film
+from movies.topk import SlidingSpaceSaving, SpaceSaving, Trending
+from movies.trending import TRENDING
+
+
+def test_exact_when_capacity_is_enough():
+    summary = SpaceSaving(10)
+    for key in 'aabbbc':
+        summary.add(key)
+    assert summary.top(2) == [('b', 3, 0), ('a', 2, 0)]
+
+
+def test_heavy_hitters_survive():
+    rnd = random.Random(1)
+    stream = ['hot{}'.format(number % 3) for number in range(3000)]
+    stream += ['cold{}'.format(rnd.randrange(10000)) for _ in range(7000)]
+    rnd.shuffle(stream)
+    summary = SpaceSaving(50)
+    for key in stream:
+        summary.add(key)
+    exact = Counter(stream)
+    top = summary.top(3)
+    assert {key for key, _, _ in top} == {'hot0', 'hot1', 'hot2'}
+    for key, count, error in summary.hitters():
+        assert count - error <= exact[key] <= count
+    assert len(summary.counts) == 50
+
+
+def test_sliding_window():
+    window = SlidingSpaceSaving(60.0, 6, 10)
+    window.add('old', 0.0, 5)
+    window.add('new', 30.0)
+    window.add('new', 55.0)
+    assert window.top(2, 55.0) == [('old', 5, 0), ('new', 2, 0)]
+    assert window.top(2, 65.0) == [('new', 2, 0)]
+    window.add('new', 66.0)
+    assert window.top(2, 66.0) == [('new', 3, 0)]
+    assert window.top(2, 200.0) == []
+
+
+def test_trending_periods():
+    now = [0.0]
+    trending = Trending(10, {'minute': (60.0, 6)}, clock=lambda: now[0])
+    trending.add('restored', 7, recent=False)
+    trending.add('fresh')
+    assert trending.top('all', 1) == [('restored', 7, 0)]
+    assert trending.top('minute', 5) == [('fresh', 1, 0)]
+    assert trending.top('year', 5) is None
+    now[0] = 120.0
+    assert trending.top('minute', 5) == []
+    trending.clear()
+    assert trending.top('all', 5) == []
+
+
+@pytest.fixture()
+def rated(client, header, registered):
+    FILM_STORAGE.add(Film('first', 2010, [], []))
+    FILM_STORAGE.add(Film('second', 2010, [5, 6], []))
+    for film, marks in (('first', 1), ('second', 3)):
+        for _ in range(marks):
+            FILM_STORAGE.add_mark(FILM_STORAGE.get(film, 2010), 7)
+    FILM_STORAGE.add_review(FILM_STORAGE.get('first', 2010), 'review')
+    return client
+
+
+def get(client, header, path):
+    response = client.get('/movies/api/v1.0/trending/' + path, headers=header)
+    return response.status_code, json.loads(response.get_data())
+
+
+def test_trending_endpoint(rated, header):
+    status, data = get(rated, header, 'marks?period=hour&limit=1')
+    assert status == 200
+    assert data['FILMS'] == [{'name': 'second', 'year': 2010, 'count': 3, 'error': 0}]
+    _, data = get(rated, header, 'marks')
+    assert data['FILMS'][0]['count'] == 5
+    _, data = get(rated, header, 'reviews?period=day')
+    assert [film['name'] for film in data['FILMS']] == ['first']
+
+
+def test_trending_errors(rated, header):
+    assert get(rated, header, 'films')[0] == 404
+    status, data = get(rated, header, 'marks?period=week')
+    assert status == 400
+    assert data['ERROR'] == 'Period must be one of: all, hour, day'
+
+
+def test_cleared_with_catalog(rated):
+    FILM_STORAGE.clear()
+    assert TRENDING['marks'].top('all', 10) == []
@@ -1,5 +1,6 @@
 import pytest
-from movies.film import Film
+from movies.film import Film, check_aggregates
+from movies.storage import FilmCatalog
 from movies.user import User
 
 
@@ -10,7 +11,9 @@ def user():
 
 @pytest.fixture()
 def storage():
-    return [Film('film', 2010, [], [])]
+    catalog = FilmCatalog()
+    catalog.add(Film('film', 2010, [], []))
+    return catalog
 
 
 @pytest.fixture()
@@ -21,7 +24,7 @@ def bad_film():
 def test_init_user(user):
     assert user.name == 'username'
     assert user.password == 'password'
-    assert user.reviews == {}
+    assert not user.activity
 
 
 def test_add_exist_film(storage, user):
@@ -38,21 +41,34 @@ def test_add_film(storage, user):
 
 @pytest.mark.parametrize('data', [5, 'review'])
 def test_add_mark_or_review(storage, user, data):
-    actual = user.add_review_or_mark(storage[0], storage, data)
+    actual = user.add_review_or_mark(storage.get('film', 2010), storage, data)
     assert isinstance(actual, Film)
     assert actual.name == 'film'
     assert actual.year == 2010
     if data == 5:
-        assert actual.marks == [5]
-        assert user.reviews['film' + "2010"] == 5
+        assert actual.marks.tolist() == [5]
+        assert user.activity[('film', 2010)].mark == 5
     else:
         assert actual.reviews == ['review']
-        assert user.reviews['film' + "2010"] == 'review'
+        assert user.activity[('film', 2010)].reviews[0][1] == 'review'
+
+
+def test_replace_mark(storage, user):
+    film = storage.get('film', 2010)
+    other = User('other', 'password', {})
+    other.add_review_or_mark(film, storage, 2)
+    for mark in (5, 9, 7):
+        user.add_review_or_mark(film, storage, mark)
+    assert film.marks.tolist() == [2, 7]
+    assert film.get_average_mark() == 4.5
+    assert check_aggregates(film)
+    assert storage.averages.count(4.5, 4.5) == 1
+    assert user.activity[('film', 2010)].mark == 7
 
 
 @pytest.mark.parametrize('data', [-1, 11])
 def test_add_bad_mark(storage, user, data):
-    actual = user.add_review_or_mark(storage[0], storage, data)
+    actual = user.add_review_or_mark(storage.get('film', 2010), storage, data)
     assert actual is None
 
 